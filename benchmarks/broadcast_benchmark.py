@@ -0,0 +1,234 @@
+"""
+Benchmark de la diffusion des coupons contre un faux serveur de l'API Bot.
+
+Lance `CouponSend.broadcast_coupon_optimized` de bout en bout (passerelle
+sortante, moteur de diffusion, registre des livraisons) sur une base
+temporaire peuplée d'utilisateurs synthétiques, sans aucun envoi réel.
+Pour chaque taille d'audience, affiche le débit (messages livrés/seconde),
+la latence des envois (p50/p95/p99), le pic mémoire (RSS, ou allocations
+Python avec --tracemalloc, ~3x plus lent), les appels API, les appels
+gaspillés (429, 403, 413...) et l'attente d'une connexion du pool de
+diffusion. Le faux serveur tourne dans un autre processus.
+
+Utilisation :
+    python -m benchmarks.broadcast_benchmark
+    python -m benchmarks.broadcast_benchmark --sizes 1000 --rate 25 --server-limit 30
+    python -m benchmarks.broadcast_benchmark --media photo --file-mb 60 --max-upload-mb 50
+"""
+import argparse
+import asyncio
+import logging
+import os
+import resource
+import sqlite3
+import statistics
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+from benchmarks.fake_bot_api import FakeBotApiProcess
+
+
+def _percentiles(values):
+    if len(values) < 2:
+        value = values[0] if values else 0.0
+        return value, value, value
+    cuts = statistics.quantiles(values, n=100)
+    return cuts[49], cuts[94], cuts[98]
+
+
+def populate_users(db_path, count, languages=('fr', 'en', 'ar')):
+    """Remplacer les utilisateurs de la base par `count` utilisateurs synthétiques"""
+    now = datetime.now().isoformat()
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DELETE FROM users")
+        conn.executemany(
+            "INSERT INTO users (id, language, created_at) VALUES (?, ?, ?)",
+            ((str(1_000_000 + i), languages[i % len(languages)], now) for i in range(count))
+        )
+
+
+def make_coupon(args, media_dir):
+    coupon = {
+        'coupon_id': f"bench_{int(time.time() * 1000)}",
+        'text': "Coupon de benchmark",
+        'media_type': args.media,
+        'created_at': datetime.now().isoformat(),
+        'date': datetime.now().strftime('%Y-%m-%d'),
+    }
+    if args.media != 'text':
+        path = os.path.join(media_dir, f"bench.{'jpg' if args.media == 'photo' else 'mp4'}")
+        if not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.write(os.urandom(int(args.file_mb * 1024 * 1024)))
+        coupon[f"{args.media}_path"] = path
+    return coupon
+
+
+async def run_size(app, coupon_system, database, server, args, users, media_dir):
+    populate_users(database.db_path, users)
+    coupon_system.broadcast_jobs.reachability.unreachable.clear()
+    await server.reset()
+
+    coupon = make_coupon(args, media_dir)
+    database.add_coupon(dict(coupon))
+
+    latencies = []
+    send = coupon_system._send_coupon_to_user
+
+    async def timed_send(*send_args, **send_kwargs):
+        start = time.perf_counter()
+        try:
+            return await send(*send_args, **send_kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    coupon_system._send_coupon_to_user = timed_send
+    if args.tracemalloc:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        await coupon_system.broadcast_coupon_optimized(app, coupon)
+    finally:
+        elapsed = time.perf_counter() - start
+        if args.tracemalloc:
+            peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+            tracemalloc.stop()
+        else:
+            # RSS maximal du processus : les tailles croissantes rendent la progression lisible
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        coupon_system._send_coupon_to_user = send
+    calls, admin_calls = await server.stats()
+
+    job = database.get_broadcast_jobs(limit=1)[0]
+    stats = coupon_system.broadcast_jobs.get_stats(job['job_id'])
+    delivered = stats.get('success', 0)
+    user_calls = sum(count for (method, code), count in calls.items() if method.startswith('send'))
+    user_calls -= sum(count for method, count in admin_calls.items() if method.startswith('send'))
+    codes = Counter()
+    for (method, code), count in calls.items():
+        codes[code] += count
+    p50, p95, p99 = _percentiles(latencies)
+    return {
+        'users': users,
+        'seconds': elapsed,
+        'rate': delivered / elapsed if elapsed else 0.0,
+        'p50': p50, 'p95': p95, 'p99': p99,
+        'peak_mb': peak,
+        'calls': sum(calls.values()),
+        'admin_calls': sum(admin_calls.values()),
+        'wasted': user_calls - delivered,
+        'retried': stats.get('retried', 0),
+        'delivered': delivered,
+        'codes': codes,
+    }
+
+
+def format_results(results, args):
+    lines = [
+        f"Diffusion simulée : {args.media}, débit cible {args.rate:g} msg/s, "
+        f"latence {args.latency_ms:g}±{args.jitter_ms:g} ms, 403 {args.forbidden_rate:.0%}, "
+        f"429 {args.flood_rate:.1%}" + (f" + au-delà de {args.server_limit:g}/s" if args.server_limit else ""),
+        f"{'Utilisateurs':>12}{'Durée':>9}{'Msg/s':>9}{'p50':>8}{'p95':>8}{'p99':>8}"
+        f"{'Mémoire':>10}{'Appels':>9}{'Gaspillés':>11}{'Réessais':>10}{'Admin':>7}",
+    ]
+    for r in results:
+        lines.append(
+            f"{r['users']:>12}{r['seconds']:>8.1f}s{r['rate']:>9.1f}"
+            f"{r['p50']*1000:>6.0f}ms{r['p95']*1000:>6.0f}ms{r['p99']*1000:>6.0f}ms"
+            f"{r['peak_mb']:>8.1f}Mo{r['calls']:>9}{r['wasted']:>11}{r['retried']:>10}{r['admin_calls']:>7}"
+        )
+    if results:
+        pool = results[-1]['pool']
+        lines.append(
+            f"Pool de diffusion (cumul) : {pool['size']} connexions, {pool['requests']} requêtes, "
+            f"{pool['waited']} ont attendu (p95 {pool['wait_p95']*1000:.0f} ms, max {pool['wait_max']*1000:.0f} ms), "
+            f"{pool['timeouts']} délais dépassés"
+        )
+    codes = ", ".join(f"{code}: {count}" for code, count in sorted(results[-1]['codes'].items())) if results else ""
+    lines.append(f"Codes HTTP (dernière taille) : {codes}")
+    lines.append("Mémoire : " + ("pic des allocations Python" if args.tracemalloc else "RSS maximal du processus"))
+    return "\n".join(lines)
+
+
+async def run(args):
+    from telegram.ext import Application
+
+    from config.settings import Config
+    from core.app import Services
+    from core.gateway import OutboundGateway
+    from core.transport import POOL_BULK, POOL_INTERACTIVE, TransportRouter, build_request
+    from utils.database import Database
+
+    work_dir = tempfile.mkdtemp(prefix="broadcast_bench_")
+    database = Database(os.path.join(work_dir, "bench.db"))
+    server = await FakeBotApiProcess(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, forbidden_rate=args.forbidden_rate,
+        flood_rate=args.flood_rate, rate_limit=args.server_limit, retry_after=args.retry_after,
+        max_upload_mb=args.max_upload_mb, uplink_mbps=args.uplink_mbps, admin_id=Config.ADMIN_ID
+    ).start()
+
+    gateway = OutboundGateway(global_rate=args.global_rate or args.rate, admin_ids=(Config.ADMIN_ID,))
+    transport = TransportRouter(
+        build_request(Config, POOL_INTERACTIVE), build_request(Config, POOL_BULK),
+        Config.HTTP_POOL_SIZE, Config.HTTP_BULK_POOL_SIZE, pool_timeout=Config.HTTP_POOL_TIMEOUT,
+        media_read_timeout=Config.HTTP_MEDIA_READ_TIMEOUT
+    )
+    app = (
+        Application.builder()
+        .token("123456:BENCHMARK")
+        .base_url(server.base_url)
+        .base_file_url(server.base_url)
+        .request(transport)
+        .rate_limiter(gateway)
+        .build()
+    )
+    coupon_system = Services(Config, database).coupon_system
+    coupon_system.broadcast_rate = args.rate
+    coupon_system.broadcast_jobs.max_concurrency = args.max_concurrency
+    coupon_system.progress_interval = args.progress_interval
+
+    results = []
+    await app.initialize()
+    try:
+        for users in args.sizes:
+            results.append(await run_size(app, coupon_system, database, server, args, users, work_dir))
+            results[-1]['pool'] = transport.stats()[POOL_BULK]
+            print(f"  {users} utilisateurs : {results[-1]['seconds']:.1f}s", flush=True)
+    finally:
+        await app.shutdown()
+        await server.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la diffusion contre un faux serveur Bot API")
+    parser.add_argument('--sizes', default="1000,10000,100000",
+                        type=lambda value: [int(size) for size in value.split(',')])
+    parser.add_argument('--rate', type=float, default=2000.0,
+                        help="Débit cible de la diffusion (msg/s) ; 25 pour reproduire la production")
+    parser.add_argument('--global-rate', type=float, help="Débit global de la passerelle (défaut : --rate)")
+    parser.add_argument('--max-concurrency', type=int, default=32)
+    parser.add_argument('--progress-interval', type=float, default=5.0)
+    parser.add_argument('--latency-ms', type=float, default=40.0)
+    parser.add_argument('--jitter-ms', type=float, default=20.0)
+    parser.add_argument('--forbidden-rate', type=float, default=0.05, help="Fraction d'utilisateurs ayant bloqué le bot")
+    parser.add_argument('--flood-rate', type=float, default=0.001, help="Probabilité d'un 429 par envoi")
+    parser.add_argument('--server-limit', type=float, help="Envois/seconde au-delà desquels le serveur répond 429")
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--media', choices=('text', 'photo', 'video'), default='text')
+    parser.add_argument('--file-mb', type=float, default=1.0, help="Taille du média synthétique")
+    parser.add_argument('--max-upload-mb', type=float, default=50.0, help="Au-delà : 413 Request Entity Too Large")
+    parser.add_argument('--uplink-mbps', type=float, default=100.0)
+    parser.add_argument('--tracemalloc', action='store_true', help="Pic des allocations Python plutôt que le RSS")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    results = asyncio.run(run(args))
+    print(format_results(results, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Faux serveur de l'API Bot, en local, pour mesurer le bot sans toucher de vrais utilisateurs.
+
+Le serveur parle juste assez HTTP/1.1 (keep-alive, Content-Length) pour
+python-telegram-bot : il suffit de construire le bot avec
+`base_url=server.base_url`. Il injecte une latence configurable, des 429
+(RetryAfter) aléatoires ou au-delà d'un débit maximal, des 403 (bot bloqué)
+pour une fraction déterministe des chats, et des 413 pour les uploads trop
+gros ; le temps d'upload suit la bande passante montante simulée.
+
+`FakeBotApiProcess` lance le serveur dans un processus à part, pour que son
+coût CPU ne fausse pas les mesures du client ; ses compteurs se lisent via
+GET /__stats et se remettent à zéro via POST /__reset.
+"""
+import asyncio
+import json
+import multiprocessing
+import random
+import re
+import time
+from collections import Counter, deque
+
+CHAT_ID_PATTERN = re.compile(rb'chat_id(?:=|"\r\n\r\n)(-?\d+)')
+
+STATUS_LINES = {
+    200: "200 OK",
+    400: "400 Bad Request",
+    403: "403 Forbidden",
+    404: "404 Not Found",
+    413: "413 Request Entity Too Large",
+    429: "429 Too Many Requests",
+}
+
+
+class FakeBotApi:
+    """Serveur HTTP asyncio imitant api.telegram.org"""
+
+    def __init__(self, latency_ms=40.0, jitter_ms=20.0, forbidden_rate=0.05, flood_rate=0.0,
+                 rate_limit=None, retry_after=1, max_upload_mb=50.0, uplink_mbps=100.0,
+                 admin_id=None, seed=42):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.forbidden_rate = forbidden_rate  # Fraction des chats qui ont bloqué le bot
+        self.flood_rate = flood_rate  # Probabilité d'un 429 sur un envoi
+        self.rate_limit = rate_limit  # Envois/seconde au-delà desquels le serveur répond 429
+        self.retry_after = retry_after
+        self.max_upload_bytes = max_upload_mb * 1024 * 1024
+        self.uplink = uplink_mbps * 1_000_000 / 8  # Octets/seconde
+        self.admin_id = str(admin_id) if admin_id is not None else None
+        self.random = random.Random(seed)
+        self.server = None
+        self.port = None
+        self.recent = deque()
+        self.message_id = 0
+        self.calls = Counter()  # (méthode, code HTTP) -> nombre d'appels
+        self.admin_calls = Counter()  # méthode -> appels vers le chat admin
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}/bot"
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle_connection, '127.0.0.1', 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    def reset(self):
+        self.calls.clear()
+        self.admin_calls.clear()
+        self.recent.clear()
+
+    def snapshot(self):
+        return {
+            'calls': [[method, code, count] for (method, code), count in self.calls.items()],
+            'admin_calls': dict(self.admin_calls),
+        }
+
+    def is_forbidden(self, chat_id):
+        """Blocage déterministe : le même chat est bloqué d'une diffusion à l'autre"""
+        return (int(chat_id) * 2654435761) % 10000 < self.forbidden_rate * 10000
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                method = request_line.split()[1].decode().rsplit('/', 1)[-1]
+                if method == '__stats':
+                    code, payload = 200, self.snapshot()
+                elif method == '__reset':
+                    self.reset()
+                    code, payload = 200, {'ok': True}
+                else:
+                    code, payload = await self._respond(method, body)
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {STATUS_LINES[code]}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _flooded(self):
+        if self.flood_rate and self.random.random() < self.flood_rate:
+            return True
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        while self.recent and now - self.recent[0] > 1.0:
+            self.recent.popleft()
+        if len(self.recent) >= self.rate_limit:
+            return True
+        self.recent.append(now)
+        return False
+
+    async def _respond(self, method, body):
+        match = CHAT_ID_PATTERN.search(body)
+        chat_id = int(match.group(1)) if match else None
+        is_admin = chat_id is not None and str(chat_id) == self.admin_id
+        if is_admin:
+            self.admin_calls[method] += 1
+
+        delay = self.latency + self.random.random() * self.jitter
+        if method in ('sendPhoto', 'sendVideo', 'sendDocument', 'editMessageMedia') and len(body) > 4096:
+            # Upload multipart : le temps suit la taille envoyée
+            delay += len(body) / self.uplink
+        await asyncio.sleep(delay)
+
+        code, payload = self._result(method, body, chat_id, is_admin)
+        self.calls[(method, code)] += 1
+        return code, payload
+
+    def _result(self, method, body, chat_id, is_admin):
+        if method == 'getMe':
+            return 200, {'ok': True, 'result': {'id': 1, 'is_bot': True, 'first_name': 'Bench', 'username': 'bench_bot'}}
+        if method == 'getUpdates':
+            return 200, {'ok': True, 'result': []}
+        if method not in ('sendMessage', 'sendPhoto', 'sendVideo', 'editMessageText', 'editMessageMedia', 'deleteMessage'):
+            return 200, {'ok': True, 'result': True}
+
+        if len(body) > self.max_upload_bytes:
+            return 413, {'ok': False, 'error_code': 413, 'description': 'Request Entity Too Large'}
+        if chat_id is not None and not is_admin and self.is_forbidden(chat_id):
+            return 403, {'ok': False, 'error_code': 403, 'description': 'Forbidden: bot was blocked by the user'}
+        if method.startswith('send') and self._flooded():
+            return 429, {
+                'ok': False, 'error_code': 429,
+                'description': f'Too Many Requests: retry after {self.retry_after}',
+                'parameters': {'retry_after': self.retry_after}
+            }
+        if method == 'deleteMessage':
+            return 200, {'ok': True, 'result': True}
+
+        self.message_id += 1
+        message = {
+            'message_id': self.message_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id or 0, 'type': 'private'},
+        }
+        file_id = f"FAKE{self.message_id}"
+        if method in ('sendPhoto', 'editMessageMedia'):
+            message['photo'] = [{'file_id': file_id, 'file_unique_id': file_id, 'width': 1280, 'height': 720}]
+        elif method == 'sendVideo':
+            message['video'] = {
+                'file_id': file_id, 'file_unique_id': file_id, 'width': 1280, 'height': 720, 'duration': 10,
+                'thumbnail': {'file_id': file_id + 'T', 'file_unique_id': file_id + 'T', 'width': 320, 'height': 180}
+            }
+        else:
+            message['text'] = 'ok'
+        return 200, {'ok': True, 'result': message}
+
+
+def _serve(options, ready):
+    async def serve():
+        server = await FakeBotApi(**options).start()
+        ready.put(server.port)
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+class FakeBotApiProcess:
+    """Le même serveur, dans un processus séparé"""
+
+    def __init__(self, **options):
+        self.options = options
+        self.process = None
+        self.port = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}/bot"
+
+    async def start(self):
+        ready = multiprocessing.Queue()
+        self.process = multiprocessing.Process(target=_serve, args=(self.options, ready), daemon=True)
+        self.process.start()
+        self.port = await asyncio.to_thread(ready.get, True, 10)
+        return self
+
+    async def stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            await asyncio.to_thread(self.process.join, 5)
+
+    async def _control(self, method, action):
+        import httpx
+
+        async with httpx.AsyncClient() as client:
+            response = await client.request(method, f"{self.base_url}/{action}")
+            return response.json()
+
+    async def stats(self):
+        """Compteurs du serveur : ({(méthode, code): appels}, {méthode: appels admin})"""
+        snapshot = await self._control('GET', '__stats')
+        calls = Counter({(method, code): count for method, code, count in snapshot['calls']})
+        return calls, Counter(snapshot['admin_calls'])
+
+    async def reset(self):
+        await self._control('POST', '__reset')
@@ -0,0 +1,126 @@
+"""
+Appels à l'API Bot par manche de jeu, en mode "resend" (suppression + nouvel
+envoi) et en mode "edit" (modification sur place du message précédent).
+
+Chaque jeu part de son menu (message texte), puis l'utilisateur enchaîne les
+manches en touchant « Rejouer » sous le dernier message reçu. Les appels sont
+comptés par le faux serveur de l'API Bot (benchmarks/fake_bot_api.py), sans
+aucun envoi réel.
+
+Utilisation :
+    python -m benchmarks.game_rounds
+    python -m benchmarks.game_rounds --games crash,thimbles --rounds 50
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from collections import Counter
+
+from telegram import Update
+from telegram.ext import Application, CallbackContext
+
+from benchmarks.fake_bot_api import FakeBotApi
+
+USER_ID = 4242
+
+
+def _callback_update(update_id, message, data, bot):
+    return Update.de_json({
+        'update_id': update_id,
+        'callback_query': {
+            'id': str(update_id),
+            'from': {'id': USER_ID, 'is_bot': False, 'first_name': 'Bench'},
+            'chat_instance': 'bench',
+            'data': data,
+            'message': message.to_dict(),
+        }
+    }, bot)
+
+
+async def run_game(app, server, game, rounds, edit):
+    game.edit_rounds = edit
+    table = game.outcome_table
+    shown = []
+    show = table.show
+
+    async def capture(*args, **kwargs):
+        message = await show(*args, **kwargs)
+        shown.append(message)
+        return message
+
+    # Menu du jeu : message texte, comme après start_game
+    message = await app.bot.send_message(USER_ID, "menu")
+    table.show = capture
+    calls = Counter()
+    start = time.perf_counter()
+    try:
+        for round_number in range(rounds):
+            update = _callback_update(round_number + 1, message, game.play_callback, app.bot)
+            context = CallbackContext.from_update(update, app)
+            before = Counter(server.calls)
+            await update.callback_query.answer()
+            await game.play_round(update, context, USER_ID)
+            calls.update(Counter(server.calls) - before)
+            message = shown[-1] if shown[-1] is not True else message
+    finally:
+        table.show = show
+    return calls, time.perf_counter() - start
+
+
+def format_results(results, rounds):
+    lines = [
+        f"Appels à l'API Bot par manche ({rounds} manches, la première part du menu texte)",
+        f"{'Jeu':<14}{'Mode':<8}{'Appels/manche':>14}{'ms/manche':>11}  Détail",
+    ]
+    for name, mode, calls, elapsed in results:
+        total = sum(calls.values())
+        detail = ", ".join(f"{method} {count / rounds:.2f}" for (method, code), count in sorted(calls.items()))
+        lines.append(f"{name:<14}{mode:<8}{total / rounds:>14.2f}{elapsed / rounds * 1000:>11.1f}  {detail}")
+    return "\n".join(lines)
+
+
+async def run(args):
+    from config.settings import Config
+    from core.app import Services
+    from utils.database import Database
+
+    database = Database(os.path.join(tempfile.mkdtemp(prefix="game_rounds_"), "bench.db"))
+    database.update_user(USER_ID, {'language': 'fr'})
+    server = await FakeBotApi(latency_ms=args.latency_ms, jitter_ms=0, forbidden_rate=0).start()
+    app = Application.builder().token("123456:BENCHMARK").base_url(server.base_url).updater(None).build()
+    services = Services(Config, database)
+    game_manager = services.game_manager
+
+    results = []
+    await app.initialize()
+    try:
+        for key in args.games:
+            game = game_manager.games[key]
+            for mode in ('resend', 'edit'):
+                calls, elapsed = await run_game(app, server, game, args.rounds, mode == 'edit')
+                results.append((key, mode, calls, elapsed))
+    finally:
+        await app.shutdown()
+        await server.stop()
+        services.render_service.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Appels à l'API Bot par manche de jeu (resend vs edit)")
+    parser.add_argument('--games', default="crash,thimbles,casino_mines",
+                        type=lambda value: value.split(','))
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--latency-ms', type=float, default=40.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    results = asyncio.run(run(args))
+    print(format_results(results, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Démarrage à froid du bot : profil des imports et temps jusqu'au polling.
+
+Chaque mesure lance un nouvel interpréteur, qui importe core.app, construit
+les services puis l'application, et démarre le long polling contre le faux
+serveur de l'API Bot (benchmarks/fake_bot_api.py) sur une copie de la base.
+Le bot est « prêt » quand le premier getUpdates peut partir (getMe et
+deleteWebhook faits, diffusions reprises, serveur /healthz à l'écoute).
+
+Le profil des imports (python -X importtime) liste les modules les plus
+coûteux et vérifie que les dépendances lourdes (OpenCV, Pillow, numpy) ne
+sont pas chargées au démarrage.
+
+Utilisation :
+    python -m benchmarks.startup_bench
+    python -m benchmarks.startup_bench --runs 10 --top 25
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+HEAVY_MODULES = ('cv2', 'PIL', 'numpy')
+PHASES = ('interpreter', 'imports', 'services', 'application', 'ready')
+
+
+async def _child(api_url, db_path, spawned_at):
+    """Un démarrage mesuré (dans le processus enfant) ; imprime les durées en JSON"""
+    timings = {'interpreter': time.time() - spawned_at}
+
+    start = time.perf_counter()
+    from config.settings import Config
+    from core.app import Services, create_application
+    from utils.database import Database
+    timings['imports'] = time.perf_counter() - start
+
+    Config.BOT_TOKEN = "123456:STARTUP"
+    Config.BOT_API_URL = api_url
+    Config.HTTP_HOST, Config.HTTP_PORT = "127.0.0.1", 0
+    Config.RUN_MODE = "polling"
+
+    start = time.perf_counter()
+    services = Services(Config, Database(db_path))
+    timings['services'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    app, http_server = create_application(Config, services)
+    timings['application'] = time.perf_counter() - start
+
+    # Même séquence que run_polling, jusqu'au premier getUpdates
+    start = time.perf_counter()
+    await app.initialize()
+    await app.post_init(app)
+    await app.updater.start_polling(poll_interval=0, timeout=0)
+    await app.start()
+    timings['ready'] = time.perf_counter() - start
+
+    timings['heavy_modules'] = [name for name in HEAVY_MODULES if name in sys.modules]
+    await app.updater.stop()
+    await app.stop()
+    await app.shutdown()
+    await app.post_shutdown(app)
+    print(json.dumps(timings))
+
+
+async def measure(runs, latency_ms):
+    from benchmarks.fake_bot_api import FakeBotApi
+
+    server = await FakeBotApi(latency_ms=latency_ms, jitter_ms=0, forbidden_rate=0).start()
+    api_url = server.base_url[:-len("/bot")]
+    workdir = tempfile.mkdtemp(prefix="startup_bench_")
+    results = []
+    try:
+        for run in range(runs):
+            db_path = os.path.join(workdir, f"run{run}.db")
+            if os.path.exists("data/database.db"):
+                shutil.copyfile("data/database.db", db_path)
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, "-m", "benchmarks.startup_bench",
+                "--child", api_url, db_path, repr(time.time()),
+                stdout=asyncio.subprocess.PIPE
+            )
+            stdout, _ = await process.communicate()
+            if process.returncode != 0:
+                raise RuntimeError(f"Démarrage {run + 1} en échec (code {process.returncode})")
+            results.append(json.loads(stdout.decode().strip().splitlines()[-1]))
+    finally:
+        await server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def import_profile(module="core.app"):
+    """(module, cumul en secondes) de chaque import, d'après python -X importtime"""
+    import subprocess
+
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True
+    ).stderr
+    profile = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        profile.append((name.strip(), int(cumulative) / 1e6))
+    return profile
+
+
+def format_profile(profile, top, module="core.app"):
+    cumulative = dict(profile)
+    lines = [f"Import de {module} : {cumulative.get(module, 0.0) * 1000:.0f} ms ({len(profile)} modules)",
+             f"{'Module':<48}{'Cumul (ms)':>12}"]
+    for name, elapsed in sorted(profile, key=lambda item: item[1], reverse=True)[:top]:
+        lines.append(f"{name[:48]:<48}{elapsed * 1000:>12.1f}")
+    loaded = [name for name in HEAVY_MODULES if name in cumulative]
+    lines.append("Dépendances lourdes importées : " + (", ".join(loaded) if loaded else "aucune"))
+    return "\n".join(lines)
+
+
+def format_results(results):
+    lines = [f"Démarrage à froid ({len(results)} lancements, médiane / max en ms)"]
+    total = [sum(result[phase] for phase in PHASES) for result in results]
+    for phase in PHASES:
+        values = [result[phase] for result in results]
+        lines.append(f"{phase:<14}{statistics.median(values) * 1000:>8.0f}{max(values) * 1000:>8.0f}")
+    lines.append(f"{'total':<14}{statistics.median(total) * 1000:>8.0f}{max(total) * 1000:>8.0f}")
+    heavy = sorted({name for result in results for name in result['heavy_modules']})
+    lines.append("Dépendances lourdes chargées au polling : " + (", ".join(heavy) if heavy else "aucune"))
+    return "\n".join(lines)
+
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == "--child":
+        import logging
+
+        logging.basicConfig(level=logging.CRITICAL)
+        asyncio.run(_child(sys.argv[2], sys.argv[3], float(sys.argv[4])))
+        return
+
+    parser = argparse.ArgumentParser(description="Démarrage à froid du bot (imports et temps jusqu'au polling)")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help="Modules les plus coûteux à afficher")
+    parser.add_argument('--latency-ms', type=float, default=40.0, help="Latence de l'API Bot simulée")
+    args = parser.parse_args()
+
+    print(format_profile(import_profile(), args.top))
+    print()
+    print(format_results(asyncio.run(measure(args.runs, args.latency_ms))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark du temps d'upload des médias originaux vs optimisés.
+
+Sans paramètre, estime le temps d'upload par jeu pour un débit montant donné.
+Avec --chat-id (et TOKEN dans l'environnement), envoie réellement un échantillon
+de photos à ce chat via l'API Bot, mesure le temps de chaque `send_photo`
+puis supprime les messages.
+
+Utilisation :
+    python -m utils.media_optimizer
+    python -m benchmarks.upload_benchmark --uplink-mbps 5
+    python -m benchmarks.upload_benchmark --chat-id 123456 --samples 3
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from collections import defaultdict
+
+from utils.media_optimizer import MEDIA_ROOT, read_manifest
+
+
+def _group_of(source_path):
+    parts = os.path.relpath(source_path, MEDIA_ROOT).split(os.sep)
+    return parts[1] if parts[0] == "games" and len(parts) > 2 else parts[0]
+
+
+def estimate(manifest, uplink_mbps, rtt_ms):
+    """Estimer le temps d'upload moyen (original vs optimisé) par jeu"""
+    bytes_per_second = uplink_mbps * 1_000_000 / 8
+    groups = defaultdict(lambda: {'original': [], 'optimized': []})
+    for source_path, entry in manifest.items():
+        group = groups[_group_of(source_path)]
+        group['original'].append(rtt_ms / 1000 + entry['source_bytes'] / bytes_per_second)
+        group['optimized'].append(rtt_ms / 1000 + entry['serve_bytes'] / bytes_per_second)
+    return groups
+
+
+async def measure(manifest, chat_id, samples):
+    """Mesurer le temps réel de send_photo (original vs optimisé) sur un échantillon"""
+    from telegram import Bot
+    from config.settings import Config
+
+    by_group = defaultdict(list)
+    for source_path, entry in manifest.items():
+        by_group[_group_of(source_path)].append((source_path, entry))
+
+    groups = defaultdict(lambda: {'original': [], 'optimized': []})
+    async with Bot(Config.BOT_TOKEN) as bot:
+        for group, entries in by_group.items():
+            for source_path, entry in entries[:samples]:
+                for kind, path in (('original', source_path), ('optimized', entry['serve'])):
+                    with open(path, 'rb') as photo:
+                        start = time.perf_counter()
+                        message = await bot.send_photo(chat_id=chat_id, photo=photo, disable_notification=True)
+                        groups[group][kind].append(time.perf_counter() - start)
+                    await bot.delete_message(chat_id=chat_id, message_id=message.message_id)
+    return groups
+
+
+def format_results(groups, title):
+    lines = [title, f"{'Groupe':<18}{'Original':>12}{'Optimisé':>12}{'Gain':>9}"]
+    for group, timings in sorted(groups.items()):
+        original = statistics.mean(timings['original'])
+        optimized = statistics.mean(timings['optimized'])
+        gain = (original - optimized) / original * 100 if original else 0
+        lines.append(f"{group:<18}{original*1000:>10.0f}ms{optimized*1000:>10.0f}ms{gain:>8.1f}%")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark d'upload des médias")
+    parser.add_argument('--uplink-mbps', type=float, default=10.0)
+    parser.add_argument('--rtt-ms', type=float, default=80.0)
+    parser.add_argument('--chat-id', help="Chat de test pour une mesure réelle via l'API Bot")
+    parser.add_argument('--samples', type=int, default=3, help="Nombre d'images mesurées par jeu")
+    args = parser.parse_args()
+
+    manifest = read_manifest()
+    if not manifest:
+        print("Manifeste introuvable : lancez d'abord `python -m utils.media_optimizer`")
+        return
+
+    if args.chat_id:
+        groups = asyncio.run(measure(manifest, args.chat_id, args.samples))
+        print(format_results(groups, f"Temps moyen de send_photo mesuré ({args.samples} images/jeu)"))
+    else:
+        groups = estimate(manifest, args.uplink_mbps, args.rtt_ms)
+        print(format_results(groups, f"Temps d'upload estimé ({args.uplink_mbps} Mbit/s, RTT {args.rtt_ms:.0f} ms)"))
+
+
+if __name__ == "__main__":
+    main()
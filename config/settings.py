@@ -31,6 +31,62 @@ class Config:
     PREDICTION_COOLDOWN = 40
     GAME_COOLDOWN = 30
     
+    # Manches de jeu : "edit" (le message de la manche précédente est modifié, 1 appel) ou "resend"
+    GAME_ROUND_MODE = os.environ.get("GAME_ROUND_MODE", "edit")
+    
     # Referral system
     REFERRAL_BONUS = 1000
-    MIN_REFERRALS_FOR_BONUS = 5
\ No newline at end of file
+    MIN_REFERRALS_FOR_BONUS = 5
+    
+    # Rendu d'images (pool de processus)
+    RENDER_WORKERS = int(os.environ.get("RENDER_WORKERS", os.cpu_count() or 1))
+    RENDER_QUEUE_SIZE = 32  # Rendus en attente au-delà desquels on sert l'image générique
+    RENDER_TIMEOUT = 5.0  # Délai maximal d'un rendu (secondes)
+    
+    # Ingestion des médias de coupons (téléchargements/analyses simultanés)
+    MEDIA_INGEST_WORKERS = 2
+    
+    # Diffusion des coupons
+    BROADCAST_RATE = 25  # Messages/seconde (limite Telegram ~30/s)
+    BROADCAST_MAX_CONCURRENCY = 32  # Envois simultanés maximum
+    BROADCAST_PROGRESS_INTERVAL = 5.0  # Secondes entre deux éditions du message de suivi
+    
+    # Passerelle sortante (tous les appels à l'API Bot)
+    GATEWAY_GLOBAL_RATE = 30  # Messages/seconde, tous chats confondus
+    GATEWAY_CHAT_RATE = 1.0  # Messages/seconde dans un chat privé
+    GATEWAY_CHAT_BURST = 3  # Rafale tolérée dans un chat privé
+    GATEWAY_GROUP_RATE = 20 / 60  # Messages/seconde dans un groupe (20/minute)
+    
+    # Serveur de l'API Bot (vide : api.telegram.org), ex. un serveur telegram-bot-api local
+    BOT_API_URL = os.environ.get("BOT_API_URL", "")
+    
+    # Transport HTTP vers l'API Bot : un pool pour les réponses interactives, un pour la masse et les médias
+    HTTP_POOL_SIZE = 32  # Connexions du pool interactif
+    HTTP_BULK_POOL_SIZE = 64  # Connexions du pool de diffusion / uploads (>= BROADCAST_MAX_CONCURRENCY)
+    HTTP2 = os.environ.get("HTTP2", "").lower() in ("1", "true")  # Nécessite python-telegram-bot[http2]
+    HTTP_KEEPALIVE_CONNECTIONS = 20  # Connexions gardées ouvertes par pool
+    HTTP_KEEPALIVE_EXPIRY = 30  # Secondes avant de fermer une connexion inactive
+    HTTP_CONNECT_TIMEOUT = 5
+    HTTP_POOL_TIMEOUT = 5  # Attente maximale d'une connexion libre
+    HTTP_READ_TIMEOUT = 10
+    HTTP_WRITE_TIMEOUT = 10
+    HTTP_BULK_READ_TIMEOUT = 20
+    HTTP_BULK_WRITE_TIMEOUT = 20
+    HTTP_MEDIA_READ_TIMEOUT = 60  # Uploads : Telegram répond une fois le fichier traité
+    HTTP_MEDIA_WRITE_TIMEOUT = 300  # Uploads jusqu'à 50 Mo sur une liaison lente
+    
+    # Traitement des updates : en parallèle entre utilisateurs, dans l'ordre pour un même utilisateur
+    UPDATE_WORKERS = 16  # Updates traités simultanément
+    UPDATE_MAX_PENDING = 1024  # Updates acceptés (en cours + en attente de leur utilisateur)
+    
+    # Réception des updates : "polling" (défaut) ou "webhook"
+    RUN_MODE = os.environ.get("RUN_MODE", "polling")
+    POLLING_TIMEOUT = 30  # Long polling : secondes d'attente d'un update côté Telegram
+    # Serveur HTTP du bot (webhook, /healthz, /readyz) ; vide : toutes les interfaces (127.0.0.1 pour les restreindre)
+    HTTP_HOST = os.environ.get("HTTP_HOST", "")
+    HTTP_PORT = int(os.environ.get("PORT", 8090))
+    WEBHOOK_URL = os.environ.get("WEBHOOK_URL", "")  # URL publique (https://...) ; vide : tests locaux
+    WEBHOOK_PATH = "telegram"
+    WEBHOOK_SECRET = os.environ.get("WEBHOOK_SECRET", "")  # Vide : secret aléatoire à chaque démarrage
+    WEBHOOK_MAX_CONNECTIONS = 40
+    WEBHOOK_RECORD_PATH = os.environ.get("WEBHOOK_RECORD_PATH")  # Enregistrer les updates reçus (JSONL)
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityTracker:
+    """Mise à jour de users.last_seen, regroupée pour ne pas écrire en base à chaque update.
+
+    Les activités en attente sont écrites toutes les `flush_interval` secondes
+    par une tâche périodique (JobQueue), même sans nouvel update, et à l'arrêt.
+    """
+
+    def __init__(self, database, flush_interval=60, resolution=3600):
+        self.database = database
+        self.flush_interval = flush_interval  # Secondes entre deux écritures groupées
+        self.resolution = resolution  # Un utilisateur n'est réécrit qu'une fois par période
+        self.pending = {}
+        self.last_written = {}  # user_id -> instant de la dernière activité notée (période en cours)
+        self.last_flush = time.monotonic()
+        self._task = None
+
+    def start(self, application):
+        """Programmer l'écriture périodique (au démarrage de l'application)"""
+        if application.job_queue is None:
+            # python-telegram-bot installé sans l'extra [job-queue] : simple tâche asyncio
+            self._task = asyncio.create_task(self._flush_forever())
+            return
+        application.job_queue.run_repeating(
+            self._flush_job, interval=self.flush_interval, first=self.flush_interval, name="activity_flush"
+        )
+
+    async def _flush_job(self, context):
+        self.flush()
+
+    async def _flush_forever(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
+
+    def stop(self):
+        """Arrêter l'écriture périodique et écrire les dernières activités (à l'arrêt)"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.flush()
+
+    async def track_update(self, update, context):
+        """Handler (groupe -2) : noter l'activité de l'auteur de l'update"""
+        user = update.effective_user
+        if user is None:
+            return
+        user_id = str(user.id)
+        now = time.monotonic()
+        if now - self.last_written.get(user_id, -self.resolution) >= self.resolution:
+            self.pending[user_id] = datetime.now().isoformat()
+            self.last_written[user_id] = now
+        if self.pending and now - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        pending, self.pending = self.pending, {}
+        now = self.last_flush = time.monotonic()
+        # Les utilisateurs dont la période est écoulée seraient réécrits de toute façon : inutile de les garder
+        self.last_written = {
+            user_id: seen for user_id, seen in self.last_written.items() if now - seen < self.resolution
+        }
+        if not pending:
+            return
+        try:
+            self.database.touch_users_last_seen(pending)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'enregistrement de l'activité: {e}")
@@ -0,0 +1,233 @@
+import asyncio
+import logging
+
+from telegram import Update
+from telegram.ext import Application, CommandHandler, MessageHandler, TypeHandler, filters
+
+from core.activity import ActivityTracker
+from core.couponSend import CouponSend
+from core.gateway import build_gateway
+from core.media_ingest import build_media_ingestor
+from core.navigation import Navigation
+from core.question import Question
+from core.reachability import Reachability
+from core.referral import ReferralSystem
+from core.router import CallbackRouter
+from core.transport import build_transport, build_updates_request
+from core.tutorials import Tutorial
+from core.updates import UserUpdateProcessor
+from core.verification import GroupVerification
+from core.webhook import WebhookServer, http_host, run_webhook, webhook_secret
+from games.game_manager import GameManager
+from games.outcome_table import OutcomeTable
+from utils.database import Database
+from utils.render_service import build_render_service
+
+logger = logging.getLogger(__name__)
+
+
+class Services:
+    """Graphe des services du bot, construit une seule fois par application.
+
+    Chaque service existe en un seul exemplaire et reçoit les autres par
+    injection : les états de conversation (question en attente, coupon en
+    cours de création, diffusions...) ne sont jamais dupliqués. Il n'y a pas
+    de singleton de module : deux Services d'un même processus (tests,
+    benchmarks) ne partagent ni passerelle, ni pool de rendu, ni file_id.
+    """
+
+    def __init__(self, config, database=None):
+        self.config = config
+        self.database = database or Database()
+
+        # Infrastructure : passerelle sortante, transport HTTP, rendu, médias
+        self.gateway = build_gateway(config)
+        self.transport = build_transport(config)
+        self.render_service = build_render_service(config)
+        self.outcome_table = OutcomeTable()
+        self.media_ingestor = build_media_ingestor(config, self.database)
+        self.reachability = Reachability(self.database)
+
+        self.activity = ActivityTracker(self.database)
+        self.question_system = Question(config, self.database)
+        self.coupon_system = CouponSend(config, self.database, self)
+        self.tutorial_system = Tutorial(config, self.database)
+        self.referral = ReferralSystem(config, self.database)
+        self.game_manager = GameManager(config, self.database, self)
+        self.navigation = Navigation(config, self.database, self)
+        self.verification = GroupVerification(config, self.database, self)
+
+
+def create_application(config, services=None):
+    """Construire l'application (transport, passerelle, handlers) et son serveur HTTP"""
+    services = services or Services(config)
+    db = services.database
+    activity = services.activity
+    verification = services.verification
+    referral = services.referral
+    navigation = services.navigation
+    game_manager = services.game_manager
+    question_system = services.question_system
+    coupon_system = services.coupon_system
+
+    webhook_mode = config.RUN_MODE == "webhook"
+
+    async def shutdown_services(application):
+        """Libérer les ressources partagées à l'arrêt du bot"""
+        if not webhook_mode:
+            await http_server.stop()
+        services.render_service.shutdown()
+        activity.stop()
+
+    async def resume_services(application):
+        """Démarrer les tâches de fond : écriture de l'activité, reprise et programmation des diffusions"""
+        if not webhook_mode:
+            # En polling, le serveur HTTP ne sert que /healthz et /readyz
+            await http_server.start(http_host(config), config.HTTP_PORT)
+        activity.start(application)
+        await coupon_system.resume_broadcasts(application)
+
+    builder = (
+        Application.builder()
+        .token(config.BOT_TOKEN)
+        .request(services.transport)
+        .get_updates_request(build_updates_request(config))
+        .rate_limiter(services.gateway)
+        .concurrent_updates(UserUpdateProcessor(config.UPDATE_WORKERS, config.UPDATE_MAX_PENDING))
+        .post_init(resume_services)
+        .post_shutdown(shutdown_services)
+    )
+    if config.BOT_API_URL:
+        # Serveur Bot API local (telegram-bot-api) ou faux serveur des benchmarks
+        builder = builder.base_url(f"{config.BOT_API_URL.rstrip('/')}/bot").base_file_url(
+            f"{config.BOT_API_URL.rstrip('/')}/file/bot"
+        )
+    app = builder.build()
+    http_server = WebhookServer(
+        app,
+        path=config.WEBHOOK_PATH if webhook_mode else None,
+        secret_token=webhook_secret(config) if webhook_mode else None,
+        record_path=config.WEBHOOK_RECORD_PATH
+    )
+
+    async def start_command(update, context):
+        """Gestionnaire de la commande /start"""
+        user_id = update.effective_user.id
+        
+        # Vérifier si c'est un lien de parrainage
+        if context.args:
+            referrer_id = context.args[0]
+            await referral.handle_referral(user_id, referrer_id)
+        await verification.require_group_membership(update, context) 
+        await navigation.show_language_selection(update, context)
+        
+    async def handle_text_message(update, context):
+        """Gestionnaire des messages texte"""
+        user_id = update.effective_user.id
+        text = update.message.text
+        
+        if not verification.is_user_verified(user_id):
+            await verification.require_group_membership(update, context) 
+            return
+        
+        # Vérifier d'abord si l'utilisateur attend d'envoyer un coupon (admin seulement)
+        user_data = db.get_user(user_id)
+        if user_data.get('waiting_for_coupon', False) and str(user_id) == str(config.ADMIN_ID):
+            await coupon_system.handle_coupon_submission(update, context)
+            return
+        
+        if question_system.is_waiting_for_question(user_id):
+            await question_system.handle_question_message(update, context)
+            return
+
+        if game_manager.is_waiting_for_account_id(user_id):
+            await game_manager.handle_account_id_input(update, context, text)
+            return
+            
+        await navigation.handle_menu_selection(update, context, text)
+
+    async def handle_media_message(update, context):
+        """Gestionnaire spécifique pour les messages média (photo/vidéo)"""
+        user_id = update.effective_user.id
+        
+        if not verification.is_user_verified(user_id):
+            await verification.require_group_membership(update, context) 
+            return
+        
+        # Vérifier si l'admin est en train d'envoyer un coupon
+        user_data = db.get_user(user_id)
+        if user_data.get('waiting_for_coupon', False) and str(user_id) == str(config.ADMIN_ID):
+            await coupon_system.handle_coupon_submission(update, context)
+            return
+        
+        # Sinon, message média non attendu
+        await update.message.reply_text("Je ne sais pas quoi faire de ce fichier. Utilisez le menu pour naviguer.")
+
+    # Dernière activité des utilisateurs (segmentation des diffusions)
+    app.add_handler(TypeHandler(Update, activity.track_update), group=-2)
+
+    # Réactiver les utilisateurs injoignables dès qu'ils contactent de nouveau le bot
+    app.add_handler(TypeHandler(Update, services.reachability.track_update), group=-1)
+
+    # Handlers de commandes
+    app.add_handler(CommandHandler("start", start_command))
+    
+    # Commandes admin de pilotage des diffusions
+    app.add_handler(CommandHandler(
+        ["broadcasts", "broadcast_pause", "broadcast_resume", "broadcast_cancel", "broadcast_rate"],
+        coupon_system.handle_broadcast_command
+    ))
+    
+    # Callbacks : un seul handler, aiguillage par dictionnaire
+    router = CallbackRouter()
+    
+    # Navigation
+    router.add(("fr", "en", "ar"), navigation.handle_language_selection)
+    router.add("verify_group", verification.verify_group_membership)
+    router.add("main_menu", navigation.handle_main_menu)
+    router.add_prefix("back_", navigation.handle_back)
+    
+    # Jeux : play:<clé>, game:<clé>, start_game:<clé>
+    router.add("show_games", game_manager.show_games_list)
+    router.add_route("game", game_manager.select_game)
+    router.add_route("start_game", game_manager.start_game)
+    router.add_route("play", game_manager.handle_play)
+    router.add_prefix("game_", game_manager.select_game)
+    router.add_prefix("start_game_", game_manager.start_game)
+    for old, new in game_manager.legacy_callbacks().items():
+        router.alias(old, new)
+    router.alias("start_casino_mines", "start_game:casino_mines")
+    
+    # Parrainage
+    router.add("referral_info", referral.show_referral_info)
+    
+    # Questions
+    router.add("send_question", question_system.start_question_process)
+    router.add("cancel_question", question_system.cancel_question)
+    
+    # Coupons et diffusions
+    router.add("create_coupon", coupon_system.start_coupon_creation)
+    router.add("coupons_all", coupon_system.show_all_daily_coupons)
+    router.add_prefix("segment_", coupon_system.handle_segment_selection)
+    router.add_prefix("when_", coupon_system.handle_schedule_selection)
+    router.add_prefix("spread_", coupon_system.handle_schedule_selection)
+    
+    app.add_handler(router.handler())
+    
+    # Handler pour les messages texte (doit être après les callbacks)
+    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text_message))
+    
+    # Handler séparé pour les médias (photo/vidéo)
+    app.add_handler(MessageHandler(filters.PHOTO | filters.VIDEO | filters.Document.VIDEO, handle_media_message))
+
+    return app, http_server
+
+
+def run_application(config, app, http_server):
+    """Lancer le bot jusqu'à l'arrêt (SIGINT/SIGTERM), en long polling ou en webhook"""
+    logger.info(f"🚀 Bot is running ({config.RUN_MODE})...")
+    if config.RUN_MODE == "webhook":
+        asyncio.run(run_webhook(app, http_server, config))
+    else:
+        # Long polling : Telegram garde la requête ouverte jusqu'au prochain update
+        app.run_polling(poll_interval=0, timeout=config.POLLING_TIMEOUT, allowed_updates=Update.ALL_TYPES)
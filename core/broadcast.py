@@ -0,0 +1,230 @@
+import asyncio
+import heapq
+import inspect
+import logging
+import time
+from collections import deque
+from datetime import timedelta
+
+from telegram.error import BadRequest, RetryAfter, TelegramError
+
+logger = logging.getLogger(__name__)
+
+
+def retry_after_seconds(error):
+    """Délai imposé par Telegram après un RetryAfter, en secondes"""
+    delay = error.retry_after
+    if isinstance(delay, timedelta):
+        return delay.total_seconds()
+    return float(delay)
+
+
+class LiveMessage:
+    """Message de suivi unique, édité sur place au plus une fois par `interval` secondes"""
+
+    def __init__(self, bot, chat_id, message_id=None, interval=5.0, parse_mode="Markdown"):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.interval = interval
+        self.parse_mode = parse_mode
+        self.updated_at = 0.0
+        self.text = None
+
+    def due(self):
+        return time.monotonic() - self.updated_at >= self.interval
+
+    async def update(self, text, force=False):
+        if text == self.text or (not force and not self.due()):
+            return
+        self.updated_at = time.monotonic()
+        self.text = text
+        try:
+            if self.message_id is None:
+                message = await self.bot.send_message(chat_id=self.chat_id, text=text, parse_mode=self.parse_mode)
+                self.message_id = message.message_id
+                return
+            await self.bot.edit_message_text(
+                chat_id=self.chat_id, message_id=self.message_id, text=text, parse_mode=self.parse_mode
+            )
+        except BadRequest as e:
+            if 'not modified' in str(e).lower():
+                return
+            # Message supprimé ou non éditable : en repartir d'un nouveau
+            logger.warning(f"Message de suivi non éditable ({e}), envoi d'un nouveau message")
+            self.message_id = None
+            message = await self.bot.send_message(chat_id=self.chat_id, text=text, parse_mode=self.parse_mode)
+            self.message_id = message.message_id
+        except TelegramError as e:
+            logger.error(f"Mise à jour du message de suivi impossible: {e}")
+
+
+class ThroughputMeter:
+    """Débit réel (envois/seconde) sur une fenêtre glissante"""
+
+    def __init__(self, window=30.0):
+        self.window = window
+        self.events = deque()
+
+    def record(self):
+        now = time.monotonic()
+        self.events.append(now)
+        while self.events and now - self.events[0] > self.window:
+            self.events.popleft()
+
+    def rate(self):
+        now = time.monotonic()
+        while self.events and now - self.events[0] > self.window:
+            self.events.popleft()
+        if not self.events:
+            return 0.0
+        return len(self.events) / max(now - self.events[0], 1.0)
+
+
+class TokenBucket:
+    """Seau à jetons : limite le débit d'envoi à `rate` messages par seconde"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+
+    def set_rate(self, rate):
+        self._refill()
+        self.rate = float(rate)
+        self.capacity = max(1.0, self.rate)
+        self.tokens = min(self.tokens, self.capacity)
+
+    def pause(self, seconds):
+        """Suspendre la distribution de jetons (flood wait global)"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        start = max(self.updated_at, self.paused_until)
+        if now > start:
+            self.tokens = min(self.capacity, self.tokens + (now - start) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            if now < self.paused_until:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+            self._refill()
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return
+            await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+
+class BroadcastEngine:
+    """Envoi de masse au débit cible avec concurrence adaptative.
+
+    `send` est une coroutine `send(recipient)` qui retourne un dict
+    {'status': ...} et laisse remonter les RetryAfter. La fenêtre de
+    concurrence grandit tant que la latence reste sous `target_latency`
+    et est divisée par deux une fois par flood wait ; les destinataires
+    concernés sont remis en file après le délai indiqué par Telegram.
+    """
+
+    def __init__(self, send, rate=25, min_concurrency=1, max_concurrency=32,
+                 target_latency=1.0, max_retries=3):
+        self.send = send
+        self.bucket = TokenBucket(rate)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.concurrency = float(min(max_concurrency, max(min_concurrency, 4)))
+        self.target_latency = target_latency
+        self.max_retries = max_retries
+        self.stats = {'retried': 0}
+        self.stopped = False
+
+    def stop(self):
+        """Arrêter la distribution : les envois en cours se terminent, le reste n'est pas envoyé"""
+        self.stopped = True
+
+    def set_rate(self, rate):
+        self.bucket.set_rate(rate)
+
+    def _on_success_latency(self, latency):
+        if latency <= self.target_latency:
+            # Augmentation additive : +1 par fenêtre complète
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1.0 / self.concurrency)
+        else:
+            self.concurrency = max(self.min_concurrency, self.concurrency * 0.75)
+
+    def _on_flood_wait(self, delay):
+        # Diminution multiplicative une seule fois par flood wait : les envois déjà
+        # en vol reviennent tous en RetryAfter alors que le débit est déjà en pause
+        if time.monotonic() >= self.bucket.paused_until:
+            self.concurrency = max(self.min_concurrency, self.concurrency / 2)
+        self.bucket.pause(delay)
+
+    async def _deliver(self, recipient, attempt):
+        started = time.monotonic()
+        try:
+            result = await self.send(recipient)
+        except RetryAfter as e:
+            return recipient, attempt, None, retry_after_seconds(e)
+        except Exception as e:
+            logger.error(f"Exception lors de l'envoi à {recipient}: {e}")
+            result = {'status': 'error', 'error': str(e)}
+        self._on_success_latency(time.monotonic() - started)
+        return recipient, attempt, result, None
+
+    async def run(self, recipients, on_result=None):
+        """Envoyer à tous les destinataires ; retourne les compteurs par statut"""
+        pending = deque((recipient, 0) for recipient in recipients)
+        delayed = []  # tas (prêt_à, ordre, destinataire, tentative)
+        sequence = 0
+        in_flight = set()
+
+        while pending or delayed or in_flight:
+            if self.stopped:
+                pending.clear()
+                delayed.clear()
+            now = time.monotonic()
+            while delayed and delayed[0][0] <= now:
+                _, _, recipient, attempt = heapq.heappop(delayed)
+                pending.append((recipient, attempt))
+
+            while pending and len(in_flight) < int(self.concurrency) and not self.stopped:
+                await self.bucket.acquire()
+                recipient, attempt = pending.popleft()
+                in_flight.add(asyncio.create_task(self._deliver(recipient, attempt)))
+
+            timeout = None
+            if delayed:
+                timeout = max(0.0, delayed[0][0] - time.monotonic())
+            if not in_flight:
+                if timeout is not None:
+                    await asyncio.sleep(timeout)
+                continue
+
+            done, in_flight = await asyncio.wait(
+                in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                recipient, attempt, result, delay = task.result()
+                if delay is not None:
+                    self._on_flood_wait(delay)
+                    if attempt < self.max_retries:
+                        self.stats['retried'] += 1
+                        sequence += 1
+                        heapq.heappush(delayed, (time.monotonic() + delay, sequence, recipient, attempt + 1))
+                        continue
+                    result = {'status': 'telegram_error', 'error': f'Flood wait ({delay:.0f}s) persistant'}
+
+                status = result.get('status', 'error')
+                self.stats[status] = self.stats.get(status, 0) + 1
+                if on_result is not None:
+                    outcome = on_result(recipient, result)
+                    if inspect.isawaitable(outcome):
+                        await outcome
+
+        return self.stats
@@ -0,0 +1,179 @@
+import json
+import logging
+from datetime import datetime
+
+from core.broadcast import BroadcastEngine
+
+logger = logging.getLogger(__name__)
+
+
+class BroadcastJobs:
+    """Diffusions persistées : curseur (langue, id) sur les utilisateurs, statut par destinataire.
+
+    Les destinataires sont parcourus groupés par langue pour que chaque
+    envoi réutilise une légende déjà rendue dans la langue de la page.
+
+    Le curseur n'avance qu'une fois une page entièrement traitée ; à la
+    reprise, les destinataires de la page déjà présents dans
+    broadcast_deliveries sont ignorés. Les statuts sont écrits par lots de
+    `flush_every` : un arrêt brutal peut renvoyer au plus ce nombre de messages.
+    Les compteurs du rapport viennent de broadcast_deliveries, seuls les
+    réessais (flood wait) et les injoignables exclus d'office sont gardés
+    dans la ligne de la diffusion. Les destinataires bloqués ou disparus
+    sont marqués injoignables et sortent des curseurs suivants.
+
+    Une diffusion programmée reste 'scheduled' jusqu'à son début ; son
+    audience et, si elle est étalée, son débit sont recalculés à ce moment.
+    """
+
+    def __init__(self, config, database, reachability):
+        self.config = config
+        self.database = database
+        self.engines = {}  # job_id -> BroadcastEngine en cours d'exécution
+        self.page_size = 500  # Utilisateurs chargés par page
+        self.flush_every = 20  # Statuts de livraison écrits par lot
+        self.max_concurrency = getattr(config, 'BROADCAST_MAX_CONCURRENCY', 32)
+        self.reachability = reachability
+
+    def create(self, coupon_id, rate=None, segment=None, scheduled_at=None, spread_seconds=0, captions=None):
+        rate = rate or getattr(self.config, 'BROADCAST_RATE', 25)
+        total = self.database.count_segment(segment)
+        # Chaque injoignable exclu est un appel API voué à l'échec évité
+        excluded = self.database.count_segment(segment, reachable_only=False) - total
+        if spread_seconds:
+            rate = self.spread_rate(total, spread_seconds, rate)
+        return self.database.create_broadcast_job(
+            coupon_id, rate, total, stats={'retried': 0, 'unreachable_excluded': excluded}, segment=segment,
+            status='scheduled' if scheduled_at else 'running',
+            scheduled_at=scheduled_at.isoformat() if scheduled_at else None,
+            spread_seconds=spread_seconds, captions=captions
+        )
+
+    @staticmethod
+    def spread_rate(total, spread_seconds, max_rate):
+        """Débit qui répartit `total` envois sur `spread_seconds`, sans dépasser `max_rate`"""
+        return min(max_rate, max(total / spread_seconds, 0.1))
+
+    def get_scheduled(self):
+        return self.database.get_broadcast_jobs(statuses=('scheduled',), limit=100)
+
+    def start_scheduled(self, job_id):
+        """Passer une diffusion programmée à 'running' avec l'audience du moment"""
+        job = self.database.get_broadcast_job(job_id)
+        if job is None or job['status'] != 'scheduled':
+            return False
+        total = self.database.count_segment(job['segment'])
+        excluded = self.database.count_segment(job['segment'], reachable_only=False) - total
+        stats = dict(job['stats'], unreachable_excluded=excluded)
+        updates = {'status': 'running', 'total': total, 'stats': stats}
+        if job['spread_seconds']:
+            updates['rate'] = self.spread_rate(total, job['spread_seconds'], getattr(self.config, 'BROADCAST_RATE', 25))
+        self.database.update_broadcast_job(job_id, updates)
+        return True
+
+    def is_running(self, job_id):
+        return job_id in self.engines
+
+    def get_unfinished(self):
+        return self.database.get_broadcast_jobs(statuses=('running',), limit=100)
+
+    def pause(self, job_id):
+        self.database.update_broadcast_job(job_id, {'status': 'paused'})
+        self._stop_engine(job_id)
+
+    def cancel(self, job_id):
+        self.database.update_broadcast_job(job_id, {'status': 'cancelled', 'finished_at': datetime.now().isoformat()})
+        self._stop_engine(job_id)
+
+    def mark_running(self, job_id):
+        self.database.update_broadcast_job(job_id, {'status': 'running'})
+
+    def set_rate(self, job_id, rate):
+        self.database.update_broadcast_job(job_id, {'rate': rate})
+        engine = self.engines.get(job_id)
+        if engine:
+            engine.set_rate(rate)
+
+    def get_stats(self, job_id):
+        """Compteurs par statut (livraisons enregistrées + réessais cumulés)"""
+        job = self.database.get_broadcast_job(job_id)
+        stats = self.database.get_delivery_stats(job_id)
+        for key in ('retried', 'unreachable_excluded'):
+            stats[key] = job['stats'].get(key, 0) if job else 0
+        return stats
+
+    @staticmethod
+    def _parse_cursor(cursor):
+        """Curseur (langue, id) ; un ancien curseur (id seul) repart du début, le registre évite les doublons"""
+        try:
+            value = json.loads(cursor) if cursor else None
+        except ValueError:
+            return None
+        return tuple(value) if isinstance(value, list) and len(value) == 2 else None
+
+    def _flush(self, job_id, deliveries):
+        self.database.record_deliveries(job_id, deliveries)
+        self.reachability.record_outcomes(deliveries)
+        deliveries.clear()
+
+    def _stop_engine(self, job_id):
+        engine = self.engines.get(job_id)
+        if engine:
+            engine.stop()
+
+    async def run(self, job_id, send, on_result=None, max_retries=3):
+        """Exécuter (ou reprendre) une diffusion depuis son curseur ; retourne (job, stats).
+
+        `send(user_id, language)` est appelée pour chaque destinataire."""
+        job = self.database.get_broadcast_job(job_id)
+        if job is None or job['status'] != 'running' or job_id in self.engines:
+            return job, None
+
+        engine = BroadcastEngine(
+            lambda recipient: send(*recipient),
+            rate=job['rate'],
+            max_concurrency=self.max_concurrency,
+            max_retries=max_retries
+        )
+        self.engines[job_id] = engine
+        job_stats = dict(job['stats'])
+        previous_retries = job_stats.get('retried', 0)
+        cursor = self._parse_cursor(job['cursor'])
+        deliveries = []
+
+        async def record(recipient, result):
+            user_id = recipient[0]
+            deliveries.append((user_id, result['status']))
+            if len(deliveries) >= self.flush_every:
+                self._flush(job_id, deliveries)
+            if on_result is not None:
+                await on_result(user_id, result)
+
+        try:
+            while not engine.stopped:
+                page = self.database.get_broadcast_recipients(cursor, self.page_size, job['segment'])
+                if not page:
+                    break
+
+                delivered = self.database.get_delivered_user_ids(job_id, [user_id for user_id, _ in page])
+                await engine.run([recipient for recipient in page if recipient[0] not in delivered], on_result=record)
+
+                self._flush(job_id, deliveries)
+                if engine.stopped:
+                    break
+
+                last_user_id, last_language = page[-1]
+                cursor = (last_language, last_user_id)
+                job_stats['retried'] = previous_retries + engine.stats['retried']
+                self.database.update_broadcast_job(job_id, {'cursor': json.dumps(list(cursor)), 'stats': job_stats})
+
+            job_stats['retried'] = previous_retries + engine.stats['retried']
+            updates = {'stats': job_stats}
+            if not engine.stopped:
+                updates.update({'status': 'done', 'finished_at': datetime.now().isoformat()})
+            self.database.update_broadcast_job(job_id, updates)
+        finally:
+            self._flush(job_id, deliveries)
+            self.engines.pop(job_id, None)
+
+        return self.database.get_broadcast_job(job_id), self.get_stats(job_id)
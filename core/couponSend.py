@@ -1,26 +1,37 @@
 from datetime import datetime, date
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup, File
-from telegram.error import TelegramError, Forbidden, BadRequest
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, InputMediaPhoto, InputMediaVideo
+from telegram.error import TelegramError, Forbidden, BadRequest, RetryAfter
 import os
+import json
 import asyncio
 import logging
-from PIL import Image
-import cv2
+from core.broadcast import LiveMessage, ThroughputMeter
+from core.broadcast_jobs import BroadcastJobs
+from core.gateway import PRIORITY_BULK
+from core.media_ingest import extract_media_metadata
+from core.schedule import SCHEDULE_PRESETS, SPREAD_PRESETS, build_schedule, spread_seconds
+from core.segments import SEGMENT_PRESETS, build_segment, segment_label
+from utils.helpers import split_language_blocks
 
 logger = logging.getLogger(__name__)
 
 class CouponSend:
-    def __init__(self, config, database):
+    def __init__(self, config, database, services):
         self.config = config
         self.database = database
         self.texts = self._load_texts()
         self.media_path = "media/coupons"
         os.makedirs(self.media_path, exist_ok=True)
+        self.media_ingestor = services.media_ingestor
         
-        self.batch_size = 30  # Taille des batches pour l'envoi
-        self.batch_delay = 1.0  # Délai entre les batches en secondes
-        self.send_delay = 0.03  # Délai minimal entre les envois individuels
-        self.max_retries = 2  # Nombre de tentatives maximum
+        # Diffusion : débit cible et fenêtre de concurrence adaptative
+        self.broadcast_rate = getattr(config, 'BROADCAST_RATE', 25)  # messages/seconde
+        self.broadcast_max_concurrency = getattr(config, 'BROADCAST_MAX_CONCURRENCY', 32)
+        self.max_retries = 3  # Remises en file maximum après un flood wait
+        self.progress_interval = getattr(config, 'BROADCAST_PROGRESS_INTERVAL', 5.0)  # Secondes entre deux éditions du suivi
+        self.broadcast_jobs = BroadcastJobs(config, database, services.reachability)
+        self.daily_bundles = {}  # (date, langue, version des coupons) -> coupons du jour prêts à l'envoi
+        self.pending_broadcasts = {}  # admin_id -> coupon, téléchargement et choix en cours (segment, début)
         
         # Limites Telegram
         self.MAX_VIDEO_SIZE = 50 * 1024 * 1024  # 50 MB
@@ -35,62 +46,6 @@ class CouponSend:
         from utils.helpers import load_texts
         return load_texts()
 
-    def _get_video_info(self, video_path):
-        """Extraire les informations d'une vidéo (durée, dimensions)"""
-        try:
-            cap = cv2.VideoCapture(video_path)
-            if not cap.isOpened():
-                return None
-            
-            # Obtenir les propriétés de la vidéo
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            
-            duration = int(frame_count / fps) if fps > 0 else 0
-            
-            cap.release()
-            
-            return {
-                'duration': duration,
-                'width': width,
-                'height': height
-            }
-        except Exception as e:
-            logger.error(f"Erreur lors de l'extraction des infos vidéo: {e}")
-            return None
-
-    def _generate_video_thumbnail(self, video_path):
-        """Générer une miniature pour la vidéo"""
-        try:
-            cap = cv2.VideoCapture(video_path)
-            if not cap.isOpened():
-                return None
-            
-            # Lire la première frame
-            ret, frame = cap.read()
-            cap.release()
-            
-            if not ret:
-                return None
-            
-            # Convertir BGR to RGB
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            # Créer une miniature
-            thumbnail = Image.fromarray(frame_rgb)
-            thumbnail.thumbnail((320, 240), Image.Resampling.LANCZOS)
-            
-            # Sauvegarder la miniature
-            thumbnail_path = video_path.replace('.mp4', '_thumb.jpg')
-            thumbnail.save(thumbnail_path, 'JPEG', quality=80)
-            
-            return thumbnail_path
-        except Exception as e:
-            logger.error(f"Erreur lors de la génération de miniature: {e}")
-            return None
-
     async def start_coupon_creation(self, update, context):
         """Lancer la création de coupon par l'admin"""
         user_id = update.effective_user.id
@@ -105,7 +60,8 @@ class CouponSend:
             "\n\n📝 **Formats supportés:**\n" +
             "🖼️ Images: JPG, PNG, WEBP (max 10MB)\n" +
             "🎥 Vidéos: MP4, AVI, MOV, MKV, WEBM (max 50MB)\n" +
-            "📄 Texte: Messages texte simples",
+            "📄 Texte: Messages texte simples\n\n" +
+            "🌍 **Multilingue:** commencez chaque version par \\[fr], \\[en] ou \\[ar] en début de ligne",
             parse_mode="Markdown"
         )
         await update.callback_query.answer()
@@ -120,34 +76,12 @@ class CouponSend:
             await message.reply_text(self.texts['fr']['not_admin'])
             return
 
-        # Déterminer le type de contenu
-        media_type = None
-        file_id = None
-        file_path = None
-        file_size = 0
-
-        if message.photo:
-            media_type = "photo"
-            file_id = message.photo[-1].file_id  # Prendre la plus haute résolution
-            file_size = message.photo[-1].file_size or 0
-        elif message.video:
-            media_type = "video"
-            file_id = message.video.file_id
-            file_size = message.video.file_size or 0
-        elif message.document and message.document.mime_type:
-            # Vérifier si c'est une vidéo envoyée comme document
-            mime_type = message.document.mime_type.lower()
-            if mime_type.startswith('video/'):
-                media_type = "video"
-                file_id = message.document.file_id
-                file_size = message.document.file_size or 0
-            elif mime_type.startswith('image/'):
-                media_type = "photo"
-                file_id = message.document.file_id
-                file_size = message.document.file_size or 0
-        elif message.text or message.caption:
-            media_type = "text"
-        else:
+        # Déterminer le type de contenu à partir des métadonnées Telegram (sans téléchargement)
+        media_info = extract_media_metadata(message)
+
+        if media_info is None and (message.text or message.caption):
+            media_info = {'media_type': "text", 'file_size': 0, 'needs_download': False}
+        elif media_info is None:
             await message.reply_text(
                 "❌ **Format non supporté**\n\n" +
                 "Formats acceptés:\n" +
@@ -158,6 +92,9 @@ class CouponSend:
             )
             return
 
+        media_type = media_info['media_type']
+        file_size = media_info['file_size']
+
         # Vérifier la taille du fichier
         if media_type == "photo" and file_size > self.MAX_PHOTO_SIZE:
             await message.reply_text(
@@ -176,63 +113,30 @@ class CouponSend:
             )
             return
 
-        try:
-            # Télécharger le fichier média si c'est une image ou vidéo
-            video_info = None
-            thumbnail_path = None
-            
-            if media_type in ["photo", "video"]:
-                tg_file: File = await context.bot.get_file(file_id)
-                
-                # Déterminer l'extension selon le type
-                if media_type == "photo":
-                    file_extension = os.path.splitext(tg_file.file_path)[1] or ".jpg"
-                    file_name = f"coupon_photo_{datetime.now().strftime('%Y%m%d_%H%M%S')}{file_extension}"
-                else:  # video
-                    file_extension = os.path.splitext(tg_file.file_path)[1] or ".mp4"
-                    file_name = f"coupon_video_{datetime.now().strftime('%Y%m%d_%H%M%S')}{file_extension}"
-                
-                file_path = os.path.join(self.media_path, file_name)
-                
-                # Message de progression pour les gros fichiers
-                if file_size > 5 * 1024 * 1024:  # > 5MB
-                    progress_msg = await message.reply_text(
-                        f"⬇️ **Téléchargement en cours...**\n" +
-                        f"Fichier: {file_size/1024/1024:.1f} MB",
-                        parse_mode="Markdown"
-                    )
-                
-                await tg_file.download_to_drive(custom_path=file_path)
-                
-                # Supprimer le message de progression
-                if file_size > 5 * 1024 * 1024:
-                    try:
-                        await progress_msg.delete()
-                    except:
-                        pass
-                
-                # Pour les vidéos, extraire les informations et générer une miniature
-                if media_type == "video":
-                    video_info = self._get_video_info(file_path)
-                    thumbnail_path = self._generate_video_thumbnail(file_path)
-                    
-                    if not video_info:
-                        logger.warning(f"Impossible d'extraire les infos de la vidéo: {file_path}")
+        # Versions par langue éventuelles ([fr] ... [en] ... [ar] ...)
+        raw_text = message.caption or message.text or ""
+        texts = split_language_blocks(raw_text)
 
+        try:
             coupon_data = {
                 'coupon_id': f"coupon_{datetime.now().isoformat()}",
-                'text': message.caption or message.text or "",
+                'text': (texts.get('fr') or next(iter(texts.values()))) if texts else raw_text,
+                'texts': texts or None,
                 'media_type': media_type,
-                'photo_path': file_path if media_type == "photo" else None,
-                'video_path': file_path if media_type == "video" else None,
-                'video_duration': video_info['duration'] if video_info else None,
-                'video_width': video_info['width'] if video_info else None,
-                'video_height': video_info['height'] if video_info else None,
-                'thumbnail_path': thumbnail_path,
+                'photo_path': None,
+                'video_path': None,
+                'file_id': media_info.get('file_id'),
+                'thumbnail_file_id': media_info.get('thumbnail_file_id'),
+                'video_duration': media_info.get('video_duration'),
+                'video_width': media_info.get('video_width'),
+                'video_height': media_info.get('video_height'),
+                'thumbnail_path': None,
                 'file_size': file_size,
                 'created_at': datetime.now().isoformat(),
                 'date': date.today().isoformat(),
-                'admin_id': user_id
+                'admin_id': user_id,
+                # Invisible dans les coupons du jour tant que sa diffusion n'a pas commencé
+                'active': False
             }
 
             # Sauvegarder le coupon
@@ -246,47 +150,332 @@ class CouponSend:
             elif media_type == "video":
                 confirm_msg += f"🎥 **Type:** Vidéo\n"
                 confirm_msg += f"📏 **Taille:** {file_size/1024/1024:.1f} MB\n"
-                if video_info:
-                    confirm_msg += f"⏱️ **Durée:** {video_info['duration']}s\n"
-                    confirm_msg += f"📐 **Résolution:** {video_info['width']}x{video_info['height']}"
+                if coupon_data['video_duration']:
+                    confirm_msg += f"⏱️ **Durée:** {coupon_data['video_duration']}s\n"
+                    confirm_msg += f"📐 **Résolution:** {coupon_data['video_width']}x{coupon_data['video_height']}"
             else:
                 confirm_msg += f"📝 **Type:** Texte"
+            if texts:
+                confirm_msg += f"\n🌍 **Langues:** {', '.join(texts)}"
 
             await message.reply_text(confirm_msg, parse_mode="Markdown")
 
-            # Obtenir le nombre d'utilisateurs pour estimation
-            user_count = self.database.get_user_count()
-            estimated_time = (user_count // self.batch_size) * self.batch_delay
-            
-            # Emoji selon le type de média
-            if media_type == "photo":
-                media_emoji = "🖼️"
-                media_name = "Image"
-            elif media_type == "video":
-                media_emoji = "🎥"
-                media_name = "Vidéo"
-            else:
-                media_emoji = "📝"
-                media_name = "Texte"
-            
+            # Média envoyé comme document : le téléchargement démarre pendant le choix de l'audience
+            ingest_task = None
+            if media_info['needs_download']:
+                ingest_task = self.media_ingestor.submit(context.bot, coupon_data, media_info['source_file_id'])
+
+            # La diffusion démarre quand l'admin a choisi le segment d'audience
+            self.pending_broadcasts[str(user_id)] = {'coupon': coupon_data, 'ingest_task': ingest_task}
             await message.reply_text(
-                f"🚀 **Diffusion en cours...**\n\n"
-                f"{media_emoji} **Type:** {media_name}\n"
-                f"👥 Utilisateurs à contacter: {user_count}\n"
-                f"⏱️ Temps estimé: {estimated_time:.0f} secondes\n\n"
-                f"📊 Vous recevrez un rapport détaillé à la fin.",
+                "🎯 **Choisissez l'audience de la diffusion :**",
+                reply_markup=self._segment_keyboard(),
                 parse_mode="Markdown"
             )
 
-            # Diffuser automatiquement le coupon à tous les utilisateurs
-            await self.broadcast_coupon_optimized(context, coupon_data)
-
         except Exception as e:
             logger.error(f"Erreur lors de la création du coupon: {e}")
             await message.reply_text(
                 f"❌ **Erreur lors de la création du coupon:**\n{str(e)}"
             )
 
+    def _segment_keyboard(self):
+        """Clavier des segments d'audience, avec le nombre d'utilisateurs joignables de chacun"""
+        buttons = [
+            InlineKeyboardButton(
+                f"{label} ({self.database.count_segment(build_segment(key))})",
+                callback_data=f"segment_{key}"
+            )
+            for key, (label, _) in SEGMENT_PRESETS.items()
+        ]
+        keyboard = [buttons[i:i + 2] for i in range(0, len(buttons), 2)]
+        keyboard.append([InlineKeyboardButton("❌ Annuler", callback_data="segment_cancel")])
+        return InlineKeyboardMarkup(keyboard)
+
+    async def handle_segment_selection(self, update, context):
+        """Mémoriser le segment choisi par l'admin puis demander quand diffuser"""
+        query = update.callback_query
+        user_id = update.effective_user.id
+        if str(user_id) != str(self.config.ADMIN_ID):
+            await query.answer(self.texts['fr']['not_admin'])
+            return
+        await query.answer()
+
+        pending = self.pending_broadcasts.get(str(user_id))
+        if pending is None:
+            await query.edit_message_text("ℹ️ Aucun coupon en attente de diffusion.")
+            return
+
+        segment_key = query.data[len("segment_"):]
+        if segment_key == "cancel":
+            self.pending_broadcasts.pop(str(user_id), None)
+            self.database.deactivate_coupon(pending['coupon']['coupon_id'])
+            await query.edit_message_text("❌ Diffusion annulée, le coupon a été désactivé.")
+            return
+
+        pending['segment_key'] = segment_key
+        await query.edit_message_text(
+            f"🎯 **Audience:** {segment_label(segment_key)}\n\n⏰ **Quand diffuser ?**",
+            reply_markup=self._choice_keyboard(SCHEDULE_PRESETS, "when_"),
+            parse_mode="Markdown"
+        )
+
+    def _choice_keyboard(self, presets, prefix):
+        buttons = [
+            InlineKeyboardButton(label, callback_data=f"{prefix}{key}")
+            for key, (label, _) in presets.items()
+        ]
+        keyboard = [buttons[i:i + 2] for i in range(0, len(buttons), 2)]
+        keyboard.append([InlineKeyboardButton("❌ Annuler", callback_data=f"{prefix}cancel")])
+        return InlineKeyboardMarkup(keyboard)
+
+    async def handle_schedule_selection(self, update, context):
+        """Choix du moment (when_*) puis de l'étalement (spread_*) de la diffusion en attente"""
+        query = update.callback_query
+        user_id = update.effective_user.id
+        if str(user_id) != str(self.config.ADMIN_ID):
+            await query.answer(self.texts['fr']['not_admin'])
+            return
+        await query.answer()
+
+        pending = self.pending_broadcasts.get(str(user_id))
+        if pending is None or 'segment_key' not in pending:
+            await query.edit_message_text("ℹ️ Aucun coupon en attente de diffusion.")
+            return
+
+        prefix, _, key = query.data.partition("_")
+        if key == "cancel":
+            self.pending_broadcasts.pop(str(user_id), None)
+            self.database.deactivate_coupon(pending['coupon']['coupon_id'])
+            await query.edit_message_text("❌ Diffusion annulée, le coupon a été désactivé.")
+            return
+
+        if prefix == "when":
+            pending['start_at'] = build_schedule(key)
+            await query.edit_message_text(
+                f"🎯 **Audience:** {segment_label(pending['segment_key'])}\n"
+                f"⏰ **Début:** {self._format_start(pending['start_at'])}\n\n"
+                f"🌊 **Étaler les envois ?**",
+                reply_markup=self._choice_keyboard(SPREAD_PRESETS, "spread_"),
+                parse_mode="Markdown"
+            )
+            return
+
+        self.pending_broadcasts.pop(str(user_id), None)
+        await self._create_broadcast(
+            query, context, pending['coupon'], pending['ingest_task'],
+            pending['segment_key'], pending.get('start_at'), spread_seconds(key)
+        )
+
+    @staticmethod
+    def _format_start(start_at):
+        return start_at.strftime('%d/%m à %H:%M') if start_at else "immédiat"
+
+    async def _create_broadcast(self, query, context, coupon_data, ingest_task, segment_key, start_at, spread):
+        """Créer la diffusion persistée (immédiate ou programmée) et l'annoncer à l'admin"""
+        # Légendes rendues une fois, à la création : le jour J, seuls les ids défilent
+        segment = build_segment(segment_key)
+        job_id = self.broadcast_jobs.create(
+            coupon_data['coupon_id'], self.broadcast_rate, segment,
+            scheduled_at=start_at, spread_seconds=spread, captions=self._build_broadcast_captions(coupon_data)
+        )
+        job = self.database.get_broadcast_job(job_id)
+        estimated_time = job['total'] / job['rate']
+
+        # Emoji selon le type de média
+        media_type = coupon_data.get('media_type', 'text')
+        if media_type == "photo":
+            media_emoji = "🖼️"
+            media_name = "Image"
+        elif media_type == "video":
+            media_emoji = "🎥"
+            media_name = "Vidéo"
+        else:
+            media_emoji = "📝"
+            media_name = "Texte"
+
+        details = (
+            f"{media_emoji} **Type:** {media_name}\n"
+            f"🎯 **Audience:** {segment_label(segment_key)}\n"
+            f"👥 Utilisateurs à contacter: {job['total']}\n"
+            f"⏱️ Temps estimé: {estimated_time:.0f} secondes ({job['rate']:.1f} msg/s)\n\n"
+        )
+
+        if start_at is not None:
+            # Le coupon appartient au jour de sa diffusion ; il reste inactif jusqu'à son début
+            coupon_data['date'] = start_at.date().isoformat()
+            self.database.set_coupon_date(coupon_data['coupon_id'], coupon_data['date'])
+            await query.edit_message_text(
+                f"⏰ **Diffusion #{job_id} programmée le {self._format_start(start_at)}**\n\n" + details +
+                f"📦 Le média est préparé dès maintenant.\n"
+                f"❌ /broadcast\\_cancel {job_id}",
+                parse_mode="Markdown"
+            )
+            context.application.create_task(self._prestage_broadcast(context, coupon_data, job, ingest_task))
+            self._schedule_broadcast(context.application, job_id, start_at)
+            return
+
+        self.database.activate_coupon(coupon_data['coupon_id'])
+        coupon_data['active'] = True
+        await query.edit_message_text(
+            f"🚀 **Diffusion #{job_id} en cours...**\n\n" + details +
+            f"📊 Vous recevrez un rapport détaillé à la fin.\n"
+            f"⏸️ /broadcast\\_pause {job_id} · ❌ /broadcast\\_cancel {job_id}",
+            parse_mode="Markdown"
+        )
+
+        # Diffuser sans bloquer le bot (après le téléchargement éventuel du média) ;
+        # ce message devient le suivi de la diffusion, édité sur place
+        context.application.create_task(self._ingest_and_broadcast(
+            context, coupon_data, job_id, ingest_task, status_message_id=query.message.message_id
+        ))
+
+    async def _ingest_and_broadcast(self, context, coupon_data, job_id, ingest_task=None, status_message_id=None):
+        """Attendre le téléchargement éventuel du média puis lancer la diffusion"""
+        if ingest_task is not None:
+            await ingest_task
+        await self.broadcast_coupon_optimized(context, coupon_data, job_id, status_message_id)
+
+    async def _prestage_broadcast(self, context, coupon_data, job, ingest_task=None):
+        """Télécharger et uploader le média d'une diffusion programmée bien avant son début"""
+        if ingest_task is not None:
+            await ingest_task
+        captions = job['captions']
+        await self._stage_coupon_media(context.bot, coupon_data, captions.get('fr') or next(iter(captions.values())))
+
+    def _schedule_broadcast(self, application, job_id, start_at):
+        """Programmer le début d'une diffusion sur la JobQueue (immédiat si l'heure est passée)"""
+        delay = max(0.0, (start_at - datetime.now()).total_seconds())
+        if application.job_queue is None:
+            # python-telegram-bot installé sans l'extra [job-queue]
+            logger.warning(f"JobQueue indisponible, diffusion #{job_id} programmée par une simple attente")
+            application.create_task(self._start_after(application, job_id, delay))
+            return
+        application.job_queue.run_once(
+            self._run_scheduled_broadcast, when=delay, data=job_id, name=f"broadcast_{job_id}"
+        )
+
+    async def _start_after(self, application, job_id, delay):
+        await asyncio.sleep(delay)
+        await self._start_scheduled_broadcast(application, job_id)
+
+    async def _run_scheduled_broadcast(self, context):
+        await self._start_scheduled_broadcast(context, context.job.data)
+
+    async def _start_scheduled_broadcast(self, context, job_id):
+        """Début d'une diffusion programmée (ignorée si elle a été annulée entre-temps)"""
+        if not self.broadcast_jobs.start_scheduled(job_id):
+            return
+        job = self.database.get_broadcast_job(job_id)
+        coupon_data = self.database.get_coupon(job['coupon_id'])
+        if not coupon_data:
+            logger.warning(f"Diffusion programmée #{job_id} annulée: coupon {job['coupon_id']} introuvable")
+            self.broadcast_jobs.cancel(job_id)
+            return
+        # Le coupon rejoint les coupons du jour à l'heure annoncée (nouvelle version : cache des lots invalidé)
+        coupon_data['date'] = date.today().isoformat()
+        self.database.activate_coupon(coupon_data['coupon_id'], coupon_data['date'])
+        logger.info(f"Début de la diffusion programmée #{job_id}")
+        await self.broadcast_coupon_optimized(context, coupon_data, job_id)
+
+    async def _send_coupon_media(self, bot, chat_id, coupon_data, caption, parse_mode=None, rate_limit_args=None):
+        """Envoyer le média d'un coupon : par file_id s'il est connu, sinon upload depuis le disque
+
+        `rate_limit_args` est la priorité transmise à la passerelle sortante."""
+        media_type = coupon_data.get('media_type', 'text')
+        file_id = coupon_data.get('file_id')
+
+        if media_type == "photo" and file_id:
+            return await bot.send_photo(
+                chat_id=chat_id,
+                photo=file_id,
+                caption=caption,
+                parse_mode=parse_mode,
+                rate_limit_args=rate_limit_args
+            )
+        if media_type == "video" and file_id:
+            # Telegram conserve durée, dimensions et miniature avec le file_id
+            return await bot.send_video(
+                chat_id=chat_id,
+                video=file_id,
+                caption=caption,
+                parse_mode=parse_mode,
+                rate_limit_args=rate_limit_args
+            )
+
+        if media_type == "photo" and coupon_data.get('photo_path') and os.path.exists(coupon_data['photo_path']):
+            with open(coupon_data['photo_path'], 'rb') as img_file:
+                return await bot.send_photo(
+                    chat_id=chat_id,
+                    photo=img_file,
+                    caption=caption,
+                    parse_mode=parse_mode,
+                    rate_limit_args=rate_limit_args
+                )
+        if media_type == "video" and coupon_data.get('video_path') and os.path.exists(coupon_data['video_path']):
+            # Paramètres pour l'envoi de vidéo
+            video_kwargs = {
+                'chat_id': chat_id,
+                'caption': caption,
+                'parse_mode': parse_mode,
+                'rate_limit_args': rate_limit_args
+            }
+            
+            # Ajouter les métadonnées si disponibles
+            if coupon_data.get('video_duration'):
+                video_kwargs['duration'] = coupon_data['video_duration']
+            if coupon_data.get('video_width'):
+                video_kwargs['width'] = coupon_data['video_width']
+            if coupon_data.get('video_height'):
+                video_kwargs['height'] = coupon_data['video_height']
+            
+            # Ajouter la miniature si disponible
+            if coupon_data.get('thumbnail_path') and os.path.exists(coupon_data['thumbnail_path']):
+                with open(coupon_data['thumbnail_path'], 'rb') as thumb_file:
+                    video_kwargs['thumbnail'] = thumb_file
+                    
+                    with open(coupon_data['video_path'], 'rb') as video_file:
+                        video_kwargs['video'] = video_file
+                        return await bot.send_video(**video_kwargs)
+            else:
+                # Envoyer sans miniature
+                with open(coupon_data['video_path'], 'rb') as video_file:
+                    video_kwargs['video'] = video_file
+                    return await bot.send_video(**video_kwargs)
+
+        # Texte simple ou fichier média introuvable
+        return await bot.send_message(
+            chat_id=chat_id,
+            text=caption,
+            parse_mode=parse_mode,
+            rate_limit_args=rate_limit_args
+        )
+
+    def _remember_file_ids(self, coupon_data, sent_message):
+        """Capturer les file_id renvoyés par le premier upload et les enregistrer sur le coupon"""
+        if coupon_data.get('file_id') or sent_message is None:
+            return False
+
+        file_id = None
+        thumbnail_file_id = None
+        if coupon_data.get('media_type') == "photo" and sent_message.photo:
+            file_id = sent_message.photo[-1].file_id
+        elif coupon_data.get('media_type') == "video" and sent_message.video:
+            file_id = sent_message.video.file_id
+            if sent_message.video.thumbnail:
+                thumbnail_file_id = sent_message.video.thumbnail.file_id
+
+        if not file_id:
+            return False
+
+        coupon_data['file_id'] = file_id
+        coupon_data['thumbnail_file_id'] = thumbnail_file_id
+        try:
+            self.database.set_coupon_file_ids(coupon_data['coupon_id'], file_id, thumbnail_file_id)
+        except Exception as e:
+            logger.error(f"Impossible d'enregistrer le file_id du coupon {coupon_data.get('coupon_id')}: {e}")
+        return True
+
     async def _send_coupon_to_user(self, context, user_id, coupon_data, caption):
         """Envoyer un coupon à un utilisateur spécifique avec gestion d'erreur améliorée"""
         try:
@@ -296,54 +485,12 @@ class CouponSend:
             if str(user_id) == str(self.config.ADMIN_ID):
                 return {'status': 'skipped', 'reason': 'admin'}
 
-            media_type = coupon_data.get('media_type', 'text')
-
-            if media_type == "photo" and coupon_data.get('photo_path') and os.path.exists(coupon_data['photo_path']):
-                with open(coupon_data['photo_path'], 'rb') as img_file:
-                    await context.bot.send_photo(
-                        chat_id=user_id_int,
-                        photo=img_file,
-                        caption=caption,
-                        parse_mode="Markdown"
-                    )
-            elif media_type == "video" and coupon_data.get('video_path') and os.path.exists(coupon_data['video_path']):
-                # Paramètres pour l'envoi de vidéo
-                video_kwargs = {
-                    'chat_id': user_id_int,
-                    'caption': caption,
-                    'parse_mode': "Markdown"
-                }
-                
-                # Ajouter les métadonnées si disponibles
-                if coupon_data.get('video_duration'):
-                    video_kwargs['duration'] = coupon_data['video_duration']
-                if coupon_data.get('video_width'):
-                    video_kwargs['width'] = coupon_data['video_width']
-                if coupon_data.get('video_height'):
-                    video_kwargs['height'] = coupon_data['video_height']
-                
-                # Ajouter la miniature si disponible
-                if coupon_data.get('thumbnail_path') and os.path.exists(coupon_data['thumbnail_path']):
-                    with open(coupon_data['thumbnail_path'], 'rb') as thumb_file:
-                        video_kwargs['thumbnail'] = thumb_file
-                        
-                        with open(coupon_data['video_path'], 'rb') as video_file:
-                            video_kwargs['video'] = video_file
-                            await context.bot.send_video(**video_kwargs)
-                else:
-                    # Envoyer sans miniature
-                    with open(coupon_data['video_path'], 'rb') as video_file:
-                        video_kwargs['video'] = video_file
-                        await context.bot.send_video(**video_kwargs)
-            else:
-                # Texte simple ou fichier média introuvable
-                await context.bot.send_message(
-                    chat_id=user_id_int,
-                    text=caption,
-                    parse_mode="Markdown"
-                )
+            sent_message = await self._send_coupon_media(
+                context.bot, user_id_int, coupon_data, caption, parse_mode="Markdown",
+                rate_limit_args=PRIORITY_BULK
+            )
             
-            return {'status': 'success'}
+            return {'status': 'success', 'message': sent_message}
             
         except Forbidden:
             # Utilisateur a bloqué le bot
@@ -351,12 +498,17 @@ class CouponSend:
         except BadRequest as e:
             # Chat non trouvé ou autre erreur BadRequest
             error_msg = str(e).lower()
-            if 'file too big' in error_msg or 'request entity too large' in error_msg:
+            if 'chat not found' in error_msg:
+                return {'status': 'chat_not_found', 'error': 'Chat not found'}
+            elif 'file too big' in error_msg or 'request entity too large' in error_msg:
                 return {'status': 'file_too_large', 'error': 'File exceeds size limit'}
             elif 'unsupported file format' in error_msg:
                 return {'status': 'unsupported_format', 'error': 'Unsupported file format'}
             else:
                 return {'status': 'bad_request', 'error': str(e)}
+        except RetryAfter:
+            # Flood wait : le moteur de diffusion remet l'utilisateur en file
+            raise
         except TelegramError as e:
             # Autres erreurs Telegram
             return {'status': 'telegram_error', 'error': str(e)}
@@ -365,36 +517,144 @@ class CouponSend:
             logger.error(f"Erreur inattendue pour l'utilisateur {user_id}: {e}")
             return {'status': 'error', 'error': str(e)}
 
-    async def broadcast_coupon_optimized(self, context, coupon_data):
-        """Diffuser un coupon à tous les utilisateurs avec optimisation par batch"""
+    def _coupon_text(self, coupon_data, language):
+        """Texte du coupon dans une langue (texte principal à défaut de version traduite)"""
+        texts = coupon_data.get('texts') or {}
+        if isinstance(texts, str):
+            texts = json.loads(texts)
+        return texts.get(language) or coupon_data['text']
+
+    def _build_broadcast_captions(self, coupon_data):
+        """Légendes de diffusion pré-rendues, une par langue"""
+        media_type = coupon_data.get('media_type', 'text')
+        if media_type == "photo":
+            emoji = "🖼️"
+        elif media_type == "video":
+            emoji = "🎥"
+        else:
+            emoji = "📝"
+
+        created_at = datetime.fromisoformat(coupon_data['created_at'])
+        captions = {}
+        for language, texts in self.texts.items():
+            header = texts.get('broadcast_header', "NOUVELLE ANNONCE")
+            date_format = '%d/%m/%Y à %H:%M' if language == 'fr' else '%d/%m/%Y %H:%M'
+            captions[language] = (
+                f"{emoji} **{header}** {emoji}\n\n"
+                f"📌 {self._coupon_text(coupon_data, language)}\n"
+                f"🕒 {created_at.strftime(date_format)}"
+            )
+        return captions
+
+    async def _stage_coupon_media(self, bot, coupon_data, caption):
+        """Uploader le média une seule fois dans le chat admin pour obtenir son file_id.
+
+        L'admin reçoit ainsi un aperçu et tous les destinataires sont servis par file_id."""
+        if coupon_data.get('media_type') not in ("photo", "video") or coupon_data.get('file_id'):
+            return
+        try:
+            sent_message = await self._send_coupon_media(
+                bot, self.config.ADMIN_ID, coupon_data, caption, parse_mode="Markdown"
+            )
+            if self._remember_file_ids(coupon_data, sent_message):
+                logger.info(f"Média du coupon {coupon_data['coupon_id']} uploadé une fois, diffusion par file_id")
+        except TelegramError as e:
+            logger.error(f"Upload préalable du coupon {coupon_data['coupon_id']} impossible: {e}")
+
+    async def resume_broadcasts(self, application):
+        """Reprendre les diffusions interrompues et reprogrammer les diffusions à venir (au démarrage)"""
+        for job in self.broadcast_jobs.get_unfinished():
+            coupon_data = self.database.get_coupon(job['coupon_id'])
+            if not coupon_data:
+                logger.warning(f"Diffusion #{job['job_id']} annulée: coupon {job['coupon_id']} introuvable")
+                self.broadcast_jobs.cancel(job['job_id'])
+                continue
+            logger.info(f"Reprise de la diffusion #{job['job_id']} après le curseur {job['cursor']}")
+            application.create_task(self.broadcast_coupon_optimized(application, coupon_data, job['job_id']))
+        for job in self.broadcast_jobs.get_scheduled():
+            self._schedule_broadcast(application, job['job_id'], datetime.fromisoformat(job['scheduled_at']))
+
+    def _format_progress(self, job_id, counts, total_users, meter):
+        """Texte du message de suivi : compteurs, débit réel et temps restant"""
+        processed = sum(counts.values())
+        remaining = max(0, total_users - processed)
+        rate = meter.rate()
+        progress = min(100.0, processed / total_users * 100)
+        eta = f"{remaining / rate:.0f}s" if rate > 0 else "—"
+        return (
+            f"📈 **Diffusion #{job_id}: {progress:.1f}%**\n\n"
+            f"✅ Envoyés: {counts['sent']}\n"
+            f"🚫 Bloqués/introuvables: {counts['blocked']}\n"
+            f"❌ Échecs: {counts['failed']}\n"
+            f"👥 Traités: {processed}/{total_users}\n"
+            f"⚡ Débit: {rate:.1f} msg/s · ⏱️ Reste: {eta}"
+        )
+
+    async def broadcast_coupon_optimized(self, context, coupon_data, job_id=None, status_message_id=None):
+        """Diffuser un coupon à tous les utilisateurs au débit maximal autorisé.
+
+        `context` doit seulement exposer `.bot` (CallbackContext ou Application).
+        Le suivi est un seul message admin (`status_message_id` s'il existe déjà),
+        édité sur place puis remplacé par le rapport final."""
         start_time = datetime.now()
         
         try:
-            # Récupérer tous les utilisateurs
-            all_users = self.database.get_all_users()
-            user_ids = list(all_users.keys())
-            
-            if not user_ids:
+            if job_id is None:
+                job_id = self.broadcast_jobs.create(coupon_data['coupon_id'], self.broadcast_rate)
+            job = self.database.get_broadcast_job(job_id)
+            total_users = job['total']
+
+            if not total_users:
+                self.broadcast_jobs.cancel(job_id)
                 await context.bot.send_message(
                     chat_id=self.config.ADMIN_ID,
                     text="⚠️ Aucun utilisateur trouvé dans la base de données."
                 )
                 return
 
-            # Préparer le message selon le type de média
-            media_type = coupon_data.get('media_type', 'text')
-            if media_type == "photo":
-                emoji = "🖼️"
-            elif media_type == "video":
-                emoji = "🎥"
-            else:
-                emoji = "📝"
+            # Une légende par langue, rendue une fois : aucun formatage par destinataire
+            captions = job.get('captions') or self._build_broadcast_captions(coupon_data)
+            default_caption = captions.get('fr') or next(iter(captions.values()))
+
+            # Uploader le média une seule fois, puis diffuser à tous par file_id
+            await self._stage_coupon_media(context.bot, coupon_data, default_caption)
+
+            # Reprise : les destinataires déjà traités comptent dans la progression
+            counts = {'sent': 0, 'blocked': 0, 'failed': 0, 'skipped': 0}
+            for status, count in self.database.get_delivery_stats(job_id).items():
+                counts[self._progress_bucket(status)] += count
+            meter = ThroughputMeter()
+            live = LiveMessage(
+                context.bot, self.config.ADMIN_ID,
+                message_id=status_message_id, interval=self.progress_interval
+            )
+            await live.update(self._format_progress(job_id, counts, total_users, meter), force=True)
+
+            async def report_progress(user_id, result):
+                counts[self._progress_bucket(result['status'])] += 1
+                meter.record()
+                if live.due():
+                    await live.update(self._format_progress(job_id, counts, total_users, meter))
 
-            caption = (
-                f"{emoji} **NOUVELLE ANNONCE** {emoji}\n\n"
-                f"📌 {coupon_data['text']}\n"
-                f"🕒 {datetime.fromisoformat(coupon_data['created_at']).strftime('%d/%m/%Y à %H:%M')}"
+            job, job_stats = await self.broadcast_jobs.run(
+                job_id,
+                lambda user_id, language: self._send_coupon_to_user(
+                    context, user_id, coupon_data, captions.get(language, default_caption)
+                ),
+                on_result=report_progress,
+                max_retries=self.max_retries
             )
+            if job_stats is None:
+                # Déjà en cours ou plus à l'état "running"
+                return
+
+            if job['status'] != 'done':
+                status_label = "⏸️ en pause" if job['status'] == 'paused' else "❌ annulée"
+                await live.update(
+                    self._format_progress(job_id, counts, total_users, meter) + f"\n\n{status_label}",
+                    force=True
+                )
+                return
 
             # Statistiques étendues
             stats = {
@@ -405,85 +665,46 @@ class CouponSend:
                 'unsupported_format': 0,
                 'telegram_error': 0,
                 'error': 0,
-                'skipped': 0
+                'skipped': 0,
+                'chat_not_found': 0,
+                'retried': 0,
+                'unreachable_excluded': 0
             }
+            stats.update(job_stats)
 
-            total_users = len(user_ids)
-            processed_users = 0
-
-            # Traitement par batches
-            for i in range(0, len(user_ids), self.batch_size):
-                batch_user_ids = user_ids[i:i + self.batch_size]
-                
-                # Créer les tâches pour ce batch
-                tasks = []
-                for user_id in batch_user_ids:
-                    task = self._send_coupon_to_user(context, user_id, coupon_data, caption)
-                    tasks.append(task)
-                    await asyncio.sleep(self.send_delay)  # Délai minimal entre créations de tâches
-
-                # Exécuter le batch en parallèle
-                try:
-                    results = await asyncio.gather(*tasks, return_exceptions=True)
-                    
-                    # Traiter les résultats
-                    for result in results:
-                        processed_users += 1
-                        
-                        if isinstance(result, Exception):
-                            stats['error'] += 1
-                            logger.error(f"Exception dans le batch: {result}")
-                        else:
-                            stats[result['status']] += 1
-
-                    # Mettre à jour l'admin sur le progrès (tous les 5 batches)
-                    if (i // self.batch_size) % 5 == 0:
-                        progress = (processed_users / total_users) * 100
-                        await context.bot.send_message(
-                            chat_id=self.config.ADMIN_ID,
-                            text=f"📈 **Progression: {progress:.1f}%**\n"
-                                 f"Traité: {processed_users}/{total_users}",
-                            parse_mode="Markdown"
-                        )
-
-                    # Pause entre les batches
-                    if i + self.batch_size < len(user_ids):
-                        await asyncio.sleep(self.batch_delay)
-
-                except Exception as e:
-                    logger.error(f"Erreur dans le batch {i//self.batch_size}: {e}")
-                    stats['error'] += len(batch_user_ids)
-
-            # Calcul du temps total
+            # Calcul du temps total (depuis la création de la diffusion)
             end_time = datetime.now()
-            total_time = (end_time - start_time).total_seconds()
+            total_time = max((end_time - datetime.fromisoformat(job['created_at'])).total_seconds(), 0.001)
+            session_time = (end_time - start_time).total_seconds()
 
             # Rapport final détaillé avec nouvelles statistiques
             report = (
-                f"📊 **RAPPORT DE DIFFUSION**\n\n"
+                f"📊 **RAPPORT DE DIFFUSION #{job_id}**\n\n"
                 f"⏰ **Durée totale:** {total_time:.1f} secondes\n"
                 f"👥 **Total utilisateurs:** {total_users}\n\n"
                 f"✅ **Envoyés avec succès:** {stats['success']}\n"
                 f"🚫 **Utilisateurs ayant bloqué le bot:** {stats['blocked']}\n"
+                f"👻 **Chats introuvables:** {stats['chat_not_found']}\n"
                 f"⚠️ **Erreurs de requête:** {stats['bad_request']}\n"
                 f"📦 **Fichier trop volumineux:** {stats['file_too_large']}\n"
                 f"🎬 **Format non supporté:** {stats['unsupported_format']}\n"
                 f"🌐 **Erreurs Telegram:** {stats['telegram_error']}\n"
                 f"❌ **Autres erreurs:** {stats['error']}\n"
-                f"⏭️ **Ignorés (admin):** {stats['skipped']}\n\n"
-                f"📈 **Taux de réussite:** {(stats['success']/(total_users-stats['skipped'])*100):.1f}%\n"
+                f"⏭️ **Ignorés (admin):** {stats['skipped']}\n"
+                f"🔁 **Réessais après flood wait:** {stats['retried']}\n\n"
+                f"🧹 **Injoignables exclus d'office:** {stats['unreachable_excluded']} envois inutiles évités\n"
+                f"🆕 **Nouveaux injoignables:** {stats['blocked'] + stats['chat_not_found']} "
+                f"(exclus des prochaines diffusions)\n\n"
+                f"📈 **Taux de réussite:** {(stats['success']/max(1, total_users-stats['skipped'])*100):.1f}%\n"
                 f"⚡ **Vitesse moyenne:** {(total_users/total_time):.1f} utilisateurs/seconde"
             )
 
-            # Envoyer le rapport à l'admin
-            await context.bot.send_message(
-                chat_id=self.config.ADMIN_ID,
-                text=report,
-                parse_mode="Markdown"
-            )
+            # Le message de suivi devient le rapport final
+            await live.update(report, force=True)
 
             # Log pour le monitoring
-            logger.info(f"Diffusion terminée: {stats['success']}/{total_users} succès en {total_time:.1f}s")
+            logger.info(f"Diffusion #{job_id} terminée: {stats['success']}/{total_users} succès "
+                        f"({session_time:.1f}s pour cette session)")
 
         except Exception as e:
             logger.error(f"Erreur critique dans broadcast_coupon_optimized: {e}")
@@ -493,140 +714,230 @@ class CouponSend:
                 parse_mode="Markdown"
             )
 
-    async def show_daily_coupons(self, update, context):
-        """Afficher chaque coupon du jour séparément (image/vidéo + texte)"""
+    @staticmethod
+    def _progress_bucket(status):
+        if status in ('success', 'skipped'):
+            return 'skipped' if status == 'skipped' else 'sent'
+        if status in ('blocked', 'chat_not_found'):
+            return 'blocked'
+        return 'failed'
+
+    async def handle_broadcast_command(self, update, context):
+        """Commandes admin : /broadcasts, /broadcast_pause, /broadcast_resume, /broadcast_cancel, /broadcast_rate"""
+        if str(update.effective_user.id) != str(self.config.ADMIN_ID):
+            return
+
+        message = update.message
+        command = message.text.split()[0].lstrip('/').split('@')[0]
+        args = context.args or []
+
+        if command == 'broadcasts':
+            jobs = self.database.get_broadcast_jobs(limit=10)
+            if not jobs:
+                await message.reply_text("📭 Aucune diffusion enregistrée.")
+                return
+            lines = ["📋 **Diffusions récentes**\n"]
+            for job in jobs:
+                processed = sum(self.database.get_delivery_stats(job['job_id']).values())
+                line = f"#{job['job_id']} · {job['status']} · {processed}/{job['total']} · {job['rate']:g} msg/s"
+                if job['status'] == 'scheduled':
+                    line += f" · {self._format_start(datetime.fromisoformat(job['scheduled_at']))}"
+                lines.append(line)
+            await message.reply_text("\n".join(lines), parse_mode="Markdown")
+            return
+
+        # Sans identifiant : la diffusion active la plus récente
+        # (/broadcast_rate prend l'identifiant seulement s'il est suivi du débit)
+        has_job_id = len(args) >= 2 if command == 'broadcast_rate' else bool(args)
+        if has_job_id and args[0].isdigit():
+            job_id = int(args[0])
+            args = args[1:]
+        else:
+            active = self.database.get_broadcast_jobs(statuses=('running', 'paused', 'scheduled'), limit=1)
+            job_id = active[0]['job_id'] if active else None
+
+        job = self.database.get_broadcast_job(job_id) if job_id is not None else None
+        if not job:
+            await message.reply_text("❌ Diffusion introuvable.")
+            return
+
+        if command == 'broadcast_pause':
+            if job['status'] != 'running':
+                await message.reply_text(f"ℹ️ La diffusion #{job_id} est {job['status']}.")
+                return
+            self.broadcast_jobs.pause(job_id)
+            await message.reply_text(f"⏸️ Diffusion #{job_id} mise en pause.")
+        elif command == 'broadcast_resume':
+            if job['status'] != 'paused' or self.broadcast_jobs.is_running(job_id):
+                await message.reply_text(f"ℹ️ La diffusion #{job_id} ne peut pas être reprise ({job['status']}).")
+                return
+            coupon_data = self.database.get_coupon(job['coupon_id'])
+            if not coupon_data:
+                await message.reply_text(f"❌ Coupon de la diffusion #{job_id} introuvable.")
+                return
+            self.broadcast_jobs.mark_running(job_id)
+            context.application.create_task(self.broadcast_coupon_optimized(context, coupon_data, job_id))
+            await message.reply_text(f"▶️ Diffusion #{job_id} reprise.")
+        elif command == 'broadcast_cancel':
+            if job['status'] in ('done', 'cancelled'):
+                await message.reply_text(f"ℹ️ La diffusion #{job_id} est déjà {job['status']}.")
+                return
+            self.broadcast_jobs.cancel(job_id)
+            await message.reply_text(f"❌ Diffusion #{job_id} annulée.")
+        elif command == 'broadcast_rate':
+            try:
+                rate = float(args[0])
+            except (IndexError, ValueError):
+                await message.reply_text("Usage: /broadcast\\_rate [id] <messages/seconde>", parse_mode="Markdown")
+                return
+            if rate <= 0:
+                await message.reply_text("❌ Le débit doit être positif.")
+                return
+            self.broadcast_jobs.set_rate(job_id, rate)
+            await message.reply_text(f"🚀 Diffusion #{job_id}: débit réglé à {rate:g} messages/seconde.")
+
+    def _daily_bundle(self, language):
+        """Coupons du jour prêts à l'envoi dans une langue, gardés en cache.
+
+        Le cache est invalidé par tout changement des coupons (ajout,
+        désactivation, nouveau file_id) via database.coupons_version.
+        Les médias déjà uploadés partent en albums (10 au plus par album)
+        par file_id ; ceux qui n'ont pas encore de file_id sont envoyés
+        une fois depuis le disque, et les coupons texte rejoignent le
+        message de fin. Chaque entrée garde son coupon_id pour ne renvoyer
+        que les coupons pas encore reçus."""
+        key = (date.today().isoformat(), language, self.database.coupons_version)
+        bundle = self.daily_bundles.get(key)
+        if bundle is not None:
+            return bundle
+
+        coupon_ids, media, uploads, texts = [], [], [], []
+        for coupon in self.database.get_daily_coupons(key[0]):
+            coupon_ids.append(coupon['coupon_id'])
+            caption = f"📌 {self._coupon_text(coupon, language)}\n🕒 {coupon['created_at']}"
+            media_type = coupon.get('media_type', 'text')
+            if media_type == "photo" and coupon.get('file_id'):
+                media.append((coupon['coupon_id'], InputMediaPhoto(coupon['file_id'], caption=caption)))
+            elif media_type == "video" and coupon.get('file_id'):
+                media.append((coupon['coupon_id'], InputMediaVideo(coupon['file_id'], caption=caption)))
+            elif media_type in ("photo", "video"):
+                uploads.append((coupon, caption))
+            else:
+                texts.append((coupon['coupon_id'], caption))
+
+        bundle = {'coupon_ids': coupon_ids, 'media': media, 'uploads': uploads, 'texts': texts}
+        # Une seule version par langue : les entrées des jours ou versions précédents disparaissent
+        self.daily_bundles = {k: v for k, v in self.daily_bundles.items() if k[1] != language}
+        self.daily_bundles[key] = bundle
+        return bundle
+
+    def _daily_coupons_keyboard(self, user_id, language, show_all=False):
+        keyboard = []
+        if show_all:
+            keyboard.append([InlineKeyboardButton(self.texts[language]['show_all_coupons'], callback_data='coupons_all')])
+        if str(user_id) == str(self.config.ADMIN_ID):
+            keyboard.append([InlineKeyboardButton(self.texts[language]['create_coupon'], callback_data='create_coupon')])
+        keyboard.append([InlineKeyboardButton(self.texts[language]['back_button'], callback_data='back_main')])
+        return InlineKeyboardMarkup(keyboard)
+
+    async def show_all_daily_coupons(self, update, context):
+        """Bouton « Tout revoir » : renvoyer tous les coupons du jour, même déjà reçus"""
+        await update.callback_query.answer()
+        await self.show_daily_coupons(update, context, show_all=True)
+
+    async def show_daily_coupons(self, update, context, show_all=False):
+        """Envoyer les coupons du jour pas encore reçus (tous avec `show_all`), puis un message de fin"""
         user_id = update.effective_user.id
         user_data = self.database.get_user(user_id)
         language = user_data.get('language', 'fr')
 
-        today = date.today().isoformat()
-        coupons = self.database.get_daily_coupons(today)
+        bundle = self._daily_bundle(language)
 
-        # Cas : aucun coupon pour un utilisateur normal
-        if not coupons and str(user_id) != str(self.config.ADMIN_ID):
+        # Cas : aucun coupon aujourd'hui (l'admin a en plus le bouton de création)
+        if not bundle['coupon_ids']:
             await context.bot.send_message(
                 chat_id=user_id,
                 text=self.texts[language]['daily_coupons_header'] + "\n\n" + self.texts[language]['no_coupons'],
-                reply_markup=InlineKeyboardMarkup([[
-                    InlineKeyboardButton(
-                        self.texts[language]['back_button'],
-                        callback_data='back_main'
-                    )
-                ]])
+                reply_markup=self._daily_coupons_keyboard(user_id, language)
             )
             return
 
-        # Cas : aucun coupon pour l'admin
-        if str(user_id) == str(self.config.ADMIN_ID) and not coupons:
-            keyboard = [
-                [
-                    InlineKeyboardButton(
-                        self.texts[language]['create_coupon'],
-                        callback_data='create_coupon'
-                    ),
-                ],
-                [
-                    InlineKeyboardButton(
-                        self.texts[language]['back_button'],
-                        callback_data='back_main'
-                    )
-                ]
-            ]
+        # Coupons déjà reçus, par le menu ou par une diffusion
+        seen = set() if show_all else self.database.get_seen_coupon_ids(user_id, bundle['coupon_ids'])
+        if len(seen) == len(bundle['coupon_ids']):
+            # Tout a déjà été reçu : un résumé plutôt que les mêmes médias
             await context.bot.send_message(
                 chat_id=user_id,
-                text=self.texts[language]['daily_coupons_header'] + "\n\n" + self.texts[language]['no_coupons'],
-                reply_markup=InlineKeyboardMarkup(keyboard)
+                text=self.texts[language]['daily_coupons_header'] + "\n\n" +
+                     self.texts[language]['coupons_all_seen'].format(count=len(seen)),
+                reply_markup=self._daily_coupons_keyboard(user_id, language, show_all=True)
             )
             return
 
-        # Envoyer chaque coupon un par un avec gestion d'erreur améliorée
-        for coupon in coupons:
+        delivered = []
+
+        # Médias sans file_id : un envoi depuis le disque, qui fournit le file_id des prochaines fois
+        for coupon, caption in bundle['uploads']:
+            if coupon['coupon_id'] in seen:
+                continue
             try:
-                caption = f"📌 {coupon['text']}\n🕒 {coupon['created_at']}"
-                media_type = coupon.get('media_type', 'text')
-                
-                if media_type == "photo" and coupon.get('photo_path') and os.path.exists(coupon['photo_path']):
-                    with open(coupon['photo_path'], 'rb') as img_file:
-                        await context.bot.send_photo(
-                            chat_id=user_id,
-                            photo=img_file,
-                            caption=caption
-                        )
-                elif media_type == "video" and coupon.get('video_path') and os.path.exists(coupon['video_path']):
-                    # Paramètres pour l'envoi de vidéo
-                    video_kwargs = {
-                        'chat_id': user_id,
-                        'caption': caption
-                    }
-                    
-                    # Ajouter les métadonnées si disponibles
-                    if coupon.get('video_duration'):
-                        video_kwargs['duration'] = coupon['video_duration']
-                    if coupon.get('video_width'):
-                        video_kwargs['width'] = coupon['video_width']
-                    if coupon.get('video_height'):
-                        video_kwargs['height'] = coupon['video_height']
-                    
-                    # Ajouter la miniature si disponible
-                    if coupon.get('thumbnail_path') and os.path.exists(coupon['thumbnail_path']):
-                        with open(coupon['thumbnail_path'], 'rb') as thumb_file:
-                            video_kwargs['thumbnail'] = thumb_file
-                            
-                            with open(coupon['video_path'], 'rb') as video_file:
-                                video_kwargs['video'] = video_file
-                                await context.bot.send_video(**video_kwargs)
-                    else:
-                        # Envoyer sans miniature
-                        with open(coupon['video_path'], 'rb') as video_file:
-                            video_kwargs['video'] = video_file
-                            await context.bot.send_video(**video_kwargs)
-                else:
-                    await context.bot.send_message(
-                        chat_id=user_id,
-                        text=caption
-                    )
-                
-                # Petite pause entre chaque coupon
-                await asyncio.sleep(0.1)
-                
+                sent_message = await self._send_coupon_media(context.bot, user_id, coupon, caption)
+                self._remember_file_ids(coupon, sent_message)
+                delivered.append(coupon['coupon_id'])
             except Exception as e:
                 logger.error(f"Erreur lors de l'envoi du coupon {coupon.get('coupon_id', 'unknown')} à {user_id}: {e}")
 
-        # Ajouter un dernier message avec les boutons de navigation
-        keyboard = [[
-            InlineKeyboardButton(
-                self.texts[language]['back_button'],
-                callback_data='back_main'
-            )
-        ]]
-
-        if str(user_id) == str(self.config.ADMIN_ID):
-            keyboard.insert(0, [
-                InlineKeyboardButton(
-                    self.texts[language]['create_coupon'],
-                    callback_data='create_coupon'
-                ),
-            ])
+        # Médias connus : un appel par album de 10
+        media = [(coupon_id, item) for coupon_id, item in bundle['media'] if coupon_id not in seen]
+        for start in range(0, len(media), 10):
+            album = media[start:start + 10]
+            try:
+                if len(album) == 1:
+                    # Un album compte au moins 2 médias
+                    item = album[0][1]
+                    if isinstance(item, InputMediaPhoto):
+                        await context.bot.send_photo(chat_id=user_id, photo=item.media, caption=item.caption)
+                    else:
+                        await context.bot.send_video(chat_id=user_id, video=item.media, caption=item.caption)
+                else:
+                    await context.bot.send_media_group(chat_id=user_id, media=[item for _, item in album])
+                delivered.extend(coupon_id for coupon_id, _ in album)
+            except Exception as e:
+                logger.error(f"Erreur lors de l'envoi des coupons du jour à {user_id}: {e}")
 
+        # Les coupons texte accompagnent le message de fin (découpé au-delà de la limite Telegram)
+        texts = [(coupon_id, caption) for coupon_id, caption in bundle['texts'] if coupon_id not in seen]
+        closing = "✅ " + self.texts[language]['daily_coupons_header'] + " - fin de la liste"
+        messages = [""]
+        for text in [caption for _, caption in texts] + [closing]:
+            if messages[-1] and len(messages[-1]) + len(text) + 2 > 4096:
+                messages.append("")
+            messages[-1] += ("\n\n" if messages[-1] else "") + text
+        for text in messages[:-1]:
+            await context.bot.send_message(chat_id=user_id, text=text)
         await context.bot.send_message(
             chat_id=user_id,
-            text="✅ " + self.texts[language]['daily_coupons_header'] + " - fin de la liste",
-            reply_markup=InlineKeyboardMarkup(keyboard)
+            text=messages[-1],
+            reply_markup=self._daily_coupons_keyboard(user_id, language, show_all=bool(seen))
         )
+        delivered.extend(coupon_id for coupon_id, _ in texts)
+
+        self.database.mark_coupons_seen(user_id, delivered)
 
     async def get_broadcast_statistics(self, update, context):
         """Obtenir des statistiques sur les capacités de diffusion"""
         if str(update.effective_user.id) != str(self.config.ADMIN_ID):
             return
 
-        user_count = self.database.get_user_count()
-        estimated_time = (user_count // self.batch_size) * self.batch_delay
+        total_users = self.database.get_user_count()
+        user_count = self.database.get_reachable_user_count()
+        estimated_time = user_count / self.broadcast_rate
         stats_message = (
             f"📊 **STATISTIQUES DE DIFFUSION**\n\n"
-            f"👥 **Utilisateurs totaux:** {user_count}\n"
-            f"📦 **Taille des batches:** {self.batch_size}\n"
-            f"⏱️ **Délai entre batches:** {self.batch_delay}s\n"
-            f"🚀 **Vitesse estimée:** {self.batch_size/self.batch_delay:.1f} utilisateurs/seconde\n"
+            f"👥 **Utilisateurs totaux:** {total_users}\n"
+            f"🧹 **Injoignables (exclus des diffusions):** {total_users - user_count}\n"
+            f"🚀 **Débit cible:** {self.broadcast_rate} messages/seconde\n"
+            f"🧵 **Envois simultanés max:** {self.broadcast_max_concurrency}\n"
             f"⌛ **Temps estimé pour diffusion complète:** {estimated_time:.0f} secondes ({estimated_time/60:.1f} minutes)\n\n"
             f"📁 **Limites de fichiers:**\n"
             f"🖼️ Images: {self.MAX_PHOTO_SIZE/1024/1024:.0f} MB max\n"
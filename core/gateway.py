@@ -0,0 +1,192 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import time
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from core.broadcast import TokenBucket, retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+# Classes de priorité, passées en `rate_limit_args` aux méthodes du bot
+PRIORITY_INTERACTIVE = 'interactive'
+PRIORITY_ADMIN = 'admin'
+PRIORITY_BULK = 'bulk'
+PRIORITY_RANKS = {PRIORITY_INTERACTIVE: 0, PRIORITY_ADMIN: 1, PRIORITY_BULK: 2}
+
+# Priorité de l'appel en cours (lue par le transport HTTP pour choisir son pool de connexions)
+current_priority = contextvars.ContextVar('current_priority', default=PRIORITY_INTERACTIVE)
+
+
+class _ChatSlot:
+    """État d'un chat : verrou FIFO (ordre des messages) et débit propre au chat"""
+
+    def __init__(self, bucket):
+        self.lock = asyncio.Lock()
+        self.bucket = bucket
+        self.users = 0
+        self.last_used = time.monotonic()
+
+
+class OutboundGateway(BaseRateLimiter):
+    """Passage obligé de tous les appels sortants vers l'API Bot.
+
+    Chaque appel adressé à un chat prend d'abord le verrou de ce chat (les
+    messages d'un même chat partent dans l'ordre), respecte le débit du chat
+    (privé ou groupe) puis attend un jeton du débit global. Les jetons globaux
+    sont distribués par priorité : interactif, puis admin, puis masse ; la
+    diffusion cède donc sa place dès qu'une réponse utilisateur attend.
+
+    Sans `rate_limit_args`, un appel vers le chat admin est de priorité admin
+    et tout autre appel est interactif ; la diffusion passe PRIORITY_BULK.
+    Un flood wait suspend le débit global ; les appels de masse le laissent
+    remonter (le moteur de diffusion les remet en file), les autres sont
+    réessayés après le délai imposé.
+    """
+
+    def __init__(self, global_rate=30, chat_rate=1.0, chat_burst=3, group_rate=20 / 60,
+                 admin_ids=(), max_retries=2, idle_timeout=60):
+        self.bucket = TokenBucket(global_rate)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.admin_ids = {str(admin_id) for admin_id in admin_ids}
+        self.max_retries = max_retries
+        self.idle_timeout = idle_timeout  # Secondes avant d'oublier l'état d'un chat inactif
+        self.chats = {}
+        self.waiting = []  # tas (rang, ordre, future)
+        self.sequence = itertools.count()
+        self.stats = {priority: 0 for priority in PRIORITY_RANKS}
+        self.wakeup = None
+        self.dispatcher = None
+        self.last_prune = time.monotonic()
+
+    async def initialize(self):
+        self._ensure_dispatcher()
+
+    async def shutdown(self):
+        if self.dispatcher is not None:
+            self.dispatcher.cancel()
+            try:
+                await self.dispatcher
+            except asyncio.CancelledError:
+                pass
+            self.dispatcher = None
+        for _, _, future in self.waiting:
+            if not future.done():
+                future.cancel()
+        self.waiting.clear()
+
+    def _ensure_dispatcher(self):
+        if self.dispatcher is None or self.dispatcher.done():
+            self.wakeup = asyncio.Event()
+            self.dispatcher = asyncio.create_task(self._dispatch())
+
+    def pending(self):
+        """Nombre d'appels en attente d'un jeton global, par priorité"""
+        counts = {priority: 0 for priority in PRIORITY_RANKS}
+        ranks = {rank: priority for priority, rank in PRIORITY_RANKS.items()}
+        for rank, _, future in self.waiting:
+            if not future.done():
+                counts[ranks[rank]] += 1
+        return counts
+
+    def _priority(self, chat_id, rate_limit_args):
+        if rate_limit_args in PRIORITY_RANKS:
+            return rate_limit_args
+        if chat_id is not None and str(chat_id) in self.admin_ids:
+            return PRIORITY_ADMIN
+        return PRIORITY_INTERACTIVE
+
+    def _chat_slot(self, chat_id):
+        slot = self.chats.get(chat_id)
+        if slot is None:
+            is_group = str(chat_id).startswith(('-', '@'))
+            if is_group:
+                bucket = TokenBucket(self.group_rate, capacity=1)
+            else:
+                bucket = TokenBucket(self.chat_rate, capacity=self.chat_burst)
+            slot = self.chats[chat_id] = _ChatSlot(bucket)
+        return slot
+
+    def _prune_chats(self):
+        now = time.monotonic()
+        if now - self.last_prune < self.idle_timeout:
+            return
+        self.last_prune = now
+        for chat_id in [chat_id for chat_id, slot in self.chats.items()
+                        if slot.users == 0 and now - slot.last_used > self.idle_timeout]:
+            del self.chats[chat_id]
+
+    async def _dispatch(self):
+        """Distribuer les jetons globaux à l'appel en attente le plus prioritaire"""
+        while True:
+            while not self.waiting:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+            await self.bucket.acquire()
+            while self.waiting:
+                _, _, future = heapq.heappop(self.waiting)
+                if not future.done():
+                    future.set_result(None)
+                    break
+
+    async def _acquire_global(self, priority):
+        self._ensure_dispatcher()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiting, (PRIORITY_RANKS[priority], next(self.sequence), future))
+        self.wakeup.set()
+        await future
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        chat_id = data.get('chat_id')
+        priority = self._priority(chat_id, rate_limit_args)
+        self.stats[priority] += 1
+
+        if chat_id is None:
+            # Réponses aux callbacks, requêtes inline, fichiers... : pas de chat à ménager
+            return await self._call(callback, args, kwargs, priority, endpoint)
+
+        slot = self._chat_slot(chat_id)
+        slot.users += 1
+        try:
+            async with slot.lock:
+                await slot.bucket.acquire()
+                return await self._call(callback, args, kwargs, priority, endpoint)
+        finally:
+            slot.users -= 1
+            slot.last_used = time.monotonic()
+            self._prune_chats()
+
+    async def _call(self, callback, args, kwargs, priority, endpoint):
+        attempt = 0
+        while True:
+            await self._acquire_global(priority)
+            token = current_priority.set(priority)
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                delay = retry_after_seconds(e)
+                self.bucket.pause(delay)
+                if priority == PRIORITY_BULK or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                logger.warning(f"Flood wait de {delay:.0f}s sur {endpoint}, nouvel essai ({priority})")
+                await asyncio.sleep(delay)
+            finally:
+                current_priority.reset(token)
+
+
+def build_gateway(config):
+    """Passerelle sortante selon la configuration (une par application, construite par Services)"""
+    return OutboundGateway(
+        global_rate=getattr(config, 'GATEWAY_GLOBAL_RATE', 30),
+        chat_rate=getattr(config, 'GATEWAY_CHAT_RATE', 1.0),
+        chat_burst=getattr(config, 'GATEWAY_CHAT_BURST', 3),
+        group_rate=getattr(config, 'GATEWAY_GROUP_RATE', 20 / 60),
+        admin_ids=(config.ADMIN_ID,)
+    )
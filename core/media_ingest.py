@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+def extract_media_metadata(message):
+    """Décrire le média d'un message à partir des métadonnées fournies par Telegram.
+
+    Aucun téléchargement : photo et vidéo sont réutilisables directement par
+    file_id. Un média envoyé comme document ne peut pas être renvoyé par
+    send_photo/send_video avec son file_id, il devra être téléchargé.
+    """
+    if message.photo:
+        photo = message.photo[-1]  # Plus haute résolution
+        return {
+            'media_type': "photo",
+            'file_id': photo.file_id,
+            'source_file_id': photo.file_id,
+            'file_size': photo.file_size or 0,
+            'needs_download': False
+        }
+
+    if message.video:
+        video = message.video
+        return {
+            'media_type': "video",
+            'file_id': video.file_id,
+            'source_file_id': video.file_id,
+            'file_size': video.file_size or 0,
+            'video_duration': video.duration,
+            'video_width': video.width,
+            'video_height': video.height,
+            'thumbnail_file_id': video.thumbnail.file_id if video.thumbnail else None,
+            'needs_download': False
+        }
+
+    if message.document and message.document.mime_type:
+        document = message.document
+        mime_type = document.mime_type.lower()
+        if mime_type.startswith('video/'):
+            media_type = "video"
+        elif mime_type.startswith('image/'):
+            media_type = "photo"
+        else:
+            return None
+        return {
+            'media_type': media_type,
+            'file_id': None,
+            'source_file_id': document.file_id,
+            'file_size': document.file_size or 0,
+            'file_name': document.file_name,
+            'needs_download': True
+        }
+
+    return None
+
+
+def probe_video(video_path):
+    """Extraire les informations d'une vidéo (durée, dimensions) - bloquant, à lancer hors boucle"""
+    import cv2
+
+    try:
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            return None
+
+        # Obtenir les propriétés de la vidéo
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+        duration = int(frame_count / fps) if fps > 0 else 0
+
+        cap.release()
+
+        return {
+            'duration': duration,
+            'width': width,
+            'height': height
+        }
+    except Exception as e:
+        logger.error(f"Erreur lors de l'extraction des infos vidéo: {e}")
+        return None
+
+
+def generate_video_thumbnail(video_path):
+    """Générer une miniature pour la vidéo - bloquant, à lancer hors boucle"""
+    import cv2
+    from PIL import Image
+
+    try:
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            return None
+
+        # Lire la première frame
+        ret, frame = cap.read()
+        cap.release()
+
+        if not ret:
+            return None
+
+        # Convertir BGR to RGB
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+        # Créer une miniature
+        thumbnail = Image.fromarray(frame_rgb)
+        thumbnail.thumbnail((320, 240), Image.Resampling.LANCZOS)
+
+        # Sauvegarder la miniature
+        thumbnail_path = os.path.splitext(video_path)[0] + '_thumb.jpg'
+        thumbnail.save(thumbnail_path, 'JPEG', quality=80)
+
+        return thumbnail_path
+    except Exception as e:
+        logger.error(f"Erreur lors de la génération de miniature: {e}")
+        return None
+
+
+class MediaIngestor:
+    """Téléchargement et analyse des médias de coupons en arrière-plan, à concurrence bornée"""
+
+    def __init__(self, database, media_path="media/coupons", max_concurrency=2):
+        self.database = database
+        self.media_path = media_path
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._tasks = set()
+        os.makedirs(self.media_path, exist_ok=True)
+
+    def submit(self, bot, coupon_data, source_file_id):
+        """Planifier le téléchargement/l'analyse d'un média ; retourne la tâche asyncio"""
+        task = asyncio.create_task(self._ingest(bot, coupon_data, source_file_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _ingest(self, bot, coupon_data, source_file_id):
+        async with self._semaphore:
+            media_type = coupon_data['media_type']
+            try:
+                tg_file = await bot.get_file(source_file_id)
+
+                # Déterminer l'extension selon le type
+                default_extension = ".jpg" if media_type == "photo" else ".mp4"
+                file_extension = os.path.splitext(tg_file.file_path or "")[1] or default_extension
+                file_name = f"coupon_{media_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{file_extension}"
+                file_path = os.path.join(self.media_path, file_name)
+
+                await tg_file.download_to_drive(custom_path=file_path)
+            except Exception as e:
+                logger.error(f"Téléchargement du média du coupon {coupon_data['coupon_id']} impossible: {e}")
+                return coupon_data
+
+            updates = {'photo_path' if media_type == "photo" else 'video_path': file_path}
+
+            # Analyse vidéo seulement si Telegram n'a pas fourni les métadonnées
+            if media_type == "video":
+                if not coupon_data.get('video_duration'):
+                    video_info = await asyncio.to_thread(probe_video, file_path)
+                    if video_info:
+                        updates['video_duration'] = video_info['duration']
+                        updates['video_width'] = video_info['width']
+                        updates['video_height'] = video_info['height']
+                    else:
+                        logger.warning(f"Impossible d'extraire les infos de la vidéo: {file_path}")
+                if not coupon_data.get('thumbnail_file_id') and not coupon_data.get('thumbnail_path'):
+                    updates['thumbnail_path'] = await asyncio.to_thread(generate_video_thumbnail, file_path)
+
+            coupon_data.update(updates)
+            try:
+                self.database.update_coupon_media(coupon_data['coupon_id'], updates)
+            except Exception as e:
+                logger.error(f"Mise à jour du coupon {coupon_data['coupon_id']} impossible: {e}")
+            return coupon_data
+
+
+def build_media_ingestor(config, database):
+    """Ingestion de médias selon la configuration (une par application, construite par Services)"""
+    return MediaIngestor(database, max_concurrency=getattr(config, 'MEDIA_INGEST_WORKERS', 2))
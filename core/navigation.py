@@ -1,20 +1,19 @@
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
-from core.referral import ReferralSystem
-from core.tutorials import Tutorial
 from utils.helpers import load_texts
-from core.couponSend import CouponSend
-from games.game_manager import GameManager
-from core.question import Question
 
 
 class Navigation:
-    def __init__(self, config, database):
+    def __init__(self, config, database, services):
         self.config = config
         self.database = database
         self.texts = load_texts()
-        self.question_system = Question(config, database)
-        self.coupon_system = CouponSend(config, database)
-        self.tutorial_system = Tutorial(config, database)
+        # Services partagés (core.app.Services) : une seule instance de chaque pour tout le bot
+        self.services = services
+        self.question_system = services.question_system
+        self.coupon_system = services.coupon_system
+        self.tutorial_system = services.tutorial_system
+        self.game_manager = services.game_manager
+        self.referral = services.referral
         
     async def show_language_selection(self, update, context):
         """Afficher la sélection de langue"""
@@ -47,8 +46,7 @@ class Navigation:
         self.database.update_user(user_id, {'language': language})
     
         # Vérifier si l'utilisateur est vérifié
-        from core.verification import GroupVerification
-        verification = GroupVerification(self.config, self.database)
+        verification = self.services.verification
     
         if verification.is_user_verified(user_id):
             await self.show_main_menu(update, context)
@@ -137,8 +135,7 @@ class Navigation:
         if callback_data == "back_main":
             await self.show_main_menu(update, context)
         elif callback_data == "back_games":
-            game_manager = GameManager(self.config, self.database)
-            await game_manager.show_games_list(update, context)
+            await self.game_manager.show_games_list(update, context)
     
     async def handle_text_message(self, update, context):
         """Gérer les messages texte (incluant les questions)"""
@@ -174,14 +171,11 @@ class Navigation:
         elif text == "🎥 Vidéo d'inscription" or text == "video_inscription":
             await self.tutorial_system.show_video_inscription(update, context)
         elif text == self.texts[language]["1x_game"] or text == "1x_game":
-            game_manager = GameManager(self.config, self.database)
-            await game_manager.show_games_list(update, context)
+            await self.game_manager.show_games_list(update, context)
         elif text == self.texts[language]["1win_game"] or text == "1win_game":
-            game_manager = GameManager(self.config, self.database)
-            await game_manager.show_1win_games_list(update, context)
+            await self.game_manager.show_1win_games_list(update, context)
         elif text == self.texts[language]["referral_menu"] or text == "referral_menu":
-            referral = ReferralSystem(self.config, self.database)
-            await referral.show_referral_info(update, context)
+            await self.referral.show_referral_info(update, context)
         elif text == self.texts[language]["coupon_brunch"] or text == "coupon_brunch":
             await self.coupon_system.show_daily_coupons(update, context)
         elif text == self.texts[language]["change_language"] or text == "change_language":
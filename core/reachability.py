@@ -0,0 +1,37 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Statuts de livraison qui rendent un utilisateur injoignable
+UNREACHABLE_STATUSES = ('blocked', 'chat_not_found')
+
+
+class Reachability:
+    """Suivi des utilisateurs injoignables, exclus des diffusions jusqu'à leur retour"""
+
+    def __init__(self, database):
+        self.database = database
+        # Copie mémoire : le handler de réactivation voit chaque update sans requête SQL
+        self.unreachable = self.database.get_unreachable_user_ids()
+
+    def mark_unreachable(self, user_ids, reason):
+        user_ids = [str(user_id) for user_id in user_ids]
+        if not user_ids:
+            return
+        self.database.set_users_unreachable(user_ids, reason)
+        self.unreachable.update(user_ids)
+
+    def record_outcomes(self, deliveries):
+        """Marquer injoignables les destinataires d'un lot de (user_id, statut)"""
+        for status in UNREACHABLE_STATUSES:
+            self.mark_unreachable([user_id for user_id, result in deliveries if result == status], status)
+
+    async def track_update(self, update, context):
+        """Handler (groupe -1) : tout update d'un utilisateur injoignable le réactive"""
+        user = update.effective_user
+        if user is None or str(user.id) not in self.unreachable:
+            return
+        self.unreachable.discard(str(user.id))
+        self.database.set_user_reachable(user.id)
+        logger.info(f"Utilisateur {user.id} de nouveau joignable")
+
@@ -0,0 +1,77 @@
+import logging
+
+from telegram.ext import CallbackQueryHandler
+
+logger = logging.getLogger(__name__)
+
+
+class CallbackRouter:
+    """Aiguillage de tous les callback_data par dictionnaire, derrière un seul CallbackQueryHandler.
+
+    Formats reconnus, dans l'ordre :
+    - alias : ancien callback_data exact réécrit en nouveau (boutons encore
+      présents dans l'historique des chats, ex. "play_crash" -> "play:crash") ;
+    - structuré `route:argument` : handler(update, context, argument) ;
+    - exact : handler(update, context) ;
+    - préfixe (`back_`, `segment_`...) : handler(update, context), qui lit
+      query.data lui-même. Les préfixes sont en nombre fixe, indépendant du
+      nombre de jeux : le coût d'un callback reste constant.
+    """
+
+    def __init__(self):
+        self.routes = {}  # route -> handler(update, context, argument)
+        self.exact = {}  # callback_data -> handler(update, context)
+        self.prefixes = []  # (préfixe, handler(update, context))
+        self.aliases = {}  # ancien callback_data -> nouveau
+        self.stats = {'dispatched': 0, 'unknown': 0}
+
+    def add_route(self, route, handler):
+        """Callback structuré `route:argument`"""
+        self.routes[route] = handler
+
+    def add(self, callback_data, handler):
+        """Callback exact, une ou plusieurs valeurs"""
+        if isinstance(callback_data, str):
+            callback_data = (callback_data,)
+        for data in callback_data:
+            self.exact[data] = handler
+
+    def add_prefix(self, prefix, handler):
+        """Callbacks commençant par `prefix` (le handler analyse query.data)"""
+        self.prefixes.append((prefix, handler))
+
+    def alias(self, old, new):
+        """Ancien callback_data exact traité comme `new`"""
+        self.aliases[old] = new
+
+    def resolve(self, data):
+        """(handler, argument) du callback_data ; argument None pour les handlers sans argument"""
+        data = self.aliases.get(data, data)
+        route, separator, argument = data.partition(':')
+        if separator and route in self.routes:
+            return self.routes[route], argument
+        handler = self.exact.get(data)
+        if handler is not None:
+            return handler, None
+        for prefix, handler in self.prefixes:
+            if data.startswith(prefix):
+                return handler, None
+        return None, None
+
+    async def dispatch(self, update, context):
+        query = update.callback_query
+        handler, argument = self.resolve(query.data or "")
+        if handler is None:
+            self.stats['unknown'] += 1
+            logger.warning(f"Callback inconnu: {query.data!r}")
+            await query.answer()
+            return
+        self.stats['dispatched'] += 1
+        if argument is None:
+            await handler(update, context)
+        else:
+            await handler(update, context, argument)
+
+    def handler(self):
+        """Le CallbackQueryHandler unique à enregistrer dans l'application"""
+        return CallbackQueryHandler(self.dispatch)
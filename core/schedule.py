@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta
+
+
+def _next_time(now, hour):
+    """Prochaine occurrence de `hour`:00 (aujourd'hui ou demain)"""
+    start = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    return start if start > now else start + timedelta(days=1)
+
+
+# Moments de diffusion proposés à l'admin : clé -> (libellé, début relatif à maintenant, None = immédiat)
+SCHEDULE_PRESETS = {
+    'now': ("🚀 Maintenant", lambda now: None),
+    '1h': ("⏰ Dans 1 h", lambda now: now + timedelta(hours=1)),
+    '3h': ("⏰ Dans 3 h", lambda now: now + timedelta(hours=3)),
+    '20h': ("🌙 À 20 h", lambda now: _next_time(now, 20)),
+    '9h': ("🌅 À 9 h", lambda now: _next_time(now, 9)),
+}
+
+# Étalement des envois : clé -> (libellé, fenêtre en secondes)
+SPREAD_PRESETS = {
+    '0': ("⚡ D'un coup", 0),
+    '1800': ("🌊 Sur 30 min", 1800),
+    '3600': ("🌊 Sur 1 h", 3600),
+    '10800': ("🌊 Sur 3 h", 10800),
+}
+
+
+def build_schedule(key):
+    """Date de début d'un preset (None : diffusion immédiate)"""
+    label, builder = SCHEDULE_PRESETS.get(key, SCHEDULE_PRESETS['now'])
+    return builder(datetime.now())
+
+
+def spread_seconds(key):
+    return SPREAD_PRESETS.get(key, SPREAD_PRESETS['0'])[1]
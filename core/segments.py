@@ -0,0 +1,25 @@
+from datetime import datetime, timedelta
+
+# Segments proposés à l'admin : clé -> (libellé, segment relatif à la date du jour)
+SEGMENT_PRESETS = {
+    'all': ("👥 Tous", lambda now: {}),
+    'verified': ("✅ Vérifiés", lambda now: {'verified': True}),
+    'active_7d': ("🔥 Actifs 7 jours", lambda now: {'seen_after': (now - timedelta(days=7)).isoformat()}),
+    'active_30d': ("📅 Actifs 30 jours", lambda now: {'seen_after': (now - timedelta(days=30)).isoformat()}),
+    'players_30d': ("🎮 Joueurs 30 jours", lambda now: {'played_after': (now - timedelta(days=30)).isoformat()}),
+    'referrers': ("🤝 Parrains", lambda now: {'min_referrals': 1}),
+    'new_7d': ("🆕 Inscrits 7 jours", lambda now: {'created_after': (now - timedelta(days=7)).isoformat()}),
+    'lang_fr': ("🇫🇷 Français", lambda now: {'language': 'fr'}),
+    'lang_en': ("🇬🇧 English", lambda now: {'language': 'en'}),
+    'lang_ar': ("🇸🇦 العربية", lambda now: {'language': 'ar'}),
+}
+
+
+def build_segment(key):
+    """Segment absolu (dates figées) d'un preset, pour qu'une reprise vise la même audience"""
+    label, builder = SEGMENT_PRESETS.get(key, SEGMENT_PRESETS['all'])
+    return builder(datetime.now())
+
+
+def segment_label(key):
+    return SEGMENT_PRESETS.get(key, SEGMENT_PRESETS['all'])[0]
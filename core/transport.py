@@ -0,0 +1,201 @@
+import asyncio
+import importlib.util
+import logging
+import time
+from collections import deque
+
+import httpx
+from telegram.error import TimedOut
+from telegram.request import BaseRequest, HTTPXRequest
+
+from core.gateway import PRIORITY_BULK, current_priority
+
+logger = logging.getLogger(__name__)
+
+POOL_INTERACTIVE = 'interactive'
+POOL_BULK = 'bulk'
+
+
+def _http2_available():
+    # h2 est installé par python-telegram-bot[http2]
+    return importlib.util.find_spec("h2") is not None
+
+
+class _PoolMeter:
+    """Occupation d'un pool de connexions : un créneau par requête en vol, temps d'attente mesuré"""
+
+    def __init__(self, size, samples=1000):
+        self.size = size
+        self.semaphore = asyncio.Semaphore(size)
+        self.waits = deque(maxlen=samples)  # Dernières attentes (secondes)
+        self.requests = 0
+        self.waited = 0  # Requêtes ayant trouvé le pool plein
+        self.timeouts = 0
+        self.in_flight = 0
+
+    async def acquire(self, timeout):
+        """Prendre un créneau ; renvoie le temps d'attente (secondes)"""
+        start = time.perf_counter()
+        if not self.semaphore.locked():
+            await self.semaphore.acquire()  # Créneau libre : pas de suspension
+        else:
+            self.waited += 1
+            try:
+                await asyncio.wait_for(self.semaphore.acquire(), timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                self.waits.append(time.perf_counter() - start)
+                raise
+        wait = time.perf_counter() - start
+        self.waits.append(wait)
+        self.requests += 1
+        self.in_flight += 1
+        return wait
+
+    def release(self):
+        self.in_flight -= 1
+        self.semaphore.release()
+
+    def snapshot(self):
+        waits = sorted(self.waits)
+        p95 = waits[int(len(waits) * 0.95) - 1] if len(waits) >= 20 else (waits[-1] if waits else 0.0)
+        return {
+            'size': self.size,
+            'in_flight': self.in_flight,
+            'requests': self.requests,
+            'waited': self.waited,
+            'timeouts': self.timeouts,
+            'wait_p95': p95,
+            'wait_max': waits[-1] if waits else 0.0,
+        }
+
+
+class TransportRouter(BaseRequest):
+    """Transport HTTP des appels à l'API Bot, en deux pools de connexions.
+
+    Les envois de masse (priorité PRIORITY_BULK, fixée par la passerelle) et
+    les uploads de fichiers passent par le pool « bulk », aux délais larges ;
+    tout le reste (réponses aux utilisateurs, callbacks, admin) garde son
+    propre pool aux délais courts, jamais saturé par une diffusion.
+
+    Chaque pool est mesuré : une requête attend un créneau libre (autant que
+    de connexions) avant de partir ; l'attente, bornée par le pool_timeout,
+    est enregistrée et lisible via `stats()`.
+    """
+
+    def __init__(self, interactive, bulk, interactive_pool_size, bulk_pool_size,
+                 pool_timeout=5.0, media_read_timeout=None, slow_wait=1.0):
+        self.requests = {POOL_INTERACTIVE: interactive, POOL_BULK: bulk}
+        self.meters = {POOL_INTERACTIVE: _PoolMeter(interactive_pool_size), POOL_BULK: _PoolMeter(bulk_pool_size)}
+        self.pool_timeout = pool_timeout
+        self.media_read_timeout = media_read_timeout
+        self.slow_wait = slow_wait  # Attente (secondes) au-delà de laquelle on prévient dans les logs
+
+    @property
+    def read_timeout(self):
+        return self.requests[POOL_INTERACTIVE].read_timeout
+
+    async def initialize(self):
+        for request in self.requests.values():
+            await request.initialize()
+
+    async def shutdown(self):
+        for request in self.requests.values():
+            await request.shutdown()
+
+    def stats(self):
+        """Occupation et attente de chaque pool"""
+        return {pool: meter.snapshot() for pool, meter in self.meters.items()}
+
+    async def do_request(self, url, method, request_data=None, read_timeout=BaseRequest.DEFAULT_NONE,
+                         write_timeout=BaseRequest.DEFAULT_NONE, connect_timeout=BaseRequest.DEFAULT_NONE,
+                         pool_timeout=BaseRequest.DEFAULT_NONE):
+        has_files = request_data is not None and request_data.contains_files
+        pool = POOL_BULK if has_files or current_priority.get() == PRIORITY_BULK else POOL_INTERACTIVE
+        if has_files and self.media_read_timeout and read_timeout is BaseRequest.DEFAULT_NONE:
+            # Telegram ne répond qu'une fois le fichier traité
+            read_timeout = self.media_read_timeout
+
+        meter = self.meters[pool]
+        wait = self.pool_timeout if pool_timeout is BaseRequest.DEFAULT_NONE else pool_timeout
+        try:
+            waited = await meter.acquire(wait)
+        except asyncio.TimeoutError:
+            raise TimedOut(f"Pool {pool} saturé : aucune connexion libre après {wait}s, requête non envoyée")
+        if waited > self.slow_wait:
+            logger.warning(f"Pool {pool} : {waited:.1f}s d'attente d'une connexion ({meter.size} connexions)")
+        try:
+            return await self.requests[pool].do_request(
+                url, method, request_data, read_timeout=read_timeout, write_timeout=write_timeout,
+                connect_timeout=connect_timeout, pool_timeout=pool_timeout
+            )
+        finally:
+            meter.release()
+
+
+_ssl_context = None
+
+
+def shared_ssl_context():
+    """Contexte TLS commun à tous les clients HTTP (charger les certificats coûte ~20 ms par client)"""
+    global _ssl_context
+    if _ssl_context is None:
+        import ssl
+
+        import certifi
+        _ssl_context = ssl.create_default_context(cafile=certifi.where())
+    return _ssl_context
+
+
+def build_request(config, pool):
+    """HTTPXRequest d'un pool, selon le profil de transport de la configuration"""
+    http2 = config.HTTP2
+    if http2 and not _http2_available():
+        logger.warning("HTTP2 demandé mais h2 absent (pip install \"python-telegram-bot[http2]\") : HTTP/1.1 utilisé")
+        http2 = False
+    if pool == POOL_BULK:
+        size = config.HTTP_BULK_POOL_SIZE
+        read_timeout, write_timeout = config.HTTP_BULK_READ_TIMEOUT, config.HTTP_BULK_WRITE_TIMEOUT
+    else:
+        size = config.HTTP_POOL_SIZE
+        read_timeout, write_timeout = config.HTTP_READ_TIMEOUT, config.HTTP_WRITE_TIMEOUT
+    return HTTPXRequest(
+        connection_pool_size=size,
+        read_timeout=read_timeout,
+        write_timeout=write_timeout,
+        connect_timeout=config.HTTP_CONNECT_TIMEOUT,
+        # La file d'attente est tenue par TransportRouter ; le pool httpx a toujours une connexion libre
+        pool_timeout=config.HTTP_POOL_TIMEOUT,
+        http_version="2" if http2 else "1.1",
+        media_write_timeout=config.HTTP_MEDIA_WRITE_TIMEOUT,
+        httpx_kwargs={
+            'limits': httpx.Limits(
+                max_connections=size,
+                max_keepalive_connections=min(size, config.HTTP_KEEPALIVE_CONNECTIONS),
+                keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+            ),
+            'verify': shared_ssl_context(),
+        }
+    )
+
+
+def build_updates_request(config):
+    """HTTPXRequest de getUpdates (une seule connexion, longue attente ajoutée par la bibliothèque)"""
+    return HTTPXRequest(
+        connection_pool_size=1,
+        read_timeout=config.HTTP_READ_TIMEOUT,
+        connect_timeout=config.HTTP_CONNECT_TIMEOUT,
+        httpx_kwargs={'verify': shared_ssl_context()}
+    )
+
+
+def build_transport(config):
+    """Transport HTTP des appels à l'API Bot (un par application, construit par Services)"""
+    return TransportRouter(
+        build_request(config, POOL_INTERACTIVE),
+        build_request(config, POOL_BULK),
+        config.HTTP_POOL_SIZE,
+        config.HTTP_BULK_POOL_SIZE,
+        pool_timeout=config.HTTP_POOL_TIMEOUT,
+        media_read_timeout=config.HTTP_MEDIA_READ_TIMEOUT,
+    )
@@ -1,12 +1,13 @@
 import os
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from utils.media_optimizer import resolve_media
 
 class Tutorial:
     def __init__(self, config, database):
         self.config = config
         self.database = database
         self.texts = self._load_texts()
-        self.tutorial_image_path = "media/tutorials/tutorials.jpg"
+        self.tutorial_image_path = resolve_media("media/tutorials/tutorials.jpg")
         self.tutorials_video_path = "media/tutorials/tutorials.mp4"
 
     def _load_texts(self):
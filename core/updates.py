@@ -0,0 +1,82 @@
+import asyncio
+import logging
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class _UserSlot:
+    """File d'un utilisateur : verrou FIFO et nombre d'updates en cours ou en attente"""
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class UserUpdateProcessor(BaseUpdateProcessor):
+    """Traitement concurrent des updates, dans l'ordre pour un même utilisateur.
+
+    Les updates de deux utilisateurs différents sont traités en parallèle
+    (au plus `workers` à la fois) ; ceux d'un même utilisateur passent l'un
+    après l'autre, dans leur ordre d'arrivée, ce qui protège les états de
+    conversation (waiting_for_coupon, question en attente, ID de compte...).
+
+    Un update n'occupe un des `workers` qu'une fois le verrou de son
+    utilisateur obtenu : un utilisateur qui enchaîne les clics pendant un
+    traitement lent ne bloque pas les autres. `max_pending` borne le nombre
+    total d'updates acceptés (en cours + en attente de leur utilisateur).
+    """
+
+    def __init__(self, workers=16, max_pending=1024):
+        super().__init__(max(max_pending, workers))
+        self.workers = workers
+        self.semaphore = asyncio.Semaphore(workers)
+        self.slots = {}
+        self.stats = {'processed': 0, 'serialized': 0}
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        self.slots.clear()
+
+    @staticmethod
+    def update_key(update):
+        """Clé de sérialisation : l'utilisateur, à défaut le chat (None : aucun ordre à garantir)"""
+        if not isinstance(update, Update):
+            return None
+        if update.effective_user is not None:
+            return update.effective_user.id
+        if update.effective_chat is not None:
+            return update.effective_chat.id
+        return None
+
+    def busy_users(self):
+        """Nombre d'utilisateurs ayant au moins un update en cours ou en attente"""
+        return len(self.slots)
+
+    async def do_process_update(self, update, coroutine):
+        key = self.update_key(update)
+        if key is None:
+            async with self.semaphore:
+                await coroutine
+            self.stats['processed'] += 1
+            return
+
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self.slots[key] = _UserSlot()
+        elif slot.users:
+            self.stats['serialized'] += 1
+        slot.users += 1
+        try:
+            async with slot.lock:
+                async with self.semaphore:
+                    await coroutine
+            self.stats['processed'] += 1
+        finally:
+            slot.users -= 1
+            if slot.users == 0 and self.slots.get(key) is slot:
+                del self.slots[key]
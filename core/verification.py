@@ -3,13 +3,13 @@ from telegram import InlineKeyboardButton, InlineKeyboardMarkup, ChatMember
 from telegram.ext import ContextTypes
 from telegram.error import BadRequest
 from utils.helpers import load_texts
-from core.navigation import Navigation 
 
 class GroupVerification:
-    def __init__(self, config, database):
+    def __init__(self, config, database, services):
         self.config = config
         self.database = database
         self.texts = load_texts()
+        self.services = services  # Services partagés (core.app.Services), dont la navigation
 
     def is_user_verified(self, user_id: int) -> bool:
         """Vérifie si l'utilisateur est déjà vérifié."""
@@ -74,8 +74,7 @@ class GroupVerification:
                     parse_mode="HTML"
                 )
                 
-                nav = Navigation(self.config, self.database)
-                await nav.show_main_menu(update, context)
+                await self.services.navigation.show_main_menu(update, context)
             else:
                 # Ce cas ne devrait presque jamais arriver, sauf pour le statut 'kicked' (banni).
                 await context.bot.send_message(
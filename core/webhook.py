@@ -0,0 +1,265 @@
+"""
+Serveur HTTP asyncio du bot, sur la boucle de l'application : webhook Telegram,
+/healthz (vivacité) et /readyz (prêt à recevoir des updates).
+
+En mode polling, seules les routes de santé sont servies (elles remplacent
+l'ancien serveur Flask keep_alive, sur le même port 8090). En mode webhook,
+POST /<WEBHOOK_PATH> reçoit les updates ; l'en-tête
+X-Telegram-Bot-Api-Secret-Token doit correspondre au secret transmis à
+setWebhook.
+
+Rejouer des updates enregistrés (WEBHOOK_RECORD_PATH, un JSON par ligne)
+contre un bot lancé en local avec RUN_MODE=webhook :
+    python -m core.webhook --replay updates.jsonl
+    python -m core.webhook --replay updates.jsonl --url http://127.0.0.1:8090/telegram --secret s3cr3t
+"""
+import argparse
+import asyncio
+import hmac
+import json
+import logging
+import secrets
+import signal
+import time
+
+from telegram import Update
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = 'x-telegram-bot-api-secret-token'
+MAX_BODY_SIZE = 1024 * 1024  # Les updates Telegram font quelques Ko
+MAX_HEADERS = 64
+
+STATUS_LINES = {
+    200: "200 OK",
+    400: "400 Bad Request",
+    403: "403 Forbidden",
+    404: "404 Not Found",
+    405: "405 Method Not Allowed",
+    413: "413 Payload Too Large",
+    503: "503 Service Unavailable",
+}
+
+
+class WebhookServer:
+    """Serveur HTTP/1.1 minimal (keep-alive, Content-Length) pour le webhook et la santé du bot"""
+
+    def __init__(self, application, path=None, secret_token=None, record_path=None):
+        if path and not secret_token:
+            # Sans secret, n'importe qui pourrait poster de faux updates (ex. au nom de l'admin)
+            raise ValueError("Le webhook exige un secret (X-Telegram-Bot-Api-Secret-Token)")
+        self.application = application
+        self.path = f"/{path.strip('/')}" if path else None  # None : routes de santé seulement
+        self.secret_token = secret_token
+        self.record_path = record_path
+        self.webhook_registered = False
+        self.server = None
+        self.stats = {'updates': 0, 'rejected': 0}
+
+    async def start(self, host, port):
+        self.server = await asyncio.start_server(self._handle_connection, host, port)
+        logger.info(f"Serveur HTTP à l'écoute sur {host}:{port}" + (f" (webhook {self.path})" if self.path else ""))
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    def is_ready(self):
+        """Prêt : application démarrée et source d'updates active (webhook enregistré ou polling)"""
+        if not self.application.running:
+            return False
+        if self.path is not None:
+            return self.webhook_registered
+        updater = self.application.updater
+        return updater is not None and updater.running
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    if len(headers) >= MAX_HEADERS:
+                        await self._respond(writer, 400, {'ok': False}, close=True)
+                        return
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, target = request_line.decode('latin-1').split()[:2]
+                except ValueError:
+                    break
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {'ok': False}, close=True)
+                    break
+                if length > MAX_BODY_SIZE:
+                    await self._respond(writer, 413, {'ok': False}, close=True)
+                    break
+                body = await reader.readexactly(length)
+
+                code, payload = await self._route(method, target.split('?')[0], headers, body)
+                await self._respond(writer, code, payload)
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ValueError:
+            # Ligne plus longue que la limite du StreamReader (64 Ko)
+            logger.warning("Requête HTTP rejetée : ligne d'en-tête trop longue")
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, code, payload, close=False):
+        data = json.dumps(payload).encode()
+        head = f"HTTP/1.1 {STATUS_LINES[code]}\r\nContent-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+        if close:
+            head += "Connection: close\r\n"
+        writer.write((head + "\r\n").encode() + data)
+        await writer.drain()
+
+    async def _route(self, method, path, headers, body):
+        if path in ('/', '/healthz'):
+            # Vivacité : la boucle répond ('/' garde la compatibilité avec les sondes externes de l'ancien keep_alive)
+            return 200, {'status': 'ok'}
+        if path == '/readyz':
+            ready = self.is_ready()
+            return (200 if ready else 503), {'ready': ready, 'updates': self.stats['updates']}
+        if self.path is None or path != self.path:
+            return 404, {'ok': False}
+        if method != 'POST':
+            return 405, {'ok': False}
+        return await self._handle_update(headers, body)
+
+    async def _handle_update(self, headers, body):
+        if not hmac.compare_digest(
+            headers.get(SECRET_HEADER, '').encode(), self.secret_token.encode()
+        ):
+            self.stats['rejected'] += 1
+            logger.warning("Update refusé : secret du webhook invalide")
+            return 403, {'ok': False}
+        try:
+            update = Update.de_json(json.loads(body), self.application.bot)
+        except (ValueError, TypeError, KeyError) as e:
+            logger.error(f"Update illisible reçu sur le webhook: {e}")
+            return 400, {'ok': False}
+
+        if self.record_path:
+            with open(self.record_path, 'a', encoding='utf-8') as f:
+                f.write(body.decode('utf-8') + "\n")
+
+        # Traitement asynchrone : Telegram n'attend que l'accusé de réception
+        await self.application.update_queue.put(update)
+        self.stats['updates'] += 1
+        return 200, {'ok': True}
+
+
+async def run_webhook(application, server, config):
+    """Démarrer l'application en mode webhook jusqu'à SIGINT/SIGTERM.
+
+    Reprend le cycle de vie de run_polling (initialize, post_init, start...,
+    post_shutdown) ; le serveur HTTP est démarré et arrêté ici."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await application.initialize()
+    try:
+        if application.post_init:
+            await application.post_init(application)
+        await server.start(http_host(config), config.HTTP_PORT)
+        await application.start()
+
+        if config.WEBHOOK_URL:
+            await application.bot.set_webhook(
+                url=f"{config.WEBHOOK_URL.rstrip('/')}{server.path}",
+                secret_token=server.secret_token,
+                allowed_updates=Update.ALL_TYPES,
+                max_connections=config.WEBHOOK_MAX_CONNECTIONS
+            )
+            logger.info(f"Webhook enregistré : {config.WEBHOOK_URL.rstrip('/')}{server.path}")
+        else:
+            logger.warning("WEBHOOK_URL absent : webhook non enregistré auprès de Telegram (tests locaux)")
+        server.webhook_registered = True
+
+        await stop.wait()
+    finally:
+        server.webhook_registered = False
+        await server.stop()
+        if application.running:
+            await application.stop()
+        if application.post_stop:
+            await application.post_stop(application)
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
+
+
+def http_host(config):
+    """Interface d'écoute : toutes par défaut (sondes de disponibilité externes), HTTP_HOST pour la restreindre"""
+    return config.HTTP_HOST or "0.0.0.0"
+
+
+def webhook_secret(config):
+    """Secret du webhook : celui de la configuration, sinon un secret aléatoire par démarrage"""
+    if config.WEBHOOK_SECRET:
+        return config.WEBHOOK_SECRET
+    if not config.WEBHOOK_URL:
+        logger.warning("WEBHOOK_SECRET absent : secret aléatoire, définissez-le pour rejouer des updates en local")
+    return secrets.token_urlsafe(32)
+
+
+async def replay(path, url, secret=None, delay=0.0):
+    """Poster des updates enregistrés (un JSON par ligne) sur le webhook"""
+    import httpx
+
+    codes = {}
+    latencies = []
+    headers = {SECRET_HEADER: secret} if secret else {}
+    async with httpx.AsyncClient() as client:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                start = time.perf_counter()
+                response = await client.post(url, content=line.strip().encode(), headers={
+                    **headers, 'Content-Type': 'application/json'
+                })
+                latencies.append(time.perf_counter() - start)
+                codes[response.status_code] = codes.get(response.status_code, 0) + 1
+                if delay:
+                    await asyncio.sleep(delay)
+    return codes, latencies
+
+
+def main():
+    from config.settings import Config
+
+    parser = argparse.ArgumentParser(description="Rejouer des updates enregistrés contre le webhook local")
+    parser.add_argument('--replay', required=True, help="Fichier JSONL d'updates (WEBHOOK_RECORD_PATH)")
+    parser.add_argument('--url', default=f"http://127.0.0.1:{Config.HTTP_PORT}/{Config.WEBHOOK_PATH}")
+    parser.add_argument('--secret', default=Config.WEBHOOK_SECRET or None)
+    parser.add_argument('--delay', type=float, default=0.0, help="Pause entre deux updates (secondes)")
+    args = parser.parse_args()
+
+    codes, latencies = asyncio.run(replay(args.replay, args.url, args.secret, args.delay))
+    total = sum(codes.values())
+    print(f"{total} updates rejoués sur {args.url}")
+    print("Codes HTTP : " + ", ".join(f"{code}: {count}" for code, count in sorted(codes.items())))
+    if latencies:
+        print(f"Accusé de réception moyen : {sum(latencies) / len(latencies) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
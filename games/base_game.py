@@ -1,11 +1,22 @@
+import random
 from abc import ABC, abstractmethod
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from utils.image_processor import ImageProcessor
 
 class BaseGame(ABC):
-    def __init__(self, config, database):
+    # callback_data du bouton "Rejouer" ("play:<clé du jeu>", fixé par GameManager)
+    play_callback = None
+    # callback_data d'avant le routeur, encore présent sur d'anciens messages
+    legacy_play_callback = None
+    
+    def __init__(self, config, database, services):
         self.config = config
         self.database = database
         self.image_processor = ImageProcessor()
+        self.render_service = services.render_service
+        self.outcome_table = services.outcome_table
+        # "edit" : chaque manche modifie le message de la précédente ; "resend" : suppression + nouvel envoi
+        self.edit_rounds = getattr(config, 'GAME_ROUND_MODE', 'edit') == 'edit'
         
     @abstractmethod
     async def start_game(self, update, context, user_id):
@@ -43,3 +54,35 @@ class BaseGame(ABC):
         
         # Marquer l'utilisateur comme en attente d'ID
         self.database.update_user(user_id, {'waiting_for_account_id': self.name})
+
+    def get_outcomes(self):
+        """Issues fixes du jeu : {issue: (chemin_image, clé_texte, paramètres)}. Vide si le jeu n'en a pas"""
+        return {}
+
+    def draw_outcome(self):
+        """Tirer une issue au hasard"""
+        return random.choice(list(self.get_outcomes()))
+
+    def get_result_keyboard(self, texts):
+        """Clavier affiché sous le résultat d'une manche"""
+        return InlineKeyboardMarkup([
+            [InlineKeyboardButton(
+                texts["play_again"], 
+                callback_data=self.play_callback
+            )],
+            [InlineKeyboardButton(
+                texts["back_button"], 
+                callback_data="back_main"
+            )]
+        ])
+
+    async def send_outcome(self, context, user_id, outcome, language, image_bytes=None, image_key=None, query=None):
+        """Afficher la réponse pré-calculée d'une issue (table construite au démarrage)"""
+        payload = self.outcome_table.get(self.name, outcome, language)
+        return await self.show_result(context, query, user_id, payload, image_bytes, image_key)
+
+    async def show_result(self, context, query, user_id, payload, image_bytes=None, image_key=None):
+        """Afficher le résultat d'une manche à la place du message qui a lancé la manche"""
+        return await self.outcome_table.show(
+            context, query, user_id, payload, image_bytes, image_key, edit=self.edit_rounds
+        )
@@ -1,17 +1,21 @@
-import random
 import os
 from games.base_game import BaseGame
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from utils.helpers import load_texts
+from utils.media_optimizer import resolve_media
+from utils.mines_renderer import MinesBoardRenderer
 
 class CasinoMinesGame(BaseGame):
-    def __init__(self, config, database):
-        super().__init__(config, database)
+    legacy_play_callback = "play_casino_mines"
+    
+    def __init__(self, config, database, services):
+        super().__init__(config, database, services)
         self.name = "Casino Mines"
         self.description = "Découvrez les trésors cachés dans les mines du casino !"
         self.type ="1win"
         self.icon = "💣"
         self.config = config
+        self.board_renderer = MinesBoardRenderer('casino_mines')
         
     async def start_game(self, update, context, user_id):
         """Démarrer le jeu Casino Mines"""
@@ -38,7 +42,7 @@ class CasinoMinesGame(BaseGame):
         keyboard = InlineKeyboardMarkup([
             [InlineKeyboardButton(
                 texts[language]["play_button"], 
-                callback_data="play_casino_mines"
+                callback_data=self.play_callback
             )],
             [InlineKeyboardButton(
                 texts[language]["back_button"], 
@@ -51,7 +55,7 @@ class CasinoMinesGame(BaseGame):
         ])
         
         # Chemin de l'image
-        image_path = "media/games/casino_mine/casino_mine_1.jpg"
+        image_path = resolve_media("media/games/casino_mine/casino_mine_1.jpg")
         
         # Vérifier si l'image existe et l'envoyer
         if os.path.exists(image_path):
@@ -100,82 +104,50 @@ class CasinoMinesGame(BaseGame):
         """Jouer une manche de Casino Mines"""
         query = update.callback_query
 
-        try:
-            await query.delete_message()
-        except Exception as e:
-            print(f"Erreur lors de la suppression du message: {e}")
-
-        
-        # Générer un nombre aléatoire entre 1 et 9 pour choisir la combinaison
-        combination_number = random.randint(1, 95)
-        
-        # Obtenir l'image correspondante pour le résultat
-        image_path = self.get_casino_mines_image(combination_number)
-        
         user_data = self.database.get_user(user_id)
         language = user_data.get('language', 'fr')
         
-        texts = load_texts()
-        
-        # Message de résultat avec la combinaison choisie
-        result_message = texts[language]["casino_mines_result"]
-        
-        keyboard = InlineKeyboardMarkup([
+        # Plateau procédural si les tuiles sont disponibles, sinon image pré-rendue
+        if self.board_renderer.is_available():
+            pattern = self.board_renderer.random_pattern()
+            board_image = await self.board_renderer.render_with(self.render_service, pattern)
+            # Image de secours (délai dépassé, file pleine) : son file_id ne doit pas être associé au motif
+            image_key = None if self.render_service.is_fallback(board_image) else ('casino_mines', pattern)
+            await self.send_outcome(context, user_id, "board", language,
+                                    image_bytes=board_image, image_key=image_key, query=query)
+        else:
+            await self.send_outcome(context, user_id, self.draw_outcome(), language, query=query)
+
+    def get_outcomes(self):
+        """Issues possibles : plateau procédural, sinon les combinaisons pré-rendues présentes sur le disque"""
+        if self.board_renderer.is_available():
+            return {"board": (None, "casino_mines_result", {})}
+        outcomes = {}
+        for combination in range(1, 96):
+            image_path = self.get_casino_mines_image(combination)
+            if os.path.exists(image_path):
+                outcomes[combination] = (image_path, "casino_mines_result", {})
+        return outcomes
+
+    def get_result_keyboard(self, texts):
+        return InlineKeyboardMarkup([
             [InlineKeyboardButton(
-                texts[language]["play_again"], 
-                callback_data="play_casino_mines"
+                texts["play_again"], 
+                callback_data=self.play_callback
             )],
             [InlineKeyboardButton(
-                texts[language]["back_button"], 
+                texts["back_button"], 
                 callback_data="start_casino_mines"
             )],
             [InlineKeyboardButton(
-                texts[language]["main_menu"], 
+                texts["main_menu"], 
                 callback_data="back_main"
             )]
         ])
-        
-        try:
-            await query.delete_message()
-        except Exception as e:
-            print(f"Erreur lors de la suppression du message: {e}")
-        # Vérifier si l'image existe
-        if os.path.exists(image_path):
-            try:
-                with open(image_path, 'rb') as photo:
-                    await context.bot.send_photo(
-                        chat_id=user_id,
-                        photo=photo,
-                        caption=result_message,
-                        reply_markup=keyboard,
-                        parse_mode="HTML"
-                    )
-            except Exception as e:
-                print(f"Erreur lors de l'envoi de l'image: {e}")
-                # Fallback: envoyer juste le texte
-                await context.bot.send_message(
-                    chat_id=user_id,
-                    text=result_message,
-                    reply_markup=keyboard,
-                    parse_mode="HTML"
-                )
-        else:
-            # Si l'image n'existe pas, envoyer juste le texte
-            try:
-                await query.edit_message_text(
-                    text=result_message,
-                    reply_markup=keyboard,
-                    parse_mode="HTML"
-                )
-            except:
-                await query.edit_message_text(
-                    text=result_message,
-                    reply_markup=keyboard
-                )
             
     def get_casino_mines_image(self, combination_number):
         """Obtenir le chemin de l'image correspondante à la combinaison"""
-        return f"media/games/casino_mine/casino_mine_{combination_number}.jpg"
+        return resolve_media(f"media/games/casino_mine/casino_mine_{combination_number}.jpg")
         
     def get_game_info(self):
         return {
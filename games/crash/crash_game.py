@@ -1,16 +1,24 @@
 import random
+from collections import OrderedDict
 from games.base_game import BaseGame
+from games.outcome_table import OutcomePayload
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from utils.helpers import load_texts
 
 class CrashGame(BaseGame):
-    def __init__(self, config, database):
-        super().__init__(config, database)
+    legacy_play_callback = "play_crash"
+    
+    def __init__(self, config, database, services):
+        super().__init__(config, database, services)
         self.name = "Crash"
         self.description = "Prédiction de crash d'avion"
         self.icon = "✈️"
         self.type = "1xbet"
         
+        # Cache LRU des images déjà rendues (valeur de crash -> JPEG encodé)
+        self.render_cache = OrderedDict()
+        self.render_cache_size = 256
+        
     async def start_game(self, update, context, user_id):
         """Démarrer le jeu crash"""
         query = update.callback_query
@@ -22,7 +30,7 @@ class CrashGame(BaseGame):
         keyboard = InlineKeyboardMarkup([
             [InlineKeyboardButton(
                 texts[language]["play_button"], 
-                callback_data="play_crash"
+                callback_data=self.play_callback
             )],
             [InlineKeyboardButton(
                 texts[language]["back_button"], 
@@ -40,49 +48,23 @@ class CrashGame(BaseGame):
         """Jouer une manche de crash"""
         query = update.callback_query
 
-        # Supprimer le message précédent pour éviter les conflits
-        try:
-            await query.delete_message()
-        except Exception as e:
-            print(f"Erreur lors de la suppression du message: {e}")
-
         crash_value = self.generate_crash_value()
         
-        # Générer l'image avec la valeur
-        image_path = await self.create_crash_image(crash_value)
+        # Générer l'image avec la valeur (en mémoire, aucun accès disque)
+        image_bytes = await self.create_crash_image(crash_value)
         
         user_data = self.database.get_user(user_id)
         language = user_data.get('language', 'fr')
         
         texts = load_texts()
         
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton(
-                texts[language]["play_again"], 
-                callback_data="play_crash"
-            )],
-            [InlineKeyboardButton(
-                texts[language]["back_button"], 
-                callback_data="back_main"
-            )]
-        ])
-
-        try:
-            await query.delete_message()
-        except Exception as e:
-            print(f"Erreur lors de la suppression du message: {e}")
-        
-        with open(image_path, 'rb') as photo:
-            await context.bot.send_photo(
-                chat_id=user_id,
-                photo=photo,
-                caption=texts[language]["crash_result"].format(value=crash_value),
-                reply_markup=keyboard,
-                parse_mode="HTML"
-            )
-        #  delete the image after sending
-        import os
-        os.remove(image_path)
+        payload = OutcomePayload(
+            caption=texts[language]["crash_result"].format(value=crash_value),
+            reply_markup=self.get_result_keyboard(texts[language])
+        )
+        # Pas de file_id mémorisé pour l'image générique servie quand le rendu échoue
+        image_key = None if self.render_service.is_fallback(image_bytes) else ('crash', crash_value)
+        await self.show_result(context, query, user_id, payload, image_bytes, image_key)
             
     def generate_crash_value(self):
         """Générer une valeur de crash aléatoire"""
@@ -102,23 +84,35 @@ class CrashGame(BaseGame):
         return round(crash_point, 2)
         
     async def create_crash_image(self, crash_value):
-        """Créer une image avec la valeur de crash"""
+        """Créer une image JPEG (en mémoire) avec la valeur de crash"""
+        cached = self.render_cache.get(crash_value)
+        if cached is not None:
+            self.render_cache.move_to_end(crash_value)
+            return cached
+        
         base_image = "media/games/crash/crash_base.png"
-        output_path = f"media/games/crash/crash_result_{crash_value}.png"
         
         # Position où placer le texte (x, y)
         text_position = (680, 310)
         
-        self.image_processor.add_text_to_image(
+        # Rendu dans le pool de processus (image de base en secours)
+        image_bytes = await self.render_service.render_text(
             base_image,
             str("x"+ str(crash_value)),
             text_position,
-            output_path,
+            fallback_path=base_image,
             font_size=65,
-            color="white"
+            color="white",
+            image_format="JPEG",
+            quality=80
         )
         
-        return output_path
+        if not self.render_service.is_fallback(image_bytes):
+            self.render_cache[crash_value] = image_bytes
+            if len(self.render_cache) > self.render_cache_size:
+                self.render_cache.popitem(last=False)
+        
+        return image_bytes
         
     def get_game_info(self):
         return {
@@ -1,12 +1,14 @@
 import random
-import os
 from games.base_game import BaseGame
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from utils.helpers import load_texts, check_cooldown, update_game_time
+from utils.media_optimizer import resolve_media
 
 class WheelGame(BaseGame):
-    def __init__(self, config, database):
-        super().__init__(config, database)
+    legacy_play_callback = "play_wheel"
+    
+    def __init__(self, config, database, services):
+        super().__init__(config, database, services)
         self.name = "Apple Of Fortune"
         self.description = "Choisir la bonne pomme pour gagner des récompenses !"
         self.icon = "🍎"
@@ -23,7 +25,7 @@ class WheelGame(BaseGame):
         keyboard = InlineKeyboardMarkup([
             [InlineKeyboardButton(
                 texts[language]["play_button"], 
-                callback_data="play_wheel"
+                callback_data=self.play_callback
             )],
             [InlineKeyboardButton(
                 texts[language]["back_button"], 
@@ -40,64 +42,25 @@ class WheelGame(BaseGame):
     async def play_round(self, update, context, user_id):
         """Jouer une manche de pommes"""
         query = update.callback_query
-        
-        try:
-            await query.delete_message()
-        except Exception as e:
-            print(f"Erreur lors de la suppression du message: {e}")
 
         winning_apple = random.randint(1, 5)
         
-        # Obtenir l'image correspondante
-        image_path = self.get_apple_image(winning_apple)
-        
         user_data = self.database.get_user(user_id)
         language = user_data.get('language', 'fr')
         
-        texts = load_texts()
-        
-        # Message de résultat
-        result_message = texts[language]["apple_result"].format(position=winning_apple)
-        
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton(
-                texts[language]["play_again"], 
-                callback_data="play_wheel"
-            )],
-            [InlineKeyboardButton(
-                texts[language]["back_button"], 
-                callback_data="back_main"
-            )]
-        ])
-        
+        # Réponse pré-calculée (légende, clavier, image/file_id)
+        await self.send_outcome(context, user_id, winning_apple, language, query=query)
 
-        try:
-            await query.delete_message()
-        except Exception as e:
-            print(f"Erreur lors de la suppression du message: {e}")
-        
-        # Vérifier si l'image existe
-        if os.path.exists(image_path):
-            with open(image_path, 'rb') as photo:
-                await context.bot.send_photo(
-                    chat_id=user_id,
-                    photo=photo,
-                    caption=result_message,
-                    reply_markup=keyboard,
-                    parse_mode="HTML"
-                )
-        else:
-            # Si l'image n'existe pas, envoyer un nouveau message texte
-            await context.bot.send_message(
-                chat_id=user_id,
-                text=result_message,
-                reply_markup=keyboard,
-                parse_mode="HTML"
-            )
+    def get_outcomes(self):
+        """Issues possibles : position de la pomme gagnante"""
+        return {
+            position: (self.get_apple_image(position), "apple_result", {'position': position})
+            for position in range(1, 6)
+        }
             
     def get_apple_image(self, apple_number):
         """Obtenir le chemin de l'image de la pomme correspondante"""
-        return f"media/games/apple/apple_{apple_number}.jpeg"
+        return resolve_media(f"media/games/apple/apple_{apple_number}.jpeg")
         
     def get_game_info(self):
         return {
@@ -8,27 +8,41 @@ from games.swamp_lannd.swamp_land import SwampLandGame
 from games.thimbles.thimbles import ThimblesGame
 from games.under_over_7.under_over_7 import UnderOver7Game
 from games.casino_mines.casino_mines import CasinoMinesGame
-from utils.helpers import load_texts
+from utils.helpers import load_texts, update_game_time
 
 class GameManager:
-    def __init__(self, config, database):
+    def __init__(self, config, database, services):
         self.config = config
         self.database = database
         self.texts = load_texts()
         
         self.games = {
-            'crash': CrashGame(config, database),
-            'Apple Of Fortune': WheelGame(config, database),
-            'Under Over 7' : UnderOver7Game(config, database),
-            'game of thrones': GameOfThrones(config, database),  # Exemple de jeu supplémentaire
-            'kamikaze': KamikazeGame(config, database),
-            'thimbles': ThimblesGame(config, database),
-            'swamp_land': SwampLandGame(config, database),
-            'games_mines': GamesMinesGame(config, database),  # Assurez-vous que ce jeu est importé
-            'casino_mines': CasinoMinesGame(config, database),  # Assurez-vous que ce jeu est importé
+            'crash': CrashGame(config, database, services),
+            'Apple Of Fortune': WheelGame(config, database, services),
+            'Under Over 7' : UnderOver7Game(config, database, services),
+            'game of thrones': GameOfThrones(config, database, services),  # Exemple de jeu supplémentaire
+            'kamikaze': KamikazeGame(config, database, services),
+            'thimbles': ThimblesGame(config, database, services),
+            'swamp_land': SwampLandGame(config, database, services),
+            'games_mines': GamesMinesGame(config, database, services),  # Assurez-vous que ce jeu est importé
+            'casino_mines': CasinoMinesGame(config, database, services),  # Assurez-vous que ce jeu est importé
             # Ajouter d'autres jeux ici
         }
         
+        # Bouton "Rejouer" de chaque jeu : route générique du routeur de callbacks
+        for key, game in self.games.items():
+            game.play_callback = f"play:{key}"
+        
+        # Pré-calculer les réponses des jeux à issues fixes (une seule fois par application)
+        services.outcome_table.build(self.games, self.texts)
+        
+    def legacy_callbacks(self):
+        """Anciens callback_data des boutons "Jouer" -> route générique"""
+        return {
+            game.legacy_play_callback: game.play_callback
+            for game in self.games.values() if game.legacy_play_callback
+        }
+        
     def get_available_games(self):
         """Obtenir la liste des jeux disponibles"""
         return {key: game.get_game_info() for key, game in self.games.items()}
@@ -54,7 +68,7 @@ class GameManager:
            if game_info.get('type') == "1xbet":
                 keyboard.append([InlineKeyboardButton(
                     f"{game_info['icon']} {game_info['name']}",
-                    callback_data=f"game_{game_key}"
+                    callback_data=f"game:{game_key}"
                 )])
             
         # Ajouter le bouton retour
@@ -80,16 +94,13 @@ class GameManager:
                 parse_mode="HTML"
             )
         
-    async def select_game(self, update, context):
-        """Sélectionner un jeu"""
+    async def select_game(self, update, context, game_key=None):
+        """Sélectionner un jeu (game:<clé>, ou ancien format game_<clé>)"""
         query = update.callback_query
         await query.answer()
         
-        user_id = query.from_user.id
-        user_data = self.database.get_user(user_id)
-        language = user_data.get('language', 'fr')
-        
-        game_key = query.data.replace('game_', '')
+        if game_key is None:
+            game_key = query.data.replace('game_', '', 1)
         
         if game_key not in self.games:
             return
@@ -108,7 +119,7 @@ class GameManager:
         keyboard = InlineKeyboardMarkup([
             [InlineKeyboardButton(
                 self.texts[language]["new_game"], 
-                callback_data=f"start_game_{game_key}"
+                callback_data=f"start_game:{game_key}"
             )],
             [InlineKeyboardButton(
                 self.texts[language]["back_button"], 
@@ -129,90 +140,28 @@ class GameManager:
             parse_mode="HTML"
         )
         
-    async def start_game(self, update, context):
-        """Démarrer un jeu"""
+    async def start_game(self, update, context, game_key=None):
+        """Démarrer un jeu (start_game:<clé>, ou ancien format start_game_<clé>)"""
         query = update.callback_query
         await query.answer()
         
         user_id = query.from_user.id
-        game_key = query.data.replace('start_game_', '')
+        if game_key is None:
+            game_key = query.data.replace('start_game_', '', 1)
         
         if game_key in self.games:
             game = self.games[game_key]
             await game.start_game(update, context, user_id)
 
-    async def handle_play_crash(self, update, context):
-        """Gérer le bouton 'Play' pour le jeu Crash"""
-        query = update.callback_query
-        await query.answer()
-        user_id = query.from_user.id
-        if 'crash' in self.games:
-            game = self.games['crash']
-            await game.play_round(update, context, user_id)
-    async def handle_play_apple_of_fortune(self, update, context):
-        """Gérer le bouton 'Play' pour le jeu Apple Of Fortune"""
-        query = update.callback_query
-        await query.answer()
-        user_id = query.from_user.id
-        if 'Apple Of Fortune' in self.games:
-            game = self.games['Apple Of Fortune']
-            await game.play_round(update, context, user_id)
-    
-
-    async def handle_play_under_over_7(self, update, context):
-        """Gérer le bouton 'Play' pour le jeu Under Over 7 """
+    async def handle_play(self, update, context, game_key):
+        """Gérer le bouton 'Jouer' de n'importe quel jeu (play:<clé>)"""
         query = update.callback_query
         await query.answer()
-        user_id = query.from_user.id
-        if 'Under Over 7' in self.games:
-            game = self.games['Under Over 7']
-            await game.play_round(update, context, user_id)
-
-    async def handle_play_game_of_thrones(self, update, context):
-        """Gérer le bouton 'Play' pour le jeu Witch: Game of Thrones"""
-        query = update.callback_query
-        await query.answer()
-        user_id = query.from_user.id
-        if 'game of thrones' in self.games:
-            game = self.games['game of thrones']
-            await game.play_round(update, context, user_id)
-
-    async def handle_play_kamikaze(self, update, context):
-        """Gérer le bouton 'Play' pour le jeu kamikaze"""
-        query = update.callback_query
-        await query.answer()
-        user_id = query.from_user.id
-        if 'kamikaze' in self.games:
-            game = self.games['kamikaze']
-            await game.play_round(update, context, user_id)
-    
-    async def handle_play_thimbles(self, update, context):
-        """Gérer le jeu Thimbles"""
-        user_id = update.callback_query.from_user.id
-        game = self.games.get('thimbles')
-        if game:
-            await game.play_round(update, context, user_id)
-    
-    async def handle_play_swamp_land(self, update, context):
-        """Gérer le jeu Swamp Land"""
-        user_id = update.callback_query.from_user.id
-        game = self.games.get('swamp_land')
-        if game:
-            await game.play_round(update, context, user_id)
-
-    async def handle_play_games_mines(self, update, context):
-        """Gérer le jeu Games mines"""
-        user_id = update.callback_query.from_user.id
-        game = self.games.get('games_mines')
-        if game:
-            await game.play_round(update, context, user_id)
-
-    async def handle_play_casino_mines(self, update, context):
-        """Gérer le jeu Casino Mines"""
-        user_id = update.callback_query.from_user.id
-        game = self.games.get('casino_mines')
+        game = self.games.get(game_key)
         if game:
-            await game.play_round(update, context, user_id)
+            # Date de la partie : alimente last_game_at (segment "joueurs des 30 derniers jours")
+            update_game_time(query.from_user.id, game_key, self.database)
+            await game.play_round(update, context, query.from_user.id)
             
     def is_waiting_for_account_id(self, user_id):
         """Vérifier si l'utilisateur attend de saisir un ID de compte"""
@@ -275,7 +224,7 @@ class GameManager:
             if game_info.get('type')  == "1win":
                 keyboard.append([InlineKeyboardButton(
                     f"{game_info['icon']} {game_info['name']}",
-                    callback_data=f"game_{game_key}"
+                    callback_data=f"game:{game_key}"
                 )])
 
         # Ajouter le bouton retour
@@ -1,16 +1,20 @@
 import random
-import os
 from games.base_game import BaseGame
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from utils.helpers import load_texts
+from utils.media_optimizer import resolve_media
+from utils.mines_renderer import MinesBoardRenderer
 
 class GamesMinesGame(BaseGame):
-    def __init__(self, config, database):
-        super().__init__(config, database)
+    legacy_play_callback = "play_games_mines"
+    
+    def __init__(self, config, database, services):
+        super().__init__(config, database, services)
         self.name = "Games Mines"
         self.description = "Découvrez les trésors cachés sous les pavés !"
         self.icon = "💎"
         self.type = "1xbet"  # Type de jeu, peut être utilisé pour des statistiques ou des filtres
+        self.board_renderer = MinesBoardRenderer('games_mines')
         
     async def start_game(self, update, context, user_id):
         """Démarrer le jeu Games Mines"""
@@ -23,7 +27,7 @@ class GamesMinesGame(BaseGame):
         keyboard = InlineKeyboardMarkup([
             [InlineKeyboardButton(
                 texts[language]["play_button"], 
-                callback_data="play_games_mines"
+                callback_data=self.play_callback
             )],
             [InlineKeyboardButton(
                 texts[language]["back_button"], 
@@ -49,80 +53,33 @@ class GamesMinesGame(BaseGame):
         """Jouer une manche de Games Mines"""
         query = update.callback_query
 
-        try:
-            await query.delete_message()
-        except Exception as e:
-            print(f"Erreur lors de la suppression du message: {e}")
-
-        
-        # Générer un nombre aléatoire entre 1 et 10 pour choisir la combinaison
-        combination_number = random.randint(1, 10)
-        
-        # Obtenir l'image correspondante
-        image_path = self.get_games_mines_image(combination_number)
-        
         user_data = self.database.get_user(user_id)
         language = user_data.get('language', 'fr')
         
-        texts = load_texts()
-        
-        # Message de résultat avec la combinaison choisie
-        result_message = texts[language]["games_mines_result"]
-        
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton(
-                texts[language]["play_again"], 
-                callback_data="play_games_mines"
-            )],
-            [InlineKeyboardButton(
-                texts[language]["back_button"], 
-                callback_data="back_main"
-            )]
-        ])
-
-
-        try:
-            await query.delete_message()
-        except Exception as e:
-            print(f"Erreur lors de la suppression du message: {e}")
-        
-        # Vérifier si l'image existe
-        if os.path.exists(image_path):
-            try:
-                with open(image_path, 'rb') as photo:
-                    await context.bot.send_photo(
-                        chat_id=user_id,
-                        photo=photo,
-                        caption=result_message,
-                        reply_markup=keyboard,
-                        parse_mode="HTML"
-                    )
-            except Exception as e:
-                print(f"Erreur lors de l'envoi de l'image: {e}")
-                # Fallback: envoyer juste le texte
-                await context.bot.send_message(
-                    chat_id=user_id,
-                    text=result_message,
-                    reply_markup=keyboard,
-                    parse_mode="HTML"
-                )
+        # Plateau procédural si les tuiles sont disponibles, sinon image pré-rendue
+        if self.board_renderer.is_available():
+            pattern = self.board_renderer.random_pattern()
+            board_image = await self.board_renderer.render_with(self.render_service, pattern)
+            # Image de secours (délai dépassé, file pleine) : son file_id ne doit pas être associé au motif
+            image_key = None if self.render_service.is_fallback(board_image) else ('games_mines', pattern)
+            await self.send_outcome(context, user_id, "board", language,
+                                    image_bytes=board_image, image_key=image_key, query=query)
         else:
-            # Si l'image n'existe pas, envoyer juste le texte
-            try:
-                await query.edit_message_text(
-                    text=result_message,
-                    reply_markup=keyboard,
-                    parse_mode="HTML"
-                )
-            except:
-                await query.edit_message_text(
-                    text=result_message,
-                    reply_markup=keyboard
-                )
+            # Générer un nombre aléatoire entre 1 et 10 pour choisir la combinaison
+            await self.send_outcome(context, user_id, random.randint(1, 10), language, query=query)
+
+    def get_outcomes(self):
+        """Issues possibles : plateau procédural, sinon l'une des 10 combinaisons pré-rendues"""
+        if self.board_renderer.is_available():
+            return {"board": (None, "games_mines_result", {})}
+        return {
+            combination: (self.get_games_mines_image(combination), "games_mines_result", {})
+            for combination in range(1, 11)
+        }
             
     def get_games_mines_image(self, combination_number):
         """Obtenir le chemin de l'image correspondante à la combinaison"""
-        return f"media/games/games_mines/games_mines_{combination_number}.jpg"
+        return resolve_media(f"media/games/games_mines/games_mines_{combination_number}.jpg")
         
     def get_game_info(self):
         return {
@@ -0,0 +1,181 @@
+import logging
+from collections import OrderedDict
+from telegram import InputMediaPhoto
+from telegram.error import BadRequest
+
+logger = logging.getLogger(__name__)
+
+
+class OutcomePayload:
+    """Réponse pré-calculée d'une issue de jeu pour une langue donnée"""
+    __slots__ = ('caption', 'reply_markup', 'image_key', 'image_bytes')
+
+    def __init__(self, caption, reply_markup, image_key=None, image_bytes=None):
+        self.caption = caption
+        self.reply_markup = reply_markup
+        self.image_key = image_key
+        self.image_bytes = image_bytes
+
+
+class OutcomeTable:
+    """
+    Table (nom du jeu, issue, langue) -> OutcomePayload construite une seule fois au démarrage.
+    Chaque manche d'un jeu à issues fixes se résume à un tirage, une lecture dans
+    la table et un appel à l'API (par file_id dès que l'image a été envoyée une fois) :
+    la modification sur place du message de la manche précédente (`show`).
+    """
+
+    def __init__(self, max_file_ids=4096):
+        self.payloads = {}
+        self.built_games = set()
+        self.file_ids = OrderedDict()  # Clé d'image -> file_id Telegram
+        self.max_file_ids = max_file_ids
+        self._image_bytes = {}
+
+    def _load_image(self, image_path):
+        """Lire une image une seule fois (partagée entre les langues)"""
+        if image_path not in self._image_bytes:
+            try:
+                with open(image_path, 'rb') as f:
+                    self._image_bytes[image_path] = f.read()
+            except OSError:
+                self._image_bytes[image_path] = None
+        return self._image_bytes[image_path]
+
+    def build(self, games, texts):
+        """Pré-calculer les réponses de tous les jeux à issues fixes (idempotent)"""
+        for game in games.values():
+            if game.name in self.built_games:
+                continue
+            outcomes = game.get_outcomes()
+            if not outcomes:
+                continue
+
+            for language, language_texts in texts.items():
+                reply_markup = game.get_result_keyboard(language_texts)
+                for outcome, (image_path, caption_key, params) in outcomes.items():
+                    image_bytes = self._load_image(image_path) if image_path else None
+                    self.payloads[(game.name, outcome, language)] = OutcomePayload(
+                        caption=language_texts[caption_key].format(**params),
+                        reply_markup=reply_markup,
+                        image_key=image_path if image_bytes is not None else None,
+                        image_bytes=image_bytes
+                    )
+            self.built_games.add(game.name)
+
+    def get(self, game_name, outcome, language):
+        payload = self.payloads.get((game_name, outcome, language))
+        if payload is None:
+            payload = self.payloads.get((game_name, outcome, 'fr'))
+        return payload
+
+    def remember_file_id(self, image_key, message):
+        """Mémoriser le file_id renvoyé par Telegram pour ne plus réuploader l'image"""
+        # edit_message_media renvoie True pour les messages inline
+        if image_key is None or not getattr(message, 'photo', None):
+            return
+        self.file_ids[image_key] = message.photo[-1].file_id
+        self.file_ids.move_to_end(image_key)
+        if len(self.file_ids) > self.max_file_ids:
+            self.file_ids.popitem(last=False)
+
+    async def send(self, context, chat_id, payload, image_bytes=None, image_key=None):
+        """Envoyer une réponse pré-calculée (image par file_id si connu, sinon octets en mémoire)"""
+        image_key = image_key or payload.image_key
+        image_bytes = image_bytes if image_bytes is not None else payload.image_bytes
+
+        if image_bytes is None:
+            return await context.bot.send_message(
+                chat_id=chat_id,
+                text=payload.caption,
+                reply_markup=payload.reply_markup,
+                parse_mode="HTML"
+            )
+
+        file_id = self.file_ids.get(image_key)
+        if file_id is not None:
+            try:
+                return await context.bot.send_photo(
+                    chat_id=chat_id,
+                    photo=file_id,
+                    caption=payload.caption,
+                    reply_markup=payload.reply_markup,
+                    parse_mode="HTML"
+                )
+            except BadRequest as e:
+                # file_id expiré ou invalide : réuploader l'image
+                logger.warning(f"file_id invalide pour {image_key}: {e}")
+                self.file_ids.pop(image_key, None)
+
+        message = await context.bot.send_photo(
+            chat_id=chat_id,
+            photo=image_bytes,
+            caption=payload.caption,
+            reply_markup=payload.reply_markup,
+            parse_mode="HTML"
+        )
+        self.remember_file_id(image_key, message)
+        return message
+
+    async def show(self, context, query, chat_id, payload, image_bytes=None, image_key=None, edit=True):
+        """Afficher une réponse à la place du message de la manche précédente.
+
+        Le message existant est modifié sur place quand il porte déjà le même
+        type de contenu (image -> edit_message_media, texte -> edit_message_text) :
+        un seul appel. Sinon (premier tour depuis un menu texte, mode "resend"
+        ou modification refusée) : suppression puis nouvel envoi."""
+        message = query.message if query is not None else None
+        if edit and message is not None:
+            edited = await self._edit(query, message, payload, image_bytes, image_key)
+            if edited is not None:
+                return edited
+
+        if message is not None:
+            try:
+                await query.delete_message()
+            except Exception as e:
+                logger.warning(f"Suppression du message précédent impossible: {e}")
+        return await self.send(context, chat_id, payload, image_bytes, image_key)
+
+    async def _edit(self, query, message, payload, image_bytes, image_key):
+        """Modifier le message sur place ; None si ce n'est pas possible"""
+        image_key = image_key or payload.image_key
+        image_bytes = image_bytes if image_bytes is not None else payload.image_bytes
+
+        try:
+            if image_bytes is None:
+                if not message.text:
+                    return None  # Un message média ne devient pas un message texte
+                return await query.edit_message_text(
+                    text=payload.caption,
+                    reply_markup=payload.reply_markup,
+                    parse_mode="HTML"
+                )
+            if not message.photo:
+                return None
+
+            file_id = self.file_ids.get(image_key)
+            if file_id is not None:
+                try:
+                    return await query.edit_message_media(
+                        media=InputMediaPhoto(file_id, caption=payload.caption, parse_mode="HTML"),
+                        reply_markup=payload.reply_markup
+                    )
+                except BadRequest as e:
+                    if "not modified" in str(e).lower():
+                        raise
+                    logger.warning(f"file_id invalide pour {image_key}: {e}")
+                    self.file_ids.pop(image_key, None)
+
+            edited = await query.edit_message_media(
+                media=InputMediaPhoto(image_bytes, caption=payload.caption, parse_mode="HTML"),
+                reply_markup=payload.reply_markup
+            )
+            self.remember_file_id(image_key, edited)
+            return edited
+        except BadRequest as e:
+            if "not modified" in str(e).lower():
+                # Même issue que la manche précédente : le message affiché est déjà le bon
+                return message
+            logger.warning(f"Modification du message impossible, nouvel envoi: {e}")
+        return None
@@ -1,11 +1,13 @@
 import random
-import os
 from games.base_game import BaseGame
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from utils.helpers import load_texts
+from utils.media_optimizer import resolve_media
 class ThimblesGame(BaseGame):
-    def __init__(self, config, database):
-        super().__init__(config, database)
+    legacy_play_callback = "play_thimbles"
+    
+    def __init__(self, config, database, services):
+        super().__init__(config, database, services)
         self.name = "Thimbles"
         self.description = "Trouvez où se cachent les 2 boules sous les 3 pots !"
         self.icon = "🥃"
@@ -22,7 +24,7 @@ class ThimblesGame(BaseGame):
         keyboard = InlineKeyboardMarkup([
             [InlineKeyboardButton(
                 texts[language]["play_button"], 
-                callback_data="play_thimbles"
+                callback_data=self.play_callback
             )],
             [InlineKeyboardButton(
                 texts[language]["back_button"], 
@@ -47,81 +49,21 @@ class ThimblesGame(BaseGame):
     async def play_round(self, update, context, user_id):
         """Jouer une manche de Thimbles"""
         query = update.callback_query
-        
-    
-        
-        try:
-            await query.delete_message()
-        except Exception as e:
-            print(f"Erreur lors de la suppression du message: {e}")
 
         ball_position = random.randint(1, 3)
         
-        # Obtenir l'image correspondante
-        image_path = self.get_thimbles_image(ball_position)
-        
         user_data = self.database.get_user(user_id)
         language = user_data.get('language', 'fr')
         
-        texts = load_texts()
-        
-        # Message de résultat selon la position
-        if ball_position == 1:
-            result_message = texts[language]["thimbles_result_1"]
-        elif ball_position == 2:
-            result_message = texts[language]["thimbles_result_2"] 
-        else:  # ball_position == 3
-            result_message = texts[language]["thimbles_result_3"]
-        
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton(
-                texts[language]["play_again"], 
-                callback_data="play_thimbles"
-            )],
-            [InlineKeyboardButton(
-                texts[language]["back_button"], 
-                callback_data="back_main"
-            )]
-        ])
+        # Réponse pré-calculée (légende, clavier, image/file_id)
+        await self.send_outcome(context, user_id, ball_position, language, query=query)
 
-        try:
-            await query.delete_message()
-        except Exception as e:
-            print(f"Erreur lors de la suppression du message: {e}")
-        
-        # Vérifier si l'image existe
-        if os.path.exists(image_path):
-            try:
-                with open(image_path, 'rb') as photo:
-                    await context.bot.send_photo(
-                        chat_id=user_id,
-                        photo=photo,
-                        caption=result_message,
-                        reply_markup=keyboard,
-                        parse_mode="HTML"
-                    )
-            except Exception as e:
-                print(f"Erreur lors de l'envoi de l'image: {e}")
-                # Fallback: envoyer juste le texte
-                await context.bot.send_message(
-                    chat_id=user_id,
-                    text=result_message,
-                    reply_markup=keyboard,
-                    parse_mode="HTML"
-                )
-        else:
-            # Si l'image n'existe pas, envoyer juste le texte
-            try:
-                await query.edit_message_text(
-                    text=result_message,
-                    reply_markup=keyboard,
-                    parse_mode="HTML"
-                )
-            except:
-                await query.edit_message_text(
-                    text=result_message,
-                    reply_markup=keyboard
-                )
+    def get_outcomes(self):
+        """Issues possibles : position des boules (une légende par position)"""
+        return {
+            position: (self.get_thimbles_image(position), f"thimbles_result_{position}", {})
+            for position in range(1, 4)
+        }
             
     def get_thimbles_image(self, position):
         """Obtenir le chemin de l'image correspondante à la position"""
@@ -130,7 +72,7 @@ class ThimblesGame(BaseGame):
             2: "media/games/thimbles/thimbles_2.jpg",  
             3: "media/games/thimbles/thimbles_3.jpg" 
         }
-        return images.get(position, "media/thimbles/thimbles_1.jpg")
+        return resolve_media(images.get(position, "media/thimbles/thimbles_1.jpg"))
         
     def get_game_info(self):
         return {
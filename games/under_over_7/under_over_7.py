@@ -1,12 +1,14 @@
 import random
-import os
 from games.base_game import BaseGame
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from utils.helpers import load_texts, update_game_time
+from utils.media_optimizer import resolve_media
 
 class UnderOver7Game(BaseGame):
-    def __init__(self, config, database):
-        super().__init__(config, database)
+    legacy_play_callback = "play_under_over_7"
+    
+    def __init__(self, config, database, services):
+        super().__init__(config, database, services)
         self.name = "Under Over 7"
         self.description = "Devinez si la somme des dés sera inférieure, supérieure ou égale à 7 !"
         self.icon = "🎲"
@@ -23,7 +25,7 @@ class UnderOver7Game(BaseGame):
         keyboard = InlineKeyboardMarkup([
             [InlineKeyboardButton(
                 texts[language]["play_button"], 
-                callback_data="play_under_over_7"
+                callback_data=self.play_callback
             )],
             [InlineKeyboardButton(
                 texts[language]["back_button"], 
@@ -49,71 +51,22 @@ class UnderOver7Game(BaseGame):
         """Jouer une manche d'Under Over 7"""
         query = update.callback_query
 
-        try:
-            await query.delete_message()
-        except Exception as e:
-            print(f"Erreur lors de la suppression du message: {e}")
-
-        
-        # Simuler le lancement de deux dés
-        rand = random.randint(1, 3)
-        
-        
         # Déterminer le résultat
-        if rand == 1:
-            result_type = "under"
-            result_key = "under_7_result"
-        elif rand == 2:
-            result_type = "over"
-            result_key = "over_7_result"
-        else:  # total == 7
-            result_type = "equal"
-            result_key = "equal_7_result"
-        
-        # Obtenir l'image correspondante
-        image_path = self.get_result_image(result_type)
+        result_type = random.choice(("under", "over", "equal"))
         
         user_data = self.database.get_user(user_id)
         language = user_data.get('language', 'fr')
         
-        texts = load_texts()
-        
-        # Message de résultat avec les dés et le total
-        result_message = texts[language][result_key]
-        
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton(
-                texts[language]["play_again"], 
-                callback_data="play_under_over_7"
-            )],
-            [InlineKeyboardButton(
-                texts[language]["back_button"], 
-                callback_data="back_main"
-            )]
-        ])
+        # Réponse pré-calculée (légende, clavier, image/file_id)
+        await self.send_outcome(context, user_id, result_type, language, query=query)
 
-        try:
-            await query.delete_message()
-        except Exception as e:
-            print(f"Erreur lors de la suppression du message: {e}")
-        
-        # Vérifier si l'image existe
-        if os.path.exists(image_path):
-            with open(image_path, 'rb') as photo:
-                await context.bot.send_photo(
-                    chat_id=user_id,
-                    photo=photo,
-                    caption=result_message,
-                    reply_markup=keyboard,
-                    parse_mode="HTML"
-                )
-        else:
-            # Si l'image n'existe pas, envoyer juste le texte
-            await query.edit_message_text(
-                text=result_message,
-                reply_markup=keyboard,
-                parse_mode="HTML"
-            )
+    def get_outcomes(self):
+        """Issues possibles : somme des dés inférieure, supérieure ou égale à 7"""
+        return {
+            "under": (self.get_result_image("under"), "under_7_result", {}),
+            "over": (self.get_result_image("over"), "over_7_result", {}),
+            "equal": (self.get_result_image("equal"), "equal_7_result", {})
+        }
             
     def get_result_image(self, result_type):
         """Obtenir le chemin de l'image correspondante au résultat"""
@@ -122,7 +75,7 @@ class UnderOver7Game(BaseGame):
             "over": "media/games/under_over_7/over.jpg", 
             "equal": "media/games/under_over_7/7.jpg"
         }
-        return images.get(result_type, "media/under_over_7/equal.jpg")
+        return resolve_media(images.get(result_type, "media/under_over_7/equal.jpg"))
         
     def get_game_info(self):
         return {
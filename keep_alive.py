@@ -1,17 +0,0 @@
-from flask  import  Flask , render_template
-from threading  import Thread
-
-
-app =  Flask(__name__) 
-
-@app.route('/')
-def index() :
-    return 'Alive'
-
-
-def run() :
-    app.run(host='0.0.0.0', port=8090)
-
-def keep_alive():
-    t = Thread(target=run)
-    t.start()
\ No newline at end of file
@@ -0,0 +1,14 @@
+import os
+import sys
+
+# Les tests importent les modules du bot depuis la racine du dépôt
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Base SQLite vide, propre à chaque test (jamais data/database.db)"""
+    from utils.database import Database
+    return Database(str(tmp_path / "data" / "database.db"))
@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+from telegram.error import RetryAfter
+
+from core.broadcast import BroadcastEngine
+
+RECIPIENTS = list(range(8))
+
+
+def test_concurrent_flood_waits_halve_concurrency_once():
+    async def scenario():
+        all_in_flight = asyncio.Event()
+        started = []
+        retries = {}
+        flood_wait_at = []
+
+        async def send(recipient):
+            if recipient in started:
+                retries[recipient] = (time.monotonic(), engine.concurrency)
+                return {'status': 'sent'}
+            started.append(recipient)
+            if len(started) == len(RECIPIENTS):
+                all_in_flight.set()
+            await all_in_flight.wait()
+            flood_wait_at.append(time.monotonic())
+            raise RetryAfter(1)
+
+        engine = BroadcastEngine(send, rate=1000, max_concurrency=8)
+        engine.concurrency = 8.0
+        results = []
+        stats = await engine.run(RECIPIENTS, on_result=lambda recipient, result: results.append(recipient))
+        return engine, stats, results, retries, flood_wait_at
+
+    engine, stats, results, retries, flood_wait_at = asyncio.run(scenario())
+
+    # Les 8 RetryAfter simultanés ne comptent que pour un flood wait : 8 -> 4, pas 8 -> 1
+    assert min(concurrency for _, concurrency in retries.values()) == 4.0
+    assert engine.concurrency >= 4.0
+    # Chaque destinataire est remis en file et renvoyé après le délai imposé
+    assert sorted(retries) == RECIPIENTS
+    assert min(sent_at for sent_at, _ in retries.values()) >= min(flood_wait_at) + 1.0
+    assert sorted(results) == RECIPIENTS
+    assert stats == {'retried': 8, 'sent': 8}
+
+
+def test_flood_wait_after_pause_decreases_again():
+    engine = BroadcastEngine(lambda recipient: None, rate=1000, max_concurrency=8)
+    engine.concurrency = 8.0
+    engine._on_flood_wait(1)
+    engine._on_flood_wait(1)
+    assert engine.concurrency == 4.0
+    engine.bucket.paused_until = time.monotonic() - 0.01
+    engine._on_flood_wait(1)
+    assert engine.concurrency == 2.0
@@ -0,0 +1,72 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from core.broadcast_jobs import BroadcastJobs
+from core.reachability import Reachability
+
+USERS = {1: 'fr', 2: 'en', 3: 'fr', 4: 'en', 5: 'ar', 6: 'fr', 7: 'en'}
+
+
+def _jobs(database):
+    for user_id, language in USERS.items():
+        database.update_user(user_id, {'language': language})
+    config = SimpleNamespace(BROADCAST_RATE=1000, BROADCAST_MAX_CONCURRENCY=1)
+    jobs = BroadcastJobs(config, database, Reachability(database))
+    jobs.page_size = 3
+    jobs.flush_every = 1
+    return jobs
+
+
+def test_resume_after_pause_sends_each_user_once(database):
+    jobs = _jobs(database)
+    job_id = jobs.create(coupon_id=1)
+    sent = []
+
+    async def send(user_id, language):
+        sent.append(user_id)
+        if len(sent) == 4:
+            jobs.pause(job_id)
+        return {'status': 'sent'}
+
+    job, _ = asyncio.run(jobs.run(job_id, send))
+    assert job['status'] == 'paused'
+    assert len(sent) == 4
+    # Le curseur s'arrête à la dernière page terminée : (ar, 5), (en, 2), (en, 4)
+    assert json.loads(job['cursor']) == ['en', '4']
+
+    jobs.mark_running(job_id)
+    job, stats = asyncio.run(jobs.run(job_id, send))
+    assert job['status'] == 'done'
+    assert sorted(sent) == sorted(str(user_id) for user_id in USERS)
+    assert stats['sent'] == len(USERS)
+
+
+def test_resume_with_legacy_cursor_skips_delivered_users(database):
+    jobs = _jobs(database)
+    job_id = jobs.create(coupon_id=1)
+    database.record_deliveries(job_id, [('1', 'sent'), ('2', 'sent')])
+    # Ancien format (id seul) : on repart du début, le registre évite les doublons
+    database.update_broadcast_job(job_id, {'cursor': json.dumps('2')})
+    sent = []
+
+    async def send(user_id, language):
+        sent.append(user_id)
+        return {'status': 'sent'}
+
+    job, stats = asyncio.run(jobs.run(job_id, send))
+    assert job['status'] == 'done'
+    assert sorted(sent) == ['3', '4', '5', '6', '7']
+    assert stats['sent'] == len(USERS)
+
+
+def test_blocked_recipients_leave_later_broadcasts(database):
+    jobs = _jobs(database)
+    job_id = jobs.create(coupon_id=1)
+
+    async def send(user_id, language):
+        return {'status': 'blocked' if user_id == '3' else 'sent'}
+
+    asyncio.run(jobs.run(job_id, send))
+    assert '3' in jobs.reachability.unreachable
+    assert database.get_broadcast_job(jobs.create(coupon_id=2))['total'] == len(USERS) - 1
@@ -0,0 +1,40 @@
+import pytest
+
+from utils.mines_renderer import BOARD_LAYOUTS, MinesBoardRenderer, _cell_box, check_layout, reference_pattern
+
+
+@pytest.mark.parametrize('layout_key', sorted(BOARD_LAYOUTS))
+def test_cells_stay_inside_frame(layout_key):
+    outside, _ = check_layout(layout_key)
+    assert outside == []
+
+
+@pytest.mark.parametrize('layout_key', sorted(BOARD_LAYOUTS))
+def test_reference_pattern_matches_screenshot(layout_key):
+    # Un décalage d'un pixel par case fait dériver la dernière rangée : l'écart dépasse alors 10
+    _, errors = check_layout(layout_key)
+    assert sum(errors.values()) / len(errors) < 10
+
+
+def test_pitch_error_is_detected():
+    layout = BOARD_LAYOUTS['games_mines']
+    original = layout['pitch']
+    layout['pitch'] = original - 1
+    try:
+        _, errors = check_layout('games_mines')
+    finally:
+        layout['pitch'] = original
+    assert sum(errors.values()) / len(errors) >= 10
+
+
+@pytest.mark.parametrize('layout_key', sorted(BOARD_LAYOUTS))
+def test_shipped_tiles_match_layout(layout_key):
+    renderer = MinesBoardRenderer(layout_key)
+    board, tiles = renderer._load()
+    size = BOARD_LAYOUTS[layout_key]['tile_size']
+    assert tiles.shape[1:] == (size, size, 3)
+
+    composed = renderer.compose(reference_pattern(BOARD_LAYOUTS[layout_key]))
+    assert composed.shape == board.shape
+    x0, y0, x1, y1 = _cell_box(BOARD_LAYOUTS[layout_key], 0, 0)
+    assert (composed[y0:y1, x0:x1] == tiles[0]).all()
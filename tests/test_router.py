@@ -0,0 +1,66 @@
+import asyncio
+from types import SimpleNamespace
+
+from core.router import CallbackRouter
+
+
+async def _route(update, context, argument):
+    pass
+
+
+async def _exact(update, context):
+    pass
+
+
+async def _prefix(update, context):
+    pass
+
+
+def _router():
+    router = CallbackRouter()
+    router.add_route('play', _route)
+    router.add(('menu', 'play:exact'), _exact)
+    router.add_prefix('back_', _prefix)
+    router.add_prefix('play', _prefix)
+    router.alias('play_crash', 'play:crash')
+    return router
+
+
+def test_structured_route_passes_argument():
+    assert _router().resolve('play:mines') == (_route, 'mines')
+
+
+def test_alias_is_rewritten_before_lookup():
+    assert _router().resolve('play_crash') == (_route, 'crash')
+
+
+def test_structured_route_wins_over_exact_and_prefix():
+    # "play:exact" est aussi enregistré en exact et commence par le préfixe "play"
+    assert _router().resolve('play:exact') == (_route, 'exact')
+
+
+def test_exact_wins_over_prefix():
+    router = _router()
+    router.add('back_main', _exact)
+    assert router.resolve('back_main') == (_exact, None)
+
+
+def test_prefix_when_nothing_else_matches():
+    router = _router()
+    assert router.resolve('back_menu') == (_prefix, None)
+    # Route inconnue avant ':' : on retombe sur l'exact puis les préfixes
+    assert router.resolve('playground:1') == (_prefix, None)
+
+
+def test_unknown_callback_is_answered_and_counted():
+    router = _router()
+    answered = []
+
+    async def answer():
+        answered.append(True)
+
+    update = SimpleNamespace(callback_query=SimpleNamespace(data='nope', answer=answer))
+    asyncio.run(router.dispatch(update, None))
+    assert router.resolve('nope') == (None, None)
+    assert answered == [True]
+    assert router.stats == {'dispatched': 0, 'unknown': 1}
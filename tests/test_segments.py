@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+
+from core.segments import build_segment
+from utils.helpers import update_game_time
+
+
+def _add_users(database):
+    database.get_user(1)
+    database.update_user(2, {'language': 'en', 'verified': True, 'referrals': ['1', '3']})
+    database.update_user(3, {'language': 'ar'})
+    database.update_user(4, {'language': 'en'})
+
+
+def test_where_clause_and_params(database):
+    where, params = database._segment_where({'language': ['fr', 'en'], 'verified': True, 'min_referrals': 2})
+    assert where == "unreachable_since IS NULL AND language IN (?, ?) AND verified = ? AND referrals_count >= ?"
+    assert params == ['fr', 'en', True, 2]
+
+
+def test_empty_segment_ignores_unreachable_filter_on_request(database):
+    assert database._segment_where(None, reachable_only=False) == ("1 = 1", [])
+
+
+def test_count_by_language_verified_and_referrals(database):
+    _add_users(database)
+    assert database.count_segment() == 4
+    assert database.count_segment({'language': 'en'}) == 2
+    assert database.count_segment({'language': ['fr', 'ar']}) == 2
+    assert database.count_segment({'verified': True}) == 1
+    assert database.count_segment({'min_referrals': 1}) == 1
+
+
+def test_unreachable_users_are_excluded(database):
+    _add_users(database)
+    database.set_users_unreachable(['4'], 'blocked')
+    assert database.count_segment({'language': 'en'}) == 1
+    assert database.count_segment({'language': 'en'}, reachable_only=False) == 2
+    assert [user_id for user_id, _ in database.get_broadcast_recipients(segment={'language': 'en'})] == ['2']
+
+
+def test_seen_after(database):
+    _add_users(database)
+    now = datetime.now()
+    database.touch_users_last_seen({'1': now.isoformat(), '2': (now - timedelta(days=40)).isoformat()})
+    assert database.count_segment(build_segment('active_30d')) == 1
+
+
+def test_players_30d_counts_recorded_games(database):
+    _add_users(database)
+    assert database.count_segment(build_segment('players_30d')) == 0
+    update_game_time(3, 'crash', database)
+    assert database.count_segment(build_segment('players_30d')) == 1
+    assert database.count_segment({'played_before': (datetime.now() - timedelta(days=30)).isoformat()}) == 0
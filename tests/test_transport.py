@@ -0,0 +1,40 @@
+import asyncio
+from types import SimpleNamespace
+
+from telegram.request import BaseRequest
+
+from core.transport import POOL_BULK, POOL_INTERACTIVE, TransportRouter
+
+
+class RecordingRequest:
+    def __init__(self):
+        self.calls = []
+
+    async def do_request(self, url, method, request_data=None, **timeouts):
+        self.calls.append(timeouts)
+        return 200, b'{}'
+
+
+def _router():
+    return TransportRouter(RecordingRequest(), RecordingRequest(), 2, 2, media_read_timeout=60.0)
+
+
+def _upload(router, **timeouts):
+    data = SimpleNamespace(contains_files=True)
+    asyncio.run(router.do_request('https://api.telegram.org/sendPhoto', 'POST', data, **timeouts))
+    return router.requests[POOL_BULK].calls[-1]
+
+
+def test_uploads_get_media_read_timeout_by_default():
+    assert _upload(_router())['read_timeout'] == 60.0
+
+
+def test_explicit_read_timeout_is_kept():
+    assert _upload(_router(), read_timeout=5.0)['read_timeout'] == 5.0
+
+
+def test_plain_calls_use_interactive_pool_with_default_timeouts():
+    router = _router()
+    asyncio.run(router.do_request('https://api.telegram.org/getMe', 'POST'))
+    assert router.requests[POOL_INTERACTIVE].calls[-1]['read_timeout'] is BaseRequest.DEFAULT_NONE
+    assert router.stats()[POOL_INTERACTIVE]['requests'] == 1
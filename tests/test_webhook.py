@@ -0,0 +1,69 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from core.webhook import WebhookServer, http_host
+
+UPDATE = json.dumps({'update_id': 1}).encode()
+
+
+class FakeApplication:
+    running = True
+    updater = None
+    bot = None
+
+    def __init__(self):
+        self.update_queue = asyncio.Queue()
+
+
+async def _post(port, headers=b""):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(
+        b"POST /telegram HTTP/1.1\r\n" + headers
+        + b"Content-Length: %d\r\nConnection: close\r\n\r\n" % len(UPDATE) + UPDATE
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return int(response.split(b" ", 2)[1])
+
+
+def _run(headers):
+    async def scenario():
+        application = FakeApplication()
+        server = WebhookServer(application, path='telegram', secret_token='s3cr3t')
+        await server.start('127.0.0.1', 0)
+        try:
+            status = await _post(server.server.sockets[0].getsockname()[1], headers)
+        finally:
+            await server.stop()
+        return status, application.update_queue.qsize(), server.stats
+
+    return asyncio.run(scenario())
+
+
+def test_webhook_requires_a_secret():
+    with pytest.raises(ValueError):
+        WebhookServer(FakeApplication(), path='telegram')
+
+
+def test_missing_secret_is_rejected():
+    status, queued, stats = _run(b"")
+    assert (status, queued, stats['rejected']) == (403, 0, 1)
+
+
+def test_wrong_secret_is_rejected():
+    status, queued, stats = _run(b"X-Telegram-Bot-Api-Secret-Token: s3cr3t-\r\n")
+    assert (status, queued, stats['rejected']) == (403, 0, 1)
+
+
+def test_valid_secret_is_queued():
+    status, queued, stats = _run(b"X-Telegram-Bot-Api-Secret-Token: s3cr3t\r\n")
+    assert (status, queued, stats['updates']) == (200, 1, 1)
+
+
+def test_health_server_listens_publicly_by_default():
+    assert http_host(SimpleNamespace(HTTP_HOST="", WEBHOOK_URL="")) == "0.0.0.0"
+    assert http_host(SimpleNamespace(HTTP_HOST="127.0.0.1", WEBHOOK_URL="https://example.org")) == "127.0.0.1"
@@ -6,6 +6,8 @@ from datetime import datetime
 class Database:
     def __init__(self, db_path="data/database.db"):
         self.db_path = db_path
+        # Incrémenté à chaque modification des coupons : invalide les caches (coupons du jour)
+        self.coupons_version = 0
         self._init_database()
     
     def _init_database(self):
@@ -60,6 +62,43 @@ class Database:
             )
         ''')
 
+        # Diffusions persistées (reprise après redémarrage)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS broadcast_jobs (
+                job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                coupon_id TEXT,
+                status TEXT DEFAULT 'running',  -- scheduled, running, paused, cancelled, done
+                rate REAL,
+                cursor TEXT,  -- JSON [langue, id] du dernier destinataire d'une page terminée
+                total INTEGER DEFAULT 0,
+                stats TEXT,  -- JSON string des compteurs par statut
+                created_at TEXT,
+                updated_at TEXT,
+                finished_at TEXT
+            )
+        ''')
+
+        # Statut de livraison par destinataire et par diffusion
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS broadcast_deliveries (
+                job_id INTEGER,
+                user_id TEXT,
+                status TEXT,
+                updated_at TEXT,
+                PRIMARY KEY (job_id, user_id)
+            ) WITHOUT ROWID
+        ''')
+
+        # Coupons reçus par chaque utilisateur via le menu (les diffusions sont dans broadcast_deliveries)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS coupon_receipts (
+                user_id TEXT,
+                coupon_id TEXT,
+                received_at TEXT,
+                PRIMARY KEY (user_id, coupon_id)
+            ) WITHOUT ROWID
+        ''')
+
         # Table de verrouillage du bot
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS bot_lock (
@@ -69,29 +108,94 @@ class Database:
         ''')
 
         
-        # Vérifier si la table existe déjà et ajouter les nouvelles colonnes si nécessaire
-        cursor.execute("PRAGMA table_info(coupons)")
-        columns = [column[1] for column in cursor.fetchall()]
-        
         # Ajouter les nouvelles colonnes si elles n'existent pas
-        new_columns = [
+        self._add_missing_columns(cursor, 'coupons', [
             ('text', 'TEXT'),
             ('media_type', 'TEXT DEFAULT \'text\''),
             ('photo_path', 'TEXT'),
             ('video_path', 'TEXT'),
-            ('admin_id', 'TEXT')
-        ]
+            ('admin_id', 'TEXT'),
+            ('file_id', 'TEXT'),
+            ('thumbnail_file_id', 'TEXT'),
+            ('video_duration', 'INTEGER'),
+            ('video_width', 'INTEGER'),
+            ('video_height', 'INTEGER'),
+            ('thumbnail_path', 'TEXT'),
+            ('texts', 'TEXT')  # JSON {langue: texte} pour les coupons multilingues
+        ])
+        
+        added_user_columns = self._add_missing_columns(cursor, 'users', [
+            ('unreachable_since', 'TEXT'),  # Bot bloqué / chat supprimé (NULL = joignable)
+            ('unreachable_reason', 'TEXT'),
+            ('last_seen', 'TEXT'),  # Dernier update reçu (segmentation)
+            ('referrals_count', 'INTEGER DEFAULT 0'),  # Copie indexable de len(referrals)
+            ('last_game_at', 'TEXT')  # Dernière partie, tous jeux confondus
+        ])
+        if 'referrals_count' in added_user_columns or 'last_game_at' in added_user_columns:
+            self._backfill_segment_columns(cursor)
+        
+        self._add_missing_columns(cursor, 'broadcast_jobs', [
+            ('segment', 'TEXT'),  # JSON du segment d'audience ciblé
+            ('scheduled_at', 'TEXT'),  # Début programmé (diffusions 'scheduled')
+            ('spread_seconds', 'REAL DEFAULT 0'),  # Fenêtre sur laquelle étaler les envois
+            ('captions', 'TEXT')  # JSON des légendes pré-rendues, par langue
+        ])
+        
+        # Les diffusions parcourent les utilisateurs par (langue, id) : pas de langue NULL
+        cursor.execute("UPDATE users SET language = 'fr' WHERE language IS NULL")
+        cursor.execute("DROP INDEX IF EXISTS idx_users_language")
+        
+        # Index de segmentation des diffusions
+        for index_name, column_name in (
+            ('idx_users_language_id', 'language, id'),
+            ('idx_users_verified', 'verified'),
+            ('idx_users_created_at', 'created_at'),
+            ('idx_users_last_seen', 'last_seen'),
+            ('idx_users_referrals_count', 'referrals_count'),
+            ('idx_users_last_game_at', 'last_game_at'),
+            ('idx_users_unreachable', 'unreachable_since')
+        ):
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON users ({column_name})")
+        
+        # Coupons déjà reçus par diffusion : diffusions d'un coupon
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_broadcast_jobs_coupon_id ON broadcast_jobs (coupon_id)")
+        
+        conn.commit()
+        conn.close()
+    
+    def _add_missing_columns(self, cursor, table, new_columns):
+        """Ajouter à une table les colonnes absentes ; retourne les noms ajoutés"""
+        cursor.execute(f"PRAGMA table_info({table})")
+        columns = [column[1] for column in cursor.fetchall()]
         
+        added = []
         for column_name, column_type in new_columns:
             if column_name not in columns:
                 try:
-                    cursor.execute(f'ALTER TABLE coupons ADD COLUMN {column_name} {column_type}')
-                    print(f"Colonne '{column_name}' ajoutée à la table coupons")
+                    cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column_name} {column_type}')
+                    print(f"Colonne '{column_name}' ajoutée à la table {table}")
+                    added.append(column_name)
                 except sqlite3.OperationalError as e:
                     print(f"Erreur lors de l'ajout de la colonne '{column_name}': {e}")
-        
-        conn.commit()
-        conn.close()
+        return added
+    
+    def _backfill_segment_columns(self, cursor):
+        """Remplir referrals_count et last_game_at depuis les champs JSON existants"""
+        cursor.execute("SELECT id, referrals, last_game_time FROM users")
+        rows = cursor.fetchall()
+        updates = []
+        for user_id, referrals, last_game_time in rows:
+            referrals = json.loads(referrals) if referrals else []
+            last_game_time = json.loads(last_game_time) if last_game_time else {}
+            updates.append((len(referrals), self._last_game_at(last_game_time), user_id))
+        cursor.executemany("UPDATE users SET referrals_count = ?, last_game_at = ? WHERE id = ?", updates)
+    
+    @staticmethod
+    def _last_game_at(last_game_time):
+        """Date ISO de la partie la plus récente (last_game_time contient des timestamps)"""
+        if not last_game_time:
+            return None
+        return datetime.fromtimestamp(max(last_game_time.values())).isoformat()
     
     def _get_connection(self):
         """Obtenir une connexion à la base de données"""
@@ -216,7 +320,9 @@ class Database:
                 updated_at = ?,
                 waiting_for_account_id = ?,
                 waiting_for_question = ?,
-                waiting_for_coupon = ?
+                waiting_for_coupon = ?,
+                referrals_count = ?,
+                last_game_at = ?
             WHERE id = ?
         ''', (
             current_user['language'],
@@ -231,6 +337,8 @@ class Database:
             current_user['waiting_for_account_id'],
             current_user['waiting_for_question'],
             current_user['waiting_for_coupon'],
+            len(current_user['referrals']),
+            self._last_game_at(current_user['last_game_time']),
             user_id
         ))
         
@@ -250,8 +358,9 @@ class Database:
             INSERT OR REPLACE INTO coupons (
                 coupon_id, date, text, media_type, photo_path, video_path,
                 created_at, admin_id, active, title, description, discount, 
-                code, expires_at, max_uses, current_uses
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                code, expires_at, max_uses, current_uses, file_id, thumbnail_file_id,
+                video_duration, video_width, video_height, thumbnail_path, texts
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             coupon_data['coupon_id'],
             coupon_data.get('date'),
@@ -269,11 +378,54 @@ class Database:
             coupon_data.get('code'),
             coupon_data.get('expires_at'),
             coupon_data.get('max_uses', 0),
-            coupon_data.get('current_uses', 0)
+            coupon_data.get('current_uses', 0),
+            coupon_data.get('file_id'),
+            coupon_data.get('thumbnail_file_id'),
+            coupon_data.get('video_duration'),
+            coupon_data.get('video_width'),
+            coupon_data.get('video_height'),
+            coupon_data.get('thumbnail_path'),
+            json.dumps(coupon_data['texts']) if coupon_data.get('texts') else None
         ))
         
         conn.commit()
         conn.close()
+        self.coupons_version += 1
+    
+    def set_coupon_file_ids(self, coupon_id, file_id, thumbnail_file_id=None):
+        """Enregistrer les file_id Telegram du média d'un coupon (obtenus au premier upload)"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            "UPDATE coupons SET file_id = ?, thumbnail_file_id = ? WHERE coupon_id = ?",
+            (file_id, thumbnail_file_id, coupon_id)
+        )
+        
+        conn.commit()
+        conn.close()
+        self.coupons_version += 1
+    
+    def update_coupon_media(self, coupon_id, media_data):
+        """Mettre à jour les champs média d'un coupon (chemins locaux, métadonnées vidéo)"""
+        allowed = ('photo_path', 'video_path', 'video_duration', 'video_width',
+                   'video_height', 'thumbnail_path', 'file_id', 'thumbnail_file_id')
+        fields = [key for key in media_data if key in allowed]
+        if not fields:
+            return
+        
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        cursor.execute(
+            f"UPDATE coupons SET {assignments} WHERE coupon_id = ?",
+            [media_data[key] for key in fields] + [coupon_id]
+        )
+        
+        conn.commit()
+        conn.close()
+        self.coupons_version += 1
     
     def get_daily_coupons(self, date_str):
         """Obtenir tous les coupons pour une date donnée"""
@@ -333,6 +485,86 @@ class Database:
         conn.close()
         return users
     
+    def _segment_where(self, segment=None, reachable_only=True):
+        """Clause WHERE d'un segment d'audience (toujours limité aux utilisateurs joignables).
+
+        Clés reconnues : language (str ou liste), verified, created_after,
+        created_before, seen_after, seen_before, min_referrals, max_referrals,
+        played_after, played_before (dates ISO)."""
+        segment = segment or {}
+        clauses = ["unreachable_since IS NULL"] if reachable_only else ["1 = 1"]
+        params = []
+        
+        language = segment.get('language')
+        if language:
+            languages = [language] if isinstance(language, str) else list(language)
+            clauses.append(f"language IN ({', '.join('?' for _ in languages)})")
+            params.extend(languages)
+        if segment.get('verified') is not None:
+            clauses.append("verified = ?")
+            params.append(bool(segment['verified']))
+        
+        for key, column, operator in (
+            ('created_after', 'created_at', '>='),
+            ('created_before', 'created_at', '<'),
+            ('seen_after', 'last_seen', '>='),
+            ('seen_before', 'last_seen', '<'),
+            ('min_referrals', 'referrals_count', '>='),
+            ('max_referrals', 'referrals_count', '<='),
+            ('played_after', 'last_game_at', '>='),
+            ('played_before', 'last_game_at', '<')
+        ):
+            if segment.get(key) is not None:
+                clauses.append(f"{column} {operator} ?")
+                params.append(segment[key])
+        
+        return " AND ".join(clauses), params
+    
+    def get_broadcast_recipients(self, after=None, limit=500, segment=None):
+        """Page de (id, langue) d'un segment, groupés par langue, strictement après `after` = (langue, id)"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        where, params = self._segment_where(segment)
+        if after is not None:
+            where += " AND (language, id) > (?, ?)"
+            params.extend([after[0], str(after[1])])
+        cursor.execute(
+            f"SELECT id, language FROM users WHERE {where} ORDER BY language, id LIMIT ?",
+            params + [limit]
+        )
+        recipients = [(row[0], row[1]) for row in cursor.fetchall()]
+        
+        conn.close()
+        return recipients
+    
+    def count_segment(self, segment=None, reachable_only=True):
+        """Nombre d'utilisateurs d'un segment (joignables seulement par défaut)"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        where, params = self._segment_where(segment, reachable_only)
+        cursor.execute(f"SELECT COUNT(*) FROM users WHERE {where}", params)
+        count = cursor.fetchone()[0]
+        
+        conn.close()
+        return count
+    
+    def touch_users_last_seen(self, last_seen):
+        """Enregistrer la dernière activité d'un lot d'utilisateurs {user_id: date ISO}"""
+        if not last_seen:
+            return
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        cursor.executemany(
+            "UPDATE users SET last_seen = ? WHERE id = ?",
+            [(seen_at, str(user_id)) for user_id, seen_at in last_seen.items()]
+        )
+        
+        conn.commit()
+        conn.close()
+    
     def get_user_count(self):
         """Obtenir le nombre d'utilisateurs"""
         conn = self._get_connection()
@@ -344,6 +576,50 @@ class Database:
         conn.close()
         return count
     
+    def get_reachable_user_count(self):
+        """Nombre d'utilisateurs joignables (cibles des diffusions)"""
+        return self.count_segment()
+    
+    def get_unreachable_user_ids(self):
+        """Ids des utilisateurs marqués injoignables"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT id FROM users WHERE unreachable_since IS NOT NULL")
+        user_ids = {row[0] for row in cursor.fetchall()}
+        
+        conn.close()
+        return user_ids
+    
+    def set_users_unreachable(self, user_ids, reason):
+        """Marquer des utilisateurs comme injoignables (bot bloqué, chat introuvable)"""
+        if not user_ids:
+            return
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        now = datetime.now().isoformat()
+        cursor.executemany(
+            "UPDATE users SET unreachable_since = ?, unreachable_reason = ? WHERE id = ?",
+            [(now, reason, str(user_id)) for user_id in user_ids]
+        )
+        
+        conn.commit()
+        conn.close()
+    
+    def set_user_reachable(self, user_id):
+        """Réactiver un utilisateur injoignable qui a de nouveau contacté le bot"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            "UPDATE users SET unreachable_since = NULL, unreachable_reason = NULL WHERE id = ?",
+            (str(user_id),)
+        )
+        
+        conn.commit()
+        conn.close()
+    
     def get_verified_users(self):
         """Obtenir les utilisateurs vérifiés"""
         conn = self._get_connection()
@@ -418,6 +694,192 @@ class Database:
         
         conn.commit()
         conn.close()
+        self.coupons_version += 1
+    
+    def activate_coupon(self, coupon_id, date_str=None):
+        """Activer un coupon (visible dans les coupons du jour), en fixant éventuellement sa date"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        if date_str is None:
+            cursor.execute("UPDATE coupons SET active = TRUE WHERE coupon_id = ?", (coupon_id,))
+        else:
+            cursor.execute("UPDATE coupons SET active = TRUE, date = ? WHERE coupon_id = ?", (date_str, coupon_id))
+        
+        conn.commit()
+        conn.close()
+        self.coupons_version += 1
+    
+    def set_coupon_date(self, coupon_id, date_str):
+        """Changer le jour auquel un coupon appartient (coupons du jour)"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("UPDATE coupons SET date = ? WHERE coupon_id = ?", (date_str, coupon_id))
+        
+        conn.commit()
+        conn.close()
+        self.coupons_version += 1
+    
+    def create_broadcast_job(self, coupon_id, rate, total, stats=None, segment=None, status='running',
+                             scheduled_at=None, spread_seconds=0, captions=None):
+        """Créer une diffusion persistée et retourner son identifiant"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        now = datetime.now().isoformat()
+        cursor.execute('''
+            INSERT INTO broadcast_jobs (coupon_id, status, rate, cursor, total, stats, segment,
+                                        scheduled_at, spread_seconds, captions, created_at, updated_at)
+            VALUES (?, ?, ?, NULL, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            coupon_id, status, rate, total, json.dumps(stats or {}), json.dumps(segment or {}),
+            scheduled_at, spread_seconds, json.dumps(captions) if captions else None, now, now
+        ))
+        job_id = cursor.lastrowid
+        
+        conn.commit()
+        conn.close()
+        return job_id
+    
+    def get_broadcast_job(self, job_id):
+        """Obtenir une diffusion persistée"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT * FROM broadcast_jobs WHERE job_id = ?", (job_id,))
+        job = cursor.fetchone()
+        
+        conn.close()
+        return self._decode_broadcast_job(job) if job else None
+    
+    @staticmethod
+    def _decode_broadcast_job(row):
+        job = dict(row)
+        for key in ('stats', 'segment', 'captions'):
+            job[key] = json.loads(job[key]) if job[key] else {}
+        return job
+    
+    def get_broadcast_jobs(self, statuses=None, limit=10):
+        """Lister les diffusions récentes, éventuellement filtrées par statut"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        if statuses:
+            placeholders = ", ".join("?" for _ in statuses)
+            cursor.execute(
+                f"SELECT * FROM broadcast_jobs WHERE status IN ({placeholders}) ORDER BY job_id DESC LIMIT ?",
+                list(statuses) + [limit]
+            )
+        else:
+            cursor.execute("SELECT * FROM broadcast_jobs ORDER BY job_id DESC LIMIT ?", (limit,))
+        jobs = [self._decode_broadcast_job(job) for job in cursor.fetchall()]
+        
+        conn.close()
+        return jobs
+    
+    def update_broadcast_job(self, job_id, data):
+        """Mettre à jour l'état d'une diffusion (statut, curseur, débit, compteurs)"""
+        allowed = ('status', 'rate', 'cursor', 'total', 'stats', 'finished_at', 'scheduled_at', 'captions')
+        fields = [key for key in data if key in allowed]
+        if not fields:
+            return
+        values = [json.dumps(data[key]) if key in ('stats', 'captions') else data[key] for key in fields]
+        
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        cursor.execute(
+            f"UPDATE broadcast_jobs SET {assignments}, updated_at = ? WHERE job_id = ?",
+            values + [datetime.now().isoformat(), job_id]
+        )
+        
+        conn.commit()
+        conn.close()
+    
+    def record_deliveries(self, job_id, deliveries):
+        """Enregistrer le statut de livraison d'une liste de (user_id, statut)"""
+        if not deliveries:
+            return
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        now = datetime.now().isoformat()
+        cursor.executemany(
+            "INSERT OR REPLACE INTO broadcast_deliveries (job_id, user_id, status, updated_at) VALUES (?, ?, ?, ?)",
+            [(job_id, str(user_id), status, now) for user_id, status in deliveries]
+        )
+        
+        conn.commit()
+        conn.close()
+    
+    def get_delivery_stats(self, job_id):
+        """Compteurs de livraison par statut pour une diffusion"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            "SELECT status, COUNT(*) FROM broadcast_deliveries WHERE job_id = ? GROUP BY status",
+            (job_id,)
+        )
+        stats = {row[0]: row[1] for row in cursor.fetchall()}
+        
+        conn.close()
+        return stats
+    
+    def get_delivered_user_ids(self, job_id, user_ids):
+        """Parmi user_ids, ceux qui ont déjà un statut de livraison pour cette diffusion"""
+        if not user_ids:
+            return set()
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        placeholders = ", ".join("?" for _ in user_ids)
+        cursor.execute(
+            f"SELECT user_id FROM broadcast_deliveries WHERE job_id = ? AND user_id IN ({placeholders})",
+            [job_id] + [str(user_id) for user_id in user_ids]
+        )
+        delivered = {row[0] for row in cursor.fetchall()}
+        
+        conn.close()
+        return delivered
+    
+    def get_seen_coupon_ids(self, user_id, coupon_ids):
+        """Parmi coupon_ids, ceux que l'utilisateur a déjà reçus (menu ou diffusion réussie)"""
+        if not coupon_ids:
+            return set()
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        placeholders = ", ".join("?" for _ in coupon_ids)
+        cursor.execute(f'''
+            SELECT coupon_id FROM coupon_receipts WHERE user_id = ? AND coupon_id IN ({placeholders})
+            UNION
+            SELECT j.coupon_id FROM broadcast_jobs j
+            JOIN broadcast_deliveries d ON d.job_id = j.job_id AND d.user_id = ?
+            WHERE d.status = 'success' AND j.coupon_id IN ({placeholders})
+        ''', [str(user_id)] + list(coupon_ids) + [str(user_id)] + list(coupon_ids))
+        seen = {row[0] for row in cursor.fetchall()}
+        
+        conn.close()
+        return seen
+    
+    def mark_coupons_seen(self, user_id, coupon_ids):
+        """Enregistrer les coupons reçus par un utilisateur via le menu"""
+        if not coupon_ids:
+            return
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        now = datetime.now().isoformat()
+        cursor.executemany(
+            "INSERT OR IGNORE INTO coupon_receipts (user_id, coupon_id, received_at) VALUES (?, ?, ?)",
+            [(str(user_id), coupon_id, now) for coupon_id in coupon_ids]
+        )
+        
+        conn.commit()
+        conn.close()
     
     def get_coupons_by_admin(self, admin_id):
         """Obtenir tous les coupons créés par un admin spécifique"""
@@ -1,5 +1,6 @@
 import json
 import os
+import re
 import time
 
 def load_texts():
@@ -118,6 +119,21 @@ Click <b>Verify</b> after joining the group""",
         }
     }
 
+def split_language_blocks(text, languages=("fr", "en", "ar")):
+    """Découper un texte multilingue en blocs "[fr] ...", "[en] ...", "[ar] ..." (balise en début de ligne).
+
+    Retourne {langue: texte} ; un texte sans balise donne {}."""
+    text = text or ""
+    pattern = re.compile(r'^\[(%s)\][ \t]*' % '|'.join(languages), re.MULTILINE | re.IGNORECASE)
+    matches = list(pattern.finditer(text))
+    blocks = {}
+    for index, match in enumerate(matches):
+        end = matches[index + 1].start() if index + 1 < len(matches) else len(text)
+        content = text[match.end():end].strip()
+        if content:
+            blocks[match.group(1).lower()] = content
+    return blocks
+
 def check_cooldown(user_id, game_name, database, cooldown_duration=30):
     """Vérifier si l'utilisateur peut jouer (cooldown)"""
     user_data = database.get_user(user_id)
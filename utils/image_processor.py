@@ -1,6 +1,28 @@
-from PIL import Image, ImageDraw, ImageFont
+# Pillow est importé à la première utilisation : les rendus tournent dans les processus
+# du RenderService, le processus principal du bot n'a pas à le charger au démarrage.
+from functools import lru_cache
+from io import BytesIO
 import os
 
+
+@lru_cache(maxsize=32)
+def _load_base_image(image_path):
+    """Charger et décoder une image de base une seule fois (partagée entre les rendus)"""
+    from PIL import Image
+    image = Image.open(image_path)
+    image.load()
+    return image
+
+
+@lru_cache(maxsize=32)
+def _load_font(font_path, font_size):
+    """Charger une police TrueType une seule fois par couple (chemin, taille)"""
+    from PIL import ImageFont
+    if font_path:
+        return ImageFont.truetype(font_path, font_size)
+    return ImageFont.load_default()
+
+
 class ImageProcessor:
     def __init__(self):
         self.default_font_path = self._get_default_font()
@@ -22,10 +44,17 @@ class ImageProcessor:
                 return font_path
         
         return None
+
+    def _get_font(self, font_path, font_size):
+        """Obtenir une police depuis le cache (police demandée, sinon police par défaut)"""
+        if font_path and os.path.exists(font_path):
+            return _load_font(font_path, font_size)
+        return _load_font(self.default_font_path, font_size)
         
     def add_text_to_image(self, base_image_path, text, position, output_path, 
                          font_size=30, color="white", font_path="media/DejaVuSans-Bold.ttf"):
         """Ajouter du texte sur une image"""
+        from PIL import Image, ImageDraw, ImageFont
         try:
             # Ouvrir l'image de base
             image = Image.open(base_image_path)
@@ -54,9 +83,30 @@ class ImageProcessor:
         except Exception as e:
             print(f"Erreur lors de l'ajout de texte à l'image: {e}")
             return base_image_path
+
+    def render_text_to_bytes(self, base_image_path, text, position, font_size=30,
+                             color="white", font_path="media/DejaVuSans-Bold.ttf",
+                             image_format="JPEG", quality=80):
+        """Ajouter du texte sur une image entièrement en mémoire et retourner l'image encodée.
+
+        L'image de base et la police sont décodées une seule fois puis gardées en
+        cache ; aucun fichier n'est écrit sur le disque.
+        """
+        from PIL import ImageDraw
+        image = _load_base_image(base_image_path).copy()
+        if image_format.upper() == "JPEG" and image.mode != "RGB":
+            image = image.convert("RGB")
+
+        draw = ImageDraw.Draw(image)
+        draw.text(position, text, fill=color, font=self._get_font(font_path, font_size))
+
+        buffer = BytesIO()
+        image.save(buffer, format=image_format, quality=quality, optimize=True)
+        return buffer.getvalue()
             
     def add_element_to_image(self, base_image_path, element_image_path, position, output_path):
         """Ajouter un élément (image) sur une image de base"""
+        from PIL import Image
         try:
             # Ouvrir les images
             base_image = Image.open(base_image_path)
@@ -77,6 +127,20 @@ class ImageProcessor:
             print(f"Erreur lors de l'ajout d'élément à l'image: {e}")
             return base_image_path
             
+    def render_element_to_bytes(self, base_image_path, element_image_path, position,
+                                image_format="JPEG", quality=80):
+        """Coller un élément sur une image de base en mémoire et retourner l'image encodée"""
+        base_image = _load_base_image(base_image_path).copy()
+        element_image = _load_base_image(element_image_path)
+        
+        base_image.paste(element_image, position, element_image if element_image.mode == 'RGBA' else None)
+        if image_format.upper() == "JPEG" and base_image.mode != "RGB":
+            base_image = base_image.convert("RGB")
+        
+        buffer = BytesIO()
+        base_image.save(buffer, format=image_format, quality=quality, optimize=True)
+        return buffer.getvalue()
+            
     def select_random_image(self, images_folder):
         """Sélectionner une image aléatoire dans un dossier"""
         import random
@@ -89,4 +153,4 @@ class ImageProcessor:
         if not images:
             return None
             
-        return os.path.join(images_folder, random.choice(images))
\ No newline at end of file
+        return os.path.join(images_folder, random.choice(images))
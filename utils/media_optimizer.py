@@ -0,0 +1,246 @@
+"""
+Étape de build des médias.
+
+Génère, à côté de chaque image de `media/`, des variantes optimisées
+(JPEG progressif et WebP, redimensionnées, sans métadonnées) et un manifeste
+`media/manifest.json` utilisé par les jeux et les tutoriels.
+
+Les photos (send_photo) partent en JPEG progressif : Telegram recompresse de
+toute façon les photos et traite le JPEG de façon prévisible, ce qui n'est
+pas le cas du WebP. La variante WebP ne sert qu'aux envois en document ou en
+sticker (`resolve_media(path, 'webp')`).
+
+Les variantes ne sont pas versionnées : l'étape fait partie du déploiement
+(incrémentale, instantanée quand tout est à jour) :
+    python -m utils.media_optimizer && python main.py
+
+Utilisation :
+    python -m utils.media_optimizer            # construire les variantes
+    python -m utils.media_optimizer --report   # afficher les octets gagnés par jeu
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+MEDIA_ROOT = "media"
+MANIFEST_PATH = os.path.join(MEDIA_ROOT, "manifest.json")
+VARIANT_MARKER = ".opt"
+
+# Paramètres par défaut : Telegram recompresse les photos au-delà de 1280 px
+DEFAULT_MAX_SIZE = 1280
+DEFAULT_JPEG_QUALITY = 72
+DEFAULT_WEBP_QUALITY = 78
+
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+# Images servant de base à un rendu (elles doivent rester intactes)
+EXCLUDED_SOURCES = {
+    os.path.join(MEDIA_ROOT, "games", "crash", "crash_base.png"),
+}
+
+_manifest = None
+
+
+def _variant_path(source_path, extension):
+    base, _ = os.path.splitext(source_path)
+    return f"{base}{VARIANT_MARKER}{extension}"
+
+
+def _iter_sources(media_root):
+    """Lister les images sources (hors variantes déjà générées)"""
+    for root, dirs, files in os.walk(media_root):
+        # Les tuiles des plateaux de mines sont des sources de rendu, pas des médias servis
+        dirs[:] = [d for d in dirs if d != "tiles"]
+        for file_name in sorted(files):
+            path = os.path.join(root, file_name)
+            if VARIANT_MARKER + "." in file_name or path in EXCLUDED_SOURCES:
+                continue
+            if file_name.lower().endswith(SOURCE_EXTENSIONS):
+                yield path
+
+
+def optimize_image(source_path, max_size=DEFAULT_MAX_SIZE,
+                   jpeg_quality=DEFAULT_JPEG_QUALITY, webp_quality=DEFAULT_WEBP_QUALITY):
+    """Créer les variantes JPEG progressif et WebP d'une image (métadonnées supprimées)"""
+    from PIL import Image, ImageOps
+
+    with Image.open(source_path) as image:
+        # Appliquer l'orientation EXIF avant de la supprimer
+        image = ImageOps.exif_transpose(image)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+
+        jpeg_path = _variant_path(source_path, ".jpg")
+        image.save(jpeg_path, "JPEG", quality=jpeg_quality, optimize=True, progressive=True)
+
+        webp_path = _variant_path(source_path, ".webp")
+        image.save(webp_path, "WEBP", quality=webp_quality, method=6)
+
+        size = image.size
+
+    return {
+        'width': size[0],
+        'height': size[1],
+        'jpeg': jpeg_path,
+        'webp': webp_path
+    }
+
+
+def build(media_root=MEDIA_ROOT, manifest_path=MANIFEST_PATH, force=False, **options):
+    """Construire toutes les variantes et écrire le manifeste (incrémental)"""
+    previous = read_manifest(manifest_path)
+    manifest = {}
+
+    for source_path in _iter_sources(media_root):
+        source_size = os.path.getsize(source_path)
+        source_mtime = os.path.getmtime(source_path)
+        entry = previous.get(source_path)
+
+        up_to_date = (
+            not force and entry
+            and entry.get('source_mtime') == source_mtime
+            and all(os.path.exists(entry['variants'][fmt]['path']) for fmt in ('jpeg', 'webp'))
+        )
+        if up_to_date:
+            manifest[source_path] = entry
+            continue
+
+        try:
+            result = optimize_image(source_path, **options)
+        except Exception as e:
+            print(f"Erreur lors de l'optimisation de {source_path}: {e}")
+            continue
+
+        variants = {
+            fmt: {'path': result[fmt], 'bytes': os.path.getsize(result[fmt])}
+            for fmt in ('jpeg', 'webp')
+        }
+        manifest[source_path] = {
+            'source_bytes': source_size,
+            'source_mtime': source_mtime,
+            'width': result['width'],
+            'height': result['height'],
+            'variants': variants
+        }
+
+    for source_path, entry in manifest.items():
+        # Recalculé aussi pour les entrées à jour (anciens manifestes servant le WebP)
+        entry['serve'], entry['serve_bytes'] = _photo_variant(source_path, entry)
+
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    reload_manifest(manifest_path)
+    return manifest
+
+
+def read_manifest(manifest_path=MANIFEST_PATH):
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _photo_variant(source_path, entry):
+    """(chemin, octets) à envoyer en photo : le JPEG progressif, l'original s'il reste plus petit"""
+    jpeg = entry['variants']['jpeg']
+    if jpeg['bytes'] < entry['source_bytes']:
+        return jpeg['path'], jpeg['bytes']
+    return source_path, entry['source_bytes']
+
+
+def reload_manifest(manifest_path=MANIFEST_PATH):
+    """Recharger le manifeste en mémoire"""
+    global _manifest
+    _manifest = read_manifest(manifest_path)
+    if not _manifest:
+        logger.warning(f"{manifest_path} absent : médias originaux servis "
+                       f"(construire les variantes : python -m utils.media_optimizer)")
+    return _manifest
+
+
+def resolve_media(path, variant='photo'):
+    """Retourner le fichier à envoyer pour un média : 'photo' (send_photo) ou 'webp' (document, sticker)"""
+    if _manifest is None:
+        reload_manifest()
+    source_path = os.path.normpath(path)
+    entry = _manifest.get(source_path)
+    if not entry:
+        return path
+    if variant == 'photo':
+        candidate = _photo_variant(source_path, entry)[0]
+    else:
+        candidate = entry['variants'][variant]['path']
+    return candidate if os.path.exists(candidate) else path
+
+
+def report(manifest=None):
+    """Calculer les octets gagnés par jeu (dossier de premier niveau sous media/games)"""
+    manifest = manifest if manifest is not None else read_manifest()
+    groups = defaultdict(lambda: {'files': 0, 'source_bytes': 0, 'served_bytes': 0})
+
+    for source_path, entry in manifest.items():
+        parts = os.path.relpath(source_path, MEDIA_ROOT).split(os.sep)
+        group = parts[1] if parts[0] == "games" and len(parts) > 2 else parts[0]
+        served = entry['serve_bytes']
+
+        groups[group]['files'] += 1
+        groups[group]['source_bytes'] += entry['source_bytes']
+        groups[group]['served_bytes'] += served
+
+    return dict(groups)
+
+
+def format_report(groups):
+    lines = [f"{'Groupe':<18}{'Fichiers':>9}{'Original':>12}{'Optimisé':>12}{'Gain':>12}{'%':>7}"]
+    total_source = total_served = 0
+    for group, stats in sorted(groups.items()):
+        saved = stats['source_bytes'] - stats['served_bytes']
+        ratio = saved / stats['source_bytes'] * 100 if stats['source_bytes'] else 0
+        lines.append(
+            f"{group:<18}{stats['files']:>9}{stats['source_bytes']/1024:>10.0f}KB"
+            f"{stats['served_bytes']/1024:>10.0f}KB{saved/1024:>10.0f}KB{ratio:>6.1f}%"
+        )
+        total_source += stats['source_bytes']
+        total_served += stats['served_bytes']
+    saved = total_source - total_served
+    ratio = saved / total_source * 100 if total_source else 0
+    lines.append(
+        f"{'TOTAL':<18}{'':>9}{total_source/1024:>10.0f}KB"
+        f"{total_served/1024:>10.0f}KB{saved/1024:>10.0f}KB{ratio:>6.1f}%"
+    )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimiser les médias du bot")
+    parser.add_argument('--report', action='store_true', help="Afficher le rapport sans reconstruire")
+    parser.add_argument('--force', action='store_true', help="Reconstruire toutes les variantes")
+    parser.add_argument('--max-size', type=int, default=DEFAULT_MAX_SIZE)
+    parser.add_argument('--jpeg-quality', type=int, default=DEFAULT_JPEG_QUALITY)
+    parser.add_argument('--webp-quality', type=int, default=DEFAULT_WEBP_QUALITY)
+    args = parser.parse_args()
+
+    if args.report:
+        print(format_report(report()))
+        return
+
+    start = time.time()
+    manifest = build(
+        force=args.force,
+        max_size=args.max_size,
+        jpeg_quality=args.jpeg_quality,
+        webp_quality=args.webp_quality
+    )
+    print(f"{len(manifest)} images traitées en {time.time() - start:.1f}s -> {MANIFEST_PATH}\n")
+    print(format_report(report(manifest)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""
+Rendu procédural des plateaux de mines (Casino Mines, Games Mines).
+
+Un plateau est composé à partir d'un fond (toutes les cases cachées) et d'une
+planche de tuiles (cachée / sûre / bombe). Le motif des cases est généré
+aléatoirement puis composé en une seule opération numpy ; le JPEG encodé est
+gardé en cache par motif.
+
+numpy et Pillow ne sont importés qu'au premier rendu (dans les processus du
+RenderService) : le processus principal ne fait que tirer les motifs et lire
+le cache, et démarre sans les charger.
+
+Les fonds et planches de tuiles sont extraits une fois des anciennes images :
+    python -m utils.mines_renderer --build-tiles
+
+Après tout changement de calage (origin, pitch, tile_size), vérifier que le
+motif de l'image de référence, recomposé à partir des tuiles, la reproduit :
+    python -m utils.mines_renderer --check
+"""
+import argparse
+import os
+import random
+from collections import OrderedDict
+from io import BytesIO
+
+HIDDEN, SAFE, BOMB = 0, 1, 2
+TILE_STATES = {'hidden': HIDDEN, 'safe': SAFE, 'bomb': BOMB}
+
+BOARD_LAYOUTS = {
+    'casino_mines': {
+        'reference': "media/games/casino_mine/casino_mine_1.jpg",
+        'board': "media/games/casino_mine/tiles/board.jpg",
+        'tiles': "media/games/casino_mine/tiles/tiles.png",
+        'origin': (367, 400),  # Coin haut-gauche de la première case (x, y)
+        'pitch': 70,  # Distance entre deux cases
+        'tile_size': 64,
+        'grid': (5, 5),  # (lignes, colonnes)
+        'sample_cells': {'hidden': (0, 0), 'safe': (2, 0)},
+        # Cases révélées sur l'image de référence (les autres sont cachées)
+        'reference_cells': {'safe': ((2, 0), (2, 2), (2, 4), (4, 4))},
+        'frame': (340, 375, 740, 775),  # Intérieur du cadre de la grille (x0, y0, x1, y1)
+        'safe_cells': (3, 5),  # Nombre de cases sûres révélées (min, max)
+        'bomb_cells': 0
+    },
+    'games_mines': {
+        'reference': "media/games/games_mines/games_mines_1.jpg",
+        'board': "media/games/games_mines/tiles/board.jpg",
+        'tiles': "media/games/games_mines/tiles/tiles.png",
+        # Bord extérieur des cases (liseré compris), hors des interstices sombres
+        'origin': (226, 387),
+        'pitch': 168,
+        'tile_size': 158,
+        'grid': (5, 5),
+        'sample_cells': {'hidden': (0, 0), 'safe': (3, 0), 'bomb': (2, 4)},
+        'reference_cells': {'safe': ((3, 0), (3, 1), (3, 3), (3, 4)), 'bomb': ((2, 4), (4, 2))},
+        'frame': (188, 358, 1095, 1238),
+        'safe_cells': (3, 5),
+        'bomb_cells': 2
+    }
+}
+
+
+def _cell_box(layout, row, col):
+    x0, y0 = layout['origin']
+    pitch, size = layout['pitch'], layout['tile_size']
+    x, y = x0 + col * pitch, y0 + row * pitch
+    return (x, y, x + size, y + size)
+
+
+def extract_tiles(layout):
+    """Fond (toutes les cases cachées) et planche de tuiles, extraits de l'image de référence"""
+    from PIL import Image
+
+    reference = Image.open(layout['reference']).convert("RGB")
+
+    # Planche : une tuile par état, alignées horizontalement dans l'ordre des états
+    size = layout['tile_size']
+    states = sorted(layout['sample_cells'], key=TILE_STATES.get)
+    sheet = Image.new("RGB", (size * len(states), size))
+    for index, state in enumerate(states):
+        sheet.paste(reference.crop(_cell_box(layout, *layout['sample_cells'][state])), (index * size, 0))
+
+    # Fond : les interstices autour des cases révélées (halo) repris d'une case
+    # cachée de la même rangée (même éclairage), puis toutes les cases
+    # remplacées par la tuile cachée
+    rows, cols = layout['grid']
+    margin = (layout['pitch'] - size) // 2
+    revealed = {cell for cells in layout['reference_cells'].values() for cell in cells}
+    source = reference.copy()
+    for row, col in revealed:
+        hidden_cols = [c for c in range(cols) if (row, c) not in revealed]
+        if not hidden_cols:
+            continue
+        nearest = min(hidden_cols, key=lambda c: abs(c - col))
+        x0, y0, x1, y1 = _cell_box(layout, row, nearest)
+        patch = source.crop((x0 - margin, y0 - margin, x1 + margin, y1 + margin))
+        reference.paste(patch, (_cell_box(layout, row, col)[0] - margin, y0 - margin))
+
+    hidden = reference.crop(_cell_box(layout, *layout['sample_cells']['hidden']))
+    for row in range(rows):
+        for col in range(cols):
+            reference.paste(hidden, _cell_box(layout, row, col)[:2])
+    return reference, sheet
+
+
+def build_tiles(layout_key):
+    """Extraire le fond et la planche de tuiles et les enregistrer"""
+    layout = BOARD_LAYOUTS[layout_key]
+    board, sheet = extract_tiles(layout)
+    os.makedirs(os.path.dirname(layout['board']), exist_ok=True)
+    board.save(layout['board'], "JPEG", quality=85, optimize=True, progressive=True)
+    sheet.save(layout['tiles'], "PNG", optimize=True)
+    return layout['board'], layout['tiles']
+
+
+def reference_pattern(layout):
+    """Motif de l'image de référence (cases cachées sauf reference_cells)"""
+    rows, cols = layout['grid']
+    pattern = [HIDDEN] * (rows * cols)
+    for state, cells in layout['reference_cells'].items():
+        for row, col in cells:
+            pattern[row * cols + col] = TILE_STATES[state]
+    return tuple(pattern)
+
+
+def check_layout(layout_key):
+    """Contrôler le calage d'un plateau.
+
+    Retourne (cases hors du cadre, écart moyen par case) : le motif de
+    l'image de référence est recomposé à partir des tuiles extraites puis
+    comparé à l'image, case par case (écart absolu moyen des pixels, 0-255,
+    hors différence d'éclairage moyenne entre les rangées), sur la case
+    élargie à son pas pour voir aussi les débordements. Un calage juste ne
+    laisse que les variations de l'illustration d'une case à l'autre.
+    """
+    import numpy as np
+    from PIL import Image
+
+    layout = BOARD_LAYOUTS[layout_key]
+    board, sheet = extract_tiles(layout)
+    renderer = MinesBoardRenderer(layout_key)
+    renderer._board, renderer._tiles = renderer._split_tiles(np.asarray(board), np.asarray(sheet))
+    reference = np.asarray(Image.open(layout['reference']).convert("RGB")).astype(np.int16)
+    composed = renderer.compose(reference_pattern(layout)).astype(np.int16)
+
+    rows, cols = layout['grid']
+    fx0, fy0, fx1, fy1 = layout['frame']
+    margin = (layout['pitch'] - layout['tile_size']) // 2
+    outside, errors = [], {}
+    for row in range(rows):
+        for col in range(cols):
+            x0, y0, x1, y1 = _cell_box(layout, row, col)
+            if x0 < fx0 or y0 < fy0 or x1 > fx1 or y1 > fy1:
+                outside.append((row, col))
+            area = np.s_[y0 - margin:y1 + margin, x0 - margin:x1 + margin]
+            difference = composed[area] - reference[area]
+            errors[(row, col)] = float(np.abs(difference - difference.mean(axis=(0, 1))).mean())
+    return outside, errors
+
+
+class MinesBoardRenderer:
+    def __init__(self, layout_key, cache_size=512, quality=80):
+        self.layout_key = layout_key
+        self.layout = BOARD_LAYOUTS[layout_key]
+        self.quality = quality
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # Motif -> JPEG encodé
+        self._board = None
+        self._tiles = None
+
+    def is_available(self):
+        """Vérifier que le fond et la planche de tuiles existent"""
+        return os.path.exists(self.layout['board']) and os.path.exists(self.layout['tiles'])
+
+    def _load(self):
+        """Charger le fond et les tuiles en tableaux numpy (une seule fois)"""
+        if self._board is None:
+            import numpy as np
+            from PIL import Image
+
+            self._board, self._tiles = self._split_tiles(
+                np.asarray(Image.open(self.layout['board']).convert("RGB")),
+                np.asarray(Image.open(self.layout['tiles']).convert("RGB"))
+            )
+        return self._board, self._tiles
+
+    def _split_tiles(self, board, sheet):
+        """(fond, tuiles) : la planche découpée en tableau (états, taille, taille, 3)"""
+        size = self.layout['tile_size']
+        return board, sheet.reshape(size, -1, size, 3).transpose(1, 0, 2, 3)
+
+    def random_pattern(self, rng=random):
+        """Générer un motif aléatoire : tuple d'états, une entrée par case"""
+        rows, cols = self.layout['grid']
+        cell_count = rows * cols
+        safe_count = rng.randint(*self.layout['safe_cells'])
+        cells = rng.sample(range(cell_count), safe_count + self.layout['bomb_cells'])
+
+        pattern = [HIDDEN] * cell_count
+        for index, cell in enumerate(cells):
+            pattern[cell] = SAFE if index < safe_count else BOMB
+        return tuple(pattern)
+
+    def compose(self, pattern):
+        """Composer le plateau (tableau numpy) pour un motif donné"""
+        import numpy as np
+
+        board, tiles = self._load()
+        rows, cols = self.layout['grid']
+        pitch, size = self.layout['pitch'], self.layout['tile_size']
+        x0, y0 = self.layout['origin']
+
+        canvas = board.copy()
+        # Vue (lignes, pitch, colonnes, pitch, 3) sur la zone de la grille, sans copie
+        region = canvas[y0:y0 + rows * pitch, x0:x0 + cols * pitch]
+        region = region.reshape(rows, pitch, cols, pitch, 3)
+
+        grid = np.asarray(pattern, dtype=np.intp).reshape(rows, cols)
+        # tiles[grid] -> (lignes, colonnes, taille, taille, 3), réordonné comme la vue
+        region[:, :size, :, :size] = tiles[grid].transpose(0, 2, 1, 3, 4)
+        return canvas
+
+    def encode(self, pattern):
+        """Composer et encoder le plateau en JPEG (sans cache)"""
+        from PIL import Image
+
+        buffer = BytesIO()
+        Image.fromarray(self.compose(pattern)).save(buffer, "JPEG", quality=self.quality, optimize=True)
+        return buffer.getvalue()
+
+    def get_cached(self, pattern):
+        cached = self.cache.get(pattern)
+        if cached is not None:
+            self.cache.move_to_end(pattern)
+        return cached
+
+    def store(self, pattern, image_bytes):
+        self.cache[pattern] = image_bytes
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def render(self, pattern):
+        """Retourner le JPEG encodé du plateau (mis en cache par motif)"""
+        image_bytes = self.get_cached(pattern)
+        if image_bytes is None:
+            image_bytes = self.encode(pattern)
+            self.store(pattern, image_bytes)
+        return image_bytes
+
+    async def render_with(self, render_service, pattern):
+        """Comme render(), mais l'encodage est délégué au pool de rendu"""
+        image_bytes = self.get_cached(pattern)
+        if image_bytes is None:
+            image_bytes = await render_service.render_mines_board(
+                self.layout_key, pattern, fallback_path=self.layout['reference']
+            )
+            if not render_service.is_fallback(image_bytes):
+                self.store(pattern, image_bytes)
+        return image_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plateaux de mines procéduraux")
+    parser.add_argument('--build-tiles', action='store_true', help="Extraire fonds et tuiles des images de référence")
+    parser.add_argument('--preview', metavar='FICHIER', help="Écrire un plateau aléatoire de chaque jeu")
+    parser.add_argument('--check', action='store_true', help="Contrôler le calage contre les images de référence")
+    args = parser.parse_args()
+
+    if args.check:
+        for layout_key in BOARD_LAYOUTS:
+            outside, errors = check_layout(layout_key)
+            worst = max(errors, key=errors.get)
+            print(f"{layout_key}: écart moyen {sum(errors.values()) / len(errors):.1f}, "
+                  f"pire case {worst} {errors[worst]:.1f}"
+                  + (f", hors du cadre : {outside}" if outside else ""))
+
+    if args.build_tiles:
+        for layout_key in BOARD_LAYOUTS:
+            board, tiles = build_tiles(layout_key)
+            print(f"{layout_key}: {board} ({os.path.getsize(board)/1024:.0f} KB), "
+                  f"{tiles} ({os.path.getsize(tiles)/1024:.0f} KB)")
+
+    if args.preview:
+        base, extension = os.path.splitext(args.preview)
+        for layout_key in BOARD_LAYOUTS:
+            renderer = MinesBoardRenderer(layout_key)
+            with open(f"{base}_{layout_key}{extension or '.jpg'}", 'wb') as f:
+                f.write(renderer.render(renderer.random_pattern()))
+
+
+if __name__ == "__main__":
+    main()
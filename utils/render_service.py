@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+# ImageProcessor propre à chaque processus de rendu (ses caches vivent dans le worker)
+_worker_processor = None
+_worker_board_renderers = {}
+
+
+def _get_worker_processor():
+    global _worker_processor
+    if _worker_processor is None:
+        from utils.image_processor import ImageProcessor
+        _worker_processor = ImageProcessor()
+    return _worker_processor
+
+
+def _render_text_job(base_image_path, text, position, options):
+    return _get_worker_processor().render_text_to_bytes(base_image_path, text, position, **options)
+
+
+def _render_element_job(base_image_path, element_image_path, position, options):
+    return _get_worker_processor().render_element_to_bytes(base_image_path, element_image_path, position, **options)
+
+
+def _render_mines_board_job(layout_key, pattern):
+    from utils.mines_renderer import MinesBoardRenderer
+    renderer = _worker_board_renderers.get(layout_key)
+    if renderer is None:
+        renderer = _worker_board_renderers[layout_key] = MinesBoardRenderer(layout_key, cache_size=0)
+    return renderer.encode(pattern)
+
+
+def _add_text_to_image_job(base_image_path, text, position, output_path, options):
+    return _get_worker_processor().add_text_to_image(base_image_path, text, position, output_path, **options)
+
+
+def _add_element_to_image_job(base_image_path, element_image_path, position, output_path):
+    return _get_worker_processor().add_element_to_image(base_image_path, element_image_path, position, output_path)
+
+
+class RenderQueueFull(Exception):
+    """La file de rendu est pleine, le rendu est refusé immédiatement"""
+
+
+class RenderService:
+    """
+    Service de rendu d'images exécuté dans un pool de processus.
+    Le travail Pillow ne bloque plus la boucle asyncio : les handlers font
+    `await` et, si la file est pleine ou si le rendu dépasse le délai,
+    reçoivent une image générique pré-rendue.
+    """
+
+    def __init__(self, max_workers=None, max_pending=32, timeout=5.0):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = None
+        self._pending = 0
+        self._fallbacks = {}
+
+    def _get_executor(self):
+        """Créer le pool de processus à la première utilisation"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def _run(self, func, *args):
+        """Exécuter une tâche de rendu dans le pool avec file bornée et délai maximal.
+
+        Le créneau de la file n'est rendu qu'à la fin réelle du rendu dans le
+        worker : un rendu abandonné pour cause de délai continue d'occuper le
+        pool, et la file reste donc bornée même pendant une rafale de rendus lents.
+        """
+        if self._pending >= self.max_pending:
+            raise RenderQueueFull(f"{self._pending} rendus déjà en attente")
+
+        loop = asyncio.get_running_loop()
+        try:
+            job = self._get_executor().submit(func, *args)
+        except BrokenProcessPool:
+            # Un worker est mort : recréer le pool et réessayer une fois
+            self._executor = None
+            job = self._get_executor().submit(func, *args)
+        self._pending += 1
+        job.add_done_callback(lambda _: self._release_from_worker(loop))
+        return await asyncio.wait_for(asyncio.wrap_future(job), self.timeout)
+
+    def _release_from_worker(self, loop):
+        """Rendre le créneau depuis le thread du pool (le compteur n'est modifié que dans la boucle)"""
+        try:
+            loop.call_soon_threadsafe(self._release_slot)
+        except RuntimeError:
+            # Boucle fermée (arrêt du bot) : plus personne ne lit le compteur
+            pass
+
+    def _release_slot(self):
+        self._pending -= 1
+
+    def get_fallback(self, fallback_path):
+        """Obtenir (et garder en mémoire) l'image générique pré-rendue"""
+        if fallback_path not in self._fallbacks:
+            with open(fallback_path, 'rb') as f:
+                self._fallbacks[fallback_path] = f.read()
+        return self._fallbacks[fallback_path]
+
+    def is_fallback(self, image_bytes):
+        """Indiquer si une image retournée est l'image générique (à ne pas mettre en cache)"""
+        return any(image_bytes is fallback for fallback in self._fallbacks.values())
+
+    async def render_text(self, base_image_path, text, position, fallback_path=None, **options):
+        """Rendre du texte sur une image dans le pool et retourner l'image encodée"""
+        try:
+            return await self._run(_render_text_job, base_image_path, text, position, options)
+        except (RenderQueueFull, asyncio.TimeoutError, BrokenProcessPool) as e:
+            logger.warning(f"Rendu indisponible ({type(e).__name__}: {e}), image générique utilisée")
+        except Exception as e:
+            logger.error(f"Erreur lors du rendu de l'image {base_image_path}: {e}")
+        return self.get_fallback(fallback_path or base_image_path)
+
+    async def render_element(self, base_image_path, element_image_path, position, fallback_path=None, **options):
+        """Coller un élément sur une image dans le pool et retourner l'image encodée"""
+        try:
+            return await self._run(_render_element_job, base_image_path, element_image_path, position, options)
+        except (RenderQueueFull, asyncio.TimeoutError, BrokenProcessPool) as e:
+            logger.warning(f"Rendu indisponible ({type(e).__name__}: {e}), image générique utilisée")
+        except Exception as e:
+            logger.error(f"Erreur lors du rendu de l'image {base_image_path}: {e}")
+        return self.get_fallback(fallback_path or base_image_path)
+
+    async def render_mines_board(self, layout_key, pattern, fallback_path):
+        """Composer un plateau de mines dans le pool et retourner le JPEG encodé"""
+        try:
+            return await self._run(_render_mines_board_job, layout_key, pattern)
+        except (RenderQueueFull, asyncio.TimeoutError, BrokenProcessPool) as e:
+            logger.warning(f"Rendu indisponible ({type(e).__name__}: {e}), image générique utilisée")
+        except Exception as e:
+            logger.error(f"Erreur lors du rendu du plateau {layout_key}: {e}")
+        return self.get_fallback(fallback_path)
+
+    async def add_text_to_image(self, base_image_path, text, position, output_path, **options):
+        """Version asynchrone de ImageProcessor.add_text_to_image exécutée dans le pool"""
+        try:
+            return await self._run(_add_text_to_image_job, base_image_path, text, position, output_path, options)
+        except Exception as e:
+            logger.warning(f"Rendu indisponible pour {output_path}: {e}")
+            return base_image_path
+
+    async def add_element_to_image(self, base_image_path, element_image_path, position, output_path):
+        """Version asynchrone de ImageProcessor.add_element_to_image exécutée dans le pool"""
+        try:
+            return await self._run(_add_element_to_image_job, base_image_path, element_image_path, position, output_path)
+        except Exception as e:
+            logger.warning(f"Rendu indisponible pour {output_path}: {e}")
+            return base_image_path
+
+    def shutdown(self):
+        """Arrêter le pool de processus"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def build_render_service(config):
+    """Service de rendu selon la configuration (un pool par application, construit par Services)"""
+    return RenderService(
+        max_workers=getattr(config, 'RENDER_WORKERS', None),
+        max_pending=getattr(config, 'RENDER_QUEUE_SIZE', 32),
+        timeout=getattr(config, 'RENDER_TIMEOUT', 5.0)
+    )